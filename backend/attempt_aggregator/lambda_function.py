@@ -0,0 +1,36 @@
+import os
+import logging
+from boto3.dynamodb.types import TypeDeserializer
+from quizcraft import runtime, attempt_stats
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+dynamodb = runtime.resource('dynamodb')
+deserializer = TypeDeserializer()
+
+def lambda_handler(event, context):
+    """Roll new attempts from the Attempts stream into per-user and per-quiz stats.
+
+    Also applies the attempt_count increments submit_quiz deferred for hot
+    quizzes (attempts marked count_pending).
+    """
+    records = [r for r in event['Records'] if r.get('eventName') == 'INSERT']
+    attempts = [{k: deserializer.deserialize(v) for k, v in r['dynamodb']['NewImage'].items()} for r in records]
+    if not attempts:
+        return {'batchItemFailures': []}
+    try:
+        applied = attempt_stats.apply(
+            dynamodb,
+            os.environ['ATTEMPTS_TABLE'],
+            os.environ['QUIZZES_TABLE'],
+            os.environ['STATS_TABLE'],
+            attempts
+        )
+        logger.info(f"Applied {applied} of {len(attempts)} attempts to stats")
+        return {'batchItemFailures': []}
+    except Exception as e:
+        # Retry the batch from its first record; attempts already applied are skipped
+        logger.error(f"Error applying attempt stats: {str(e)}")
+        first = min(records, key=lambda r: int(r['dynamodb']['SequenceNumber']))
+        return {'batchItemFailures': [{'itemIdentifier': first['dynamodb']['SequenceNumber']}]}
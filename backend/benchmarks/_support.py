@@ -0,0 +1,95 @@
+"""Shared plumbing for the offline benchmarks in this directory."""
+import os
+import sys
+import time
+import statistics
+import importlib.util
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYER_DIR = os.path.join(BACKEND_DIR, 'layer', 'python')
+
+if LAYER_DIR not in sys.path:
+    sys.path.insert(0, LAYER_DIR)
+
+# boto3 needs a region to build clients; nothing here talks to AWS.
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+
+
+def load_handler(function_name):
+    """Import backend/<function_name>/lambda_function.py under a unique module name."""
+    path = os.path.join(BACKEND_DIR, function_name, 'lambda_function.py')
+    spec = importlib.util.spec_from_file_location(f"{function_name}_lambda_function", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(fn, iterations=50, warmup=3):
+    """Call fn repeatedly and return latency stats in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': statistics.mean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def print_table(title, rows):
+    """Print a list of (label, stats dict) rows as an aligned table."""
+    print(title)
+    if not rows:
+        return
+    keys = list(rows[0][1].keys())
+    width = max(len(label) for label, _ in rows)
+    print(f"  {'':<{width}}  " + "  ".join(f"{k:>12}" for k in keys))
+    for label, stats in rows:
+        cells = []
+        for k in keys:
+            v = stats[k]
+            cells.append(f"{v:>12.2f}" if isinstance(v, float) else f"{v:>12}")
+        print(f"  {label:<{width}}  " + "  ".join(cells))
+
+
+def make_text_pdf(page_count, lines_per_page=40, seed=0):
+    """Build a minimal multi-page PDF whose pages carry extractable text."""
+    import random
+    rng = random.Random(seed)
+    words = ['quiz', 'cloud', 'lambda', 'python', 'memory', 'latency', 'network', 'storage',
+             'queue', 'table', 'index', 'stream', 'function', 'request', 'token', 'model']
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for _ in range(page_count):
+        lines = [' '.join(rng.choice(words) for _ in range(12)) for _ in range(lines_per_page)]
+        content = 'BT /F1 10 Tf 14 TL 40 760 Td ' + ' '.join(f'({line}) Tj T*' for line in lines) + ' ET'
+        content = content.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b' '.join(b'%d 0 R' % i for i in page_ids)
+    objects[1] = b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % page_count
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref_at = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_at)
+    return bytes(out)
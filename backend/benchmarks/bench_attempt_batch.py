@@ -0,0 +1,84 @@
+"""Loading a history view's attempts: one GET /attempt/{id} each vs the batch endpoint.
+
+Both paths run the get_attempt handler against the local DynamoDB stand-in
+with a simulated round trip. The batch run also hands back a share of keys
+as UnprocessedKeys to exercise the retry path.
+
+    cd backend && python benchmarks/bench_attempt_batch.py --attempts 10 50 100 --latency-ms 4
+"""
+import os
+import json
+import time
+import random
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from bench_quiz_content_size import make_quiz
+from quizcraft import quiz_codec, answer_key
+
+QUIZ_COUNT = 12
+
+
+def build(attempt_count, latency_ms, unprocessed_rate, seed=0):
+    rng = random.Random(seed)
+    db = LocalDynamoDB(latency_ms=latency_ms, unprocessed_rate=unprocessed_rate, seed=seed)
+    quizzes = db.create_table('Quizzes', 'quiz_id')
+    attempts = db.create_table('Attempts', 'attempt_id')
+    for q in range(QUIZ_COUNT):
+        quiz = make_quiz(10, seed=q)
+        quizzes.put_item(Item={'quiz_id': f'quiz-{q}', 'user_id': 'student',
+                               'quiz_content': quiz_codec.encode(quiz), 'answer_key': answer_key.build(quiz)})
+    ids = []
+    for i in range(attempt_count):
+        attempts.put_item(Item={'attempt_id': f'attempt-{i}', 'quiz_id': f'quiz-{rng.randrange(QUIZ_COUNT)}',
+                                'user_id': 'student', 'score': rng.randrange(11), 'max_score': 10,
+                                'total_questions': 10, 'answers': {str(q): 'x' for q in range(10)}})
+        ids.append(f'attempt-{i}')
+    return db, ids
+
+
+def run(db, fn):
+    db.stats.reset()
+    start = time.perf_counter()
+    fn()
+    return {'calls': db.stats.calls, 'wall_ms': (time.perf_counter() - start) * 1000,
+            'modeled_ms': db.stats.modeled_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--attempts', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--latency-ms', type=float, default=4.0)
+    parser.add_argument('--unprocessed-rate', type=float, default=0.2)
+    args = parser.parse_args()
+
+    os.environ['QUIZZES_TABLE'] = 'Quizzes'
+    os.environ['ATTEMPTS_TABLE'] = 'Attempts'
+    get_attempt = _support.load_handler('get_attempt')
+    claims = {'authorizer': {'claims': {'sub': 'student'}}}
+
+    rows = []
+    for count in args.attempts:
+        db, ids = build(count, args.latency_ms, 0.0)
+        get_attempt.dynamodb = db
+
+        def one_by_one():
+            return [json.loads(get_attempt.lambda_handler(
+                {'pathParameters': {'attempt_id': a}, 'requestContext': claims}, None)['body']) for a in ids]
+
+        rows.append((f'{count:>4} attempts, sequential GET /attempt/{{id}}', run(db, one_by_one)))
+        expected = one_by_one()
+
+        for rate in (0.0, args.unprocessed_rate):
+            db, ids = build(count, args.latency_ms, rate)
+            get_attempt.dynamodb = db
+            event = {'queryStringParameters': {'ids': ','.join(ids)}, 'requestContext': claims}
+            result = {}
+            rows.append((f'{count:>4} attempts, GET /attempt?ids ({rate:.0%} unprocessed)',
+                         run(db, lambda: result.update(json.loads(get_attempt.lambda_handler(event, None)['body'])))))
+            assert result['attempts'] == expected
+    _support.print_table(f"Attempt history load ({args.latency_ms} ms simulated round trip)", rows)
+
+
+if __name__ == '__main__':
+    main()
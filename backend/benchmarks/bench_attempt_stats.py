@@ -0,0 +1,121 @@
+"""Attempt rollups: stream aggregation cost and the profile read it replaces.
+
+Feeds a stream of new attempts (one hot quiz among many) through
+attempt_aggregator in 500-record batches against the local DynamoDB
+stand-in, checks the rollups against a recomputation from the raw rows,
+and replays every batch to show the counts do not move. Then compares
+computing a user's stats from their attempt rows with reading the one
+AttemptStats item profile now returns.
+
+    cd backend && python benchmarks/bench_attempt_stats.py --attempts 2000 20000
+"""
+import os
+import time
+import random
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from quizcraft import attempt_stats
+
+BATCH_SIZE = 500
+
+
+def build(attempt_count, seed=0):
+    rng = random.Random(seed)
+    db = LocalDynamoDB()
+    quizzes = db.create_table('Quizzes', 'quiz_id')
+    attempts = db.create_table('Attempts', 'attempt_id',
+                               indexes={'UserCreatedAtIndex': ('user_id', 'created_at')}, stream=True)
+    db.create_table('AttemptStats', 'stats_key')
+    for q in range(50):
+        quizzes.put_item(Item={'quiz_id': f'quiz-{q}', 'user_id': 'teacher', 'attempt_count': 0})
+    for i in range(attempt_count):
+        # A third of submissions go to one hot classroom quiz
+        quiz_id = 'quiz-0' if rng.random() < 0.33 else f'quiz-{rng.randrange(1, 50)}'
+        max_score = rng.choice([5, 10, 20])
+        attempts.put_item(Item={
+            'attempt_id': f'attempt-{i}', 'quiz_id': quiz_id, 'user_id': f'user-{rng.randrange(attempt_count // 20 + 1)}',
+            'score': rng.randrange(max_score + 1), 'max_score': max_score, 'total_questions': max_score,
+            'answers': {}, 'created_at': f'2025-01-01T00:00:{i:08d}Z',
+        })
+    return db
+
+
+def recompute(db):
+    """Rollups from scratch, as an analytics scan over Attempts would."""
+    rows = [item for item in db.Table('Attempts')._items.values()]
+    return attempt_stats.rollups(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--attempts', type=int, nargs='+', default=[2000, 20000])
+    args = parser.parse_args()
+
+    os.environ['QUIZZES_TABLE'] = 'Quizzes'
+    os.environ['ATTEMPTS_TABLE'] = 'Attempts'
+    os.environ['STATS_TABLE'] = 'AttemptStats'
+    aggregator = _support.load_handler('attempt_aggregator')
+
+    rows = []
+    for count in args.attempts:
+        db = build(count)
+        aggregator.dynamodb = db
+        attempts, stats_table = db.Table('Attempts'), db.Table('AttemptStats')
+        inserts = [r for r in attempts.stream if r['eventName'] == 'INSERT']
+        batches = [inserts[i:i + BATCH_SIZE] for i in range(0, len(inserts), BATCH_SIZE)]
+
+        db.stats.reset()
+        start = time.perf_counter()
+        for batch in batches:
+            assert not aggregator.lambda_handler({'Records': batch}, None)['batchItemFailures']
+        rows.append((f'{count:>6} attempts, aggregate stream', {
+            'calls': db.stats.calls, 'calls_per_attempt': db.stats.calls / count,
+            'read_kb': db.stats.read_bytes // 1024, 'wall_ms': (time.perf_counter() - start) * 1000,
+        }))
+
+        expected = recompute(db)
+        for key, delta in expected.items():
+            item = stats_table.get_item(Key={'stats_key': key})['Item']
+            assert item['attempts'] == delta['attempts'] and item['percent_sum'] == delta['percent_sum'], key
+            assert item['best_percent'] == delta['best_percent'], key
+
+        db.stats.reset()
+        start = time.perf_counter()
+        for batch in batches:
+            aggregator.lambda_handler({'Records': batch}, None)
+        rows.append((f'{count:>6} attempts, replay every batch', {
+            'calls': db.stats.calls, 'calls_per_attempt': db.stats.calls / count,
+            'read_kb': db.stats.read_bytes // 1024, 'wall_ms': (time.perf_counter() - start) * 1000,
+        }))
+        hot = stats_table.get_item(Key={'stats_key': attempt_stats.quiz_key('quiz-0')})['Item']
+        assert hot['attempts'] == expected[attempt_stats.quiz_key('quiz-0')]['attempts']
+
+        # The busiest user's stats: from their rows vs the summary item
+        user_id = max((d for d in expected.values() if d['scope'] == 'user'), key=lambda d: d['attempts'])['subject_id']
+        for label, fn in [
+            ('user stats from attempt rows', lambda: attempt_stats.rollups(attempts.query(
+                IndexName='UserCreatedAtIndex', KeyConditionExpression='user_id = :uid',
+                ExpressionAttributeValues={':uid': user_id})['Items'])),
+            ('user stats from AttemptStats', lambda: attempt_stats.summary(stats_table.get_item(
+                Key={'stats_key': attempt_stats.user_key(user_id)})['Item'])),
+        ]:
+            db.stats.reset()
+            start = time.perf_counter()
+            fn()
+            rows.append((f'{count:>6} attempts, {label}', {
+                'calls': db.stats.calls, 'calls_per_attempt': 0.0,
+                'read_kb': db.stats.read_bytes // 1024, 'wall_ms': (time.perf_counter() - start) * 1000,
+            }))
+        db.stats.reset()
+        start = time.perf_counter()
+        recompute(db)
+        rows.append((f'{count:>6} attempts, analytics full-table recompute', {
+            'calls': 0, 'calls_per_attempt': 0.0,
+            'read_kb': sum(attempts._sizes.values()) // 1024, 'wall_ms': (time.perf_counter() - start) * 1000,
+        }))
+    _support.print_table("Attempt stats aggregation", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Cold start per request type: handler import time and first-invocation latency.
+
+Each row runs in a fresh interpreter under ``python -X importtime``: import
+the handler the way Lambda does, then invoke it once for one request type
+against local DynamoDB tables and S3/SQS stand-ins. The boto3 clients
+are still built (nothing is sent), as loading their models is part of the
+cost. ``import_ms`` and ``first_call_ms`` are wall times, best of --runs
+since other load on the machine only adds to them; ``modules`` counts
+what each phase imported and ``heavy`` names the top-level imports that took more than
+--heavy-ms, from the importtime report.
+
+    cd backend && python benchmarks/bench_cold_start.py --runs 5
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+import _support
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+REQUESTS = {
+    'generate_quiz': ('topic', 'regenerate', 'pdf'),
+    'quiz_generator': ('topic',),
+}
+
+# Runs in the child interpreter; prints markers to stderr so the importtime
+# report can be split into the import and first-invocation phases.
+CHILD = r'''
+import sys, json, time
+sys.path.insert(0, HERE)
+import _support
+from bench_cold_start import setup_request
+function, request = sys.argv[1], sys.argv[2]
+print("## import", file=sys.stderr, flush=True)
+start = time.perf_counter()
+handler = _support.load_handler(function)
+imported = time.perf_counter()
+event, context = setup_request(handler, function, request)
+print("## invoke", file=sys.stderr, flush=True)
+invoke_start = time.perf_counter()
+result = handler.lambda_handler(event, context)
+done = time.perf_counter()
+print("## end", file=sys.stderr, flush=True)
+if result.get('statusCode', 200) != 200 or result.get('batchItemFailures'):
+    sys.exit(f"{function} {request} failed: {result}")
+print(json.dumps({'import_ms': (imported - start) * 1000, 'first_call_ms': (done - invoke_start) * 1000}))
+'''
+
+
+class LocalS3:
+    def put_object(self, **kwargs):
+        return {}
+
+    def get_object(self, Bucket, Key):
+        raise KeyError(Key)
+
+
+class LocalSQS:
+    def send_message(self, **kwargs):
+        return {}
+
+
+class LocalSNS:
+    def publish(self, **kwargs):
+        return {}
+
+
+def setup_request(handler, function, request):
+    """Install local stand-ins for the loaded handler and build the event for one request type."""
+    from local_dynamodb import LocalDynamoDB
+    from quizcraft import runtime
+    db = LocalDynamoDB()
+    db.create_table('Quizzes', 'quiz_id')
+    topics = db.create_table('Topics', 'user_id', 'topic_id',
+                             indexes={'UniqueSourceIndex': ('user_id', 'source_identifier')})
+    db.create_table('TopicNames', 'user_id', 'name_key')
+    local_clients = {'s3': LocalS3(), 'sqs': LocalSQS(), 'sns': LocalSNS()}
+    boto3_client, boto3_table = runtime.client, runtime.table
+
+    # The real boto3 client or resource is still built, since loading its
+    # service model is part of the cold start; requests then go to the stand-ins
+    def client(service_name):
+        boto3_client(service_name)
+        return local_clients[service_name]
+
+    def table(table_name):
+        boto3_table(table_name)
+        return db.Table(table_name)
+    runtime.client, runtime.table = client, table
+    if hasattr(handler, 'sns'):
+        handler.sns = local_clients['sns']
+    claims = {'requestContext': {'authorizer': {'claims': {'sub': 'u1'}}}}
+    if function == 'quiz_generator':
+        db.Table('Quizzes').put_item(Item={'quiz_id': 'q1', 'user_id': 'u1', 'status': 'pending'})
+        body = json.dumps({'quiz_id': 'q1', 'user_id': 'u1', 'source': 'topic', 'topic_name': 'Glaciers'})
+        return {'Records': [{'messageId': 'm1', 'body': body}]}, None
+    if request == 'topic':
+        return dict(claims, body=json.dumps({'topic': 'Glaciers'}),
+                    headers={'Content-Type': 'application/json'}), None
+    if request == 'regenerate':
+        topics.put_item(Item={'user_id': 'u1', 'topic_id': 't1', 'name': 'Glaciers', 'source': 'topic',
+                              'source_identifier': 'topic_Glaciers'})
+        return dict(claims, body=json.dumps({'regenerate': True, 'topic_id': 't1'}),
+                    headers={'Content-Type': 'application/json'}), None
+    import base64
+    boundary = '----QuizCraftColdStart'
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="pdf"; filename="notes.pdf"\r\n'
+            'Content-Type: application/pdf\r\n\r\n').encode() + _support.make_text_pdf(2) + \
+        f'\r\n--{boundary}--\r\n'.encode()
+    return dict(claims, body=base64.b64encode(body).decode('ascii'), isBase64Encoded=True,
+                headers={'Content-Type': f'multipart/form-data; boundary={boundary}'}), None
+
+
+def parse_importtime(stderr, heavy_ms):
+    """Per phase: modules imported and the top-level imports slower than heavy_ms."""
+    phases, phase = {}, None
+    for line in stderr.splitlines():
+        if line.startswith('## '):
+            phase = line[3:]
+            phases[phase] = {'modules': 0, 'heavy': []}
+            continue
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)', line)
+        if not match or phase is None:
+            continue
+        phases[phase]['modules'] += 1
+        if len(match.group(3)) == 1 and int(match.group(2)) > heavy_ms * 1000:
+            phases[phase]['heavy'].append(f"{match.group(4)}({int(match.group(2)) // 1000})")
+    return phases
+
+
+def cold_start(function, request, heavy_ms):
+    env = dict(os.environ, S3_BUCKET='bench', SQS_QUEUE_URL='bench', QUIZZES_TABLE='Quizzes',
+               TOPICS_TABLE='Topics', TOPIC_NAMES_TABLE='TopicNames', SNS_TOPIC_ARN='arn:bench',
+               LLM_BACKEND='stub', LLM_STUB_TIME_SCALE='0', QUIZ_CACHE_BACKEND='none',
+               PYTHONPATH=HERE)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD.replace('HERE', repr(HERE)),
+                           function, request], capture_output=True, text=True, env=env, cwd=HERE)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr[-2000:])
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(proc.stderr, heavy_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--heavy-ms', type=float, default=15.0)
+    args = parser.parse_args()
+
+    rows, heavy = [], {}
+    for function, requests in REQUESTS.items():
+        for request in requests:
+            samples = [cold_start(function, request, args.heavy_ms) for _ in range(args.runs)]
+            phases = samples[-1][1]
+            label = f'{function} {request}'
+            rows.append((label, {
+                'import_ms': min(t['import_ms'] for t, _ in samples),
+                'first_call_ms': min(t['first_call_ms'] for t, _ in samples),
+                'import_modules': phases['import']['modules'],
+                'call_modules': phases['invoke']['modules'],
+            }))
+            heavy[label] = phases['import']['heavy'] + phases['invoke']['heavy']
+    _support.print_table(f"Cold start, best of {args.runs} fresh interpreters", rows)
+    print(f"Top-level imports over {args.heavy_ms:.0f} ms (cumulative ms):")
+    for label, names in heavy.items():
+        print(f"  {label}: {', '.join(names) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Replay duplicated SQS deliveries and API retries; check each quiz is generated exactly once.
+
+Runs quiz_generator.lambda_handler on batches in which every message
+appears --copies times, shuffled across batches that run concurrently,
+against a local Quizzes table, llm.StubClient and an SNS stand-in. Before
+the pending -> generating claim, every copy made its own LLM call and sent
+its own email. Then checks that a claim left by a dead worker is taken over
+once its lease expires, and that generate_quiz answers repeated
+Idempotency-Key requests with one quiz and one queued message. Exits
+non-zero if any check fails.
+
+    cd backend && python benchmarks/bench_duplicate_delivery.py --quizzes 50 --copies 3
+"""
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import _support
+from local_dynamodb import LocalDynamoDB
+from quizcraft import runtime, quiz_cache, llm
+
+
+class CountingSNS:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = {}
+
+    def publish(self, Message, **kwargs):
+        quiz_id = re.search(r'ID: ([\w-]+)', Message).group(1)
+        with self.lock:
+            self.sent[quiz_id] = self.sent.get(quiz_id, 0) + 1
+
+
+class LocalSQS:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, QueueUrl, MessageBody):
+        self.messages.append(json.loads(MessageBody))
+
+
+def counting_stub(time_scale):
+    """StubClient that also counts completions per topic named in the prompt."""
+    lock = threading.Lock()
+    calls = {}
+
+    def reply(prompt):
+        topic = re.search(r'about (quiz-\d+)', prompt).group(1)
+        with lock:
+            calls[topic] = calls.get(topic, 0) + 1
+        return llm.stub_reply(prompt)
+    stub = llm.StubClient(reply=reply, time_scale=time_scale)
+    stub.emit_metrics = lambda: None
+    return stub, calls
+
+
+def replay(generator, quizzes, copies, batch_size, time_scale, seed):
+    db = LocalDynamoDB()
+    table = db.create_table('Quizzes', 'quiz_id')
+    runtime._tables['Quizzes'] = table
+    records = []
+    for i in range(quizzes):
+        quiz_id = f"quiz-{i}"
+        table.put_item(Item={'quiz_id': quiz_id, 'user_id': 'u1', 'status': 'pending'})
+        body = json.dumps({'quiz_id': quiz_id, 'user_id': 'u1', 'topic_id': 't', 'source': 'topic',
+                           'topic_name': quiz_id})
+        records += [{'messageId': f"{quiz_id}-{c}", 'body': body} for c in range(copies)]
+    random.Random(seed).shuffle(records)
+    batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+
+    generator.llm_client, calls = counting_stub(time_scale)
+    generator.sns = CountingSNS()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+        results = list(pool.map(lambda batch: generator.lambda_handler({'Records': batch}, None), batches))
+    completed = sum(1 for i in range(quizzes)
+                    if table.get_item(Key={'quiz_id': f"quiz-{i}"})['Item']['status'] == 'completed')
+    return {
+        'deliveries': len(records),
+        'llm_calls': sum(calls.values()),
+        'max_calls_per_quiz': max(calls.values()),
+        'emails': sum(generator.sns.sent.values()),
+        'completed': completed,
+        'failed_records': sum(len(r['batchItemFailures']) for r in results),
+        'wall_ms': (time.perf_counter() - start) * 1000,
+    }
+
+
+def stale_takeover(generator, time_scale):
+    """A claim from a worker that died is taken over once, after its lease."""
+    db = LocalDynamoDB()
+    table = db.create_table('Quizzes', 'quiz_id')
+    runtime._tables['Quizzes'] = table
+    table.put_item(Item={'quiz_id': 'quiz-0', 'user_id': 'u1', 'status': 'generating', 'generation_id': 'dead',
+                         'claimed_at': int(time.time())})
+    record = {'messageId': 'm', 'body': json.dumps({'quiz_id': 'quiz-0', 'user_id': 'u1', 'source': 'topic',
+                                                    'topic_name': 'quiz-0'})}
+    generator.llm_client, calls = counting_stub(time_scale)
+    generator.sns = CountingSNS()
+    generator.process_record(record, 'arn:bench')
+    within_lease = sum(calls.values())
+    table.update_item(Key={'quiz_id': 'quiz-0'}, UpdateExpression="SET claimed_at = :t",
+                      ExpressionAttributeValues={':t': int(time.time()) - generator.GENERATION_LEASE_SECONDS - 1})
+    generator.process_record(record, 'arn:bench')
+    generator.process_record(record, 'arn:bench')
+    return {
+        'calls_within_lease': within_lease,
+        'calls_after_lease': sum(calls.values()) - within_lease,
+        'emails': sum(generator.sns.sent.values()),
+        'status': table.get_item(Key={'quiz_id': 'quiz-0'})['Item']['status'],
+    }
+
+
+def api_retries(uploader, requests, concurrent):
+    """POST the same topic `requests` times with one Idempotency-Key."""
+    db = LocalDynamoDB()
+    quizzes = db.create_table('Quizzes', 'quiz_id')
+    db.create_table('Topics', 'user_id', 'topic_id', indexes={'UniqueSourceIndex': ('user_id', 'source_identifier')})
+    db.create_table('TopicNames', 'user_id', 'name_key')
+    runtime._tables.update({name: db.Table(name) for name in ('Quizzes', 'Topics', 'TopicNames')})
+    sqs = LocalSQS()
+    runtime._clients.update({'sqs': sqs, 's3': None})
+    event = {'body': json.dumps({'topic': 'Glaciers'}),
+             'headers': {'Content-Type': 'application/json', 'Idempotency-Key': 'click-1'},
+             'requestContext': {'authorizer': {'claims': {'sub': 'u1'}}}}
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=requests) as pool:
+            responses = list(pool.map(lambda _: uploader.lambda_handler(event, None), range(requests)))
+    else:
+        responses = [uploader.lambda_handler(event, None) for _ in range(requests)]
+    quiz_ids = {json.loads(r['body']).get('quiz_id') for r in responses}
+    return {
+        'requests': requests,
+        'ok': sum(1 for r in responses if r['statusCode'] == 200),
+        'quiz_ids': len(quiz_ids),
+        'quiz_items': len(quizzes.scan()['Items']),
+        'queued': len(sqs.messages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quizzes', type=int, default=50)
+    parser.add_argument('--copies', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--time-scale', type=float, default=0.05)
+    args = parser.parse_args()
+
+    for name, value in (('S3_BUCKET', 'bench'), ('SQS_QUEUE_URL', 'bench'), ('QUIZZES_TABLE', 'Quizzes'),
+                        ('TOPICS_TABLE', 'Topics'), ('TOPIC_NAMES_TABLE', 'TopicNames'),
+                        ('SNS_TOPIC_ARN', 'arn:bench'), ('LOG_LEVEL', 'ERROR')):
+        _support.os.environ[name] = value
+    generator = _support.load_handler('quiz_generator')
+    generator.cache = quiz_cache.QuizCache(quiz_cache.NullBackend())
+    generator.cache.emit_metrics = lambda: None
+    uploader = _support.load_handler('generate_quiz')
+    logging.getLogger().setLevel(logging.ERROR)
+
+    delivered = replay(generator, args.quizzes, args.copies, args.batch_size, args.time_scale, seed=1)
+    _support.print_table(f"{args.quizzes} quizzes, each message delivered {args.copies} times "
+                         f"in batches of {args.batch_size}", [('replayed deliveries', delivered)])
+    takeover = stale_takeover(generator, args.time_scale)
+    _support.print_table("Claim left by a dead worker", [('redeliveries', takeover)])
+    rows = [('sequential retries', api_retries(uploader, 3, False)),
+            ('concurrent double-submit', api_retries(uploader, 4, True))]
+    _support.print_table("POST /quiz with one Idempotency-Key", rows)
+
+    failures = []
+    if delivered['llm_calls'] != args.quizzes or delivered['max_calls_per_quiz'] != 1:
+        failures.append("a quiz was generated more than once")
+    if delivered['emails'] != args.quizzes or delivered['completed'] != args.quizzes:
+        failures.append("not every quiz completed with exactly one email")
+    if takeover['calls_within_lease'] or takeover['calls_after_lease'] != 1 or takeover['emails'] != 1:
+        failures.append("stale claim was not taken over exactly once")
+    for label, stats in rows:
+        if stats['quiz_ids'] != 1 or stats['quiz_items'] != 1 or stats['queued'] != 1:
+            failures.append(f"{label}: expected one quiz and one queued message")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK: exactly one generation per quiz" if not failures else "")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
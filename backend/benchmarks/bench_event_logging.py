@@ -0,0 +1,114 @@
+"""Per-invocation cost of logging the Lambda event: json.dumps(event) vs request_log.
+
+Logs API Gateway and SQS events through a handler that formats records
+like the Lambda runtime and writes them to /dev/null. A --size-mb PDF
+upload arrives base64-encoded in the body. ``ms`` is the mean time of the
+logging statement, ``peak_kb`` the extra memory it allocates (tracemalloc,
+measured separately) and ``logged_kb`` the size of the record sent to
+CloudWatch, whose limit is 256 KB per event.
+
+    cd backend && python benchmarks/bench_event_logging.py --size-mb 10
+"""
+import os
+import json
+import base64
+import logging
+import argparse
+import tracemalloc
+import _support
+from quizcraft import request_log
+
+LAMBDA_FORMAT = '[%(levelname)s]\t%(asctime)s.%(msecs)03dZ\t%(aws_request_id)s\t%(message)s\n'
+
+
+class LambdaHandler(logging.StreamHandler):
+    """Formats records like the Lambda runtime and keeps the size of the last one."""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.setFormatter(logging.Formatter(LAMBDA_FORMAT, '%Y-%m-%dT%H:%M:%S'))
+        self.last_bytes = 0
+
+    def emit(self, record):
+        record.aws_request_id = 'bench'
+        message = self.format(record)
+        self.last_bytes = len(message.encode('utf-8'))
+        self.stream.write(message)
+
+
+def upload_event(size_mb):
+    boundary = '----QuizCraftLogBench'
+    pdf = _support.make_text_pdf(1) + b'0' * int(size_mb * 1024 * 1024)
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="pdf"; filename="notes.pdf"\r\n'
+            'Content-Type: application/pdf\r\n\r\n').encode() + pdf + f'\r\n--{boundary}--\r\n'.encode()
+    return {
+        'resource': '/quiz', 'path': '/quiz', 'httpMethod': 'POST', 'isBase64Encoded': True,
+        'headers': {'Content-Type': f'multipart/form-data; boundary={boundary}',
+                    'Authorization': 'eyJraWQiOi' + 'x' * 900, 'Idempotency-Key': 'click-1'},
+        'requestContext': {'requestId': 'r1', 'authorizer': {'claims': {
+            'sub': 'u1', 'email': 'user@example.com', 'cognito:username': 'user'}}},
+        'body': base64.b64encode(body).decode('ascii'),
+    }
+
+
+def sqs_event(messages):
+    body = json.dumps({'quiz_id': 'q1', 'user_id': 'u1', 'topic_id': 't1', 'source': 'pdf',
+                       'topic_name': 'Notes', 's3_key': 'quizzes/q1.pdf', 'text_key': 'text/abc.txt.gz'})
+    return {'Records': [{'messageId': f'm{i}', 'body': body, 'attributes': {'ApproximateReceiveCount': '1'},
+                         'eventSource': 'aws:sqs'} for i in range(messages)]}
+
+
+def list_event():
+    return {'resource': '/quiz', 'path': '/quiz', 'httpMethod': 'GET', 'body': None,
+            'headers': {'Authorization': 'eyJraWQiOi' + 'x' * 900},
+            'queryStringParameters': {'limit': '20'},
+            'requestContext': {'authorizer': {'claims': {'sub': 'u1', 'email': 'user@example.com'}}}}
+
+
+def before(logger, event):
+    logger.info(f"Event: {json.dumps(event)}")
+
+
+def after(logger, event):
+    request_log.log_event(logger, event)
+
+
+def run(logger, handler, statement, event, level, iterations):
+    logger.setLevel(level)
+    handler.last_bytes = 0
+    stats = _support.measure(lambda: statement(logger, event), iterations=iterations, warmup=1)
+    tracemalloc.start()
+    statement(logger, event)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'ms': stats['mean_ms'], 'peak_kb': peak / 1024, 'logged_kb': handler.last_bytes / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=10.0)
+    parser.add_argument('--messages', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    logger = logging.getLogger('bench_event_logging')
+    logger.propagate = False
+    handler = LambdaHandler(open(os.devnull, 'w'))
+    logger.addHandler(handler)
+
+    events = [(f'{args.size_mb:g} MB upload', upload_event(args.size_mb)),
+              (f'{args.messages}-message SQS batch', sqs_event(args.messages)),
+              ('quiz list', list_event())]
+    rows = []
+    for label, event in events:
+        rows.append((f'{label}, json.dumps', run(logger, handler, before, event, logging.INFO, args.iterations)))
+        rows.append((f'{label}, json.dumps at WARNING',
+                     run(logger, handler, before, event, logging.WARNING, args.iterations)))
+        rows.append((f'{label}, request_log', run(logger, handler, after, event, logging.INFO, args.iterations)))
+        rows.append((f'{label}, request_log at WARNING',
+                     run(logger, handler, after, event, logging.WARNING, args.iterations)))
+    _support.print_table("Logging the event once per invocation", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""LLM calls through the openai module directly vs llm.OpenAIClient, against a local fake API.
+
+A threaded HTTP/1.1 server on localhost speaks the chat completions API
+(plain and streamed) and answers a share of requests with 429 or 503.
+The "direct" rows call openai.ChatCompletion.create as the handlers used
+to: no retry, no deadline. ``connections`` counts TCP connections the
+server accepted. The stall rows hold every response for --stall-s to show
+how long each path waits with a --deadline-s invocation deadline.
+
+    cd backend && python benchmarks/bench_llm_client.py --calls 200 --error-rate 0.1
+"""
+import json
+import time
+import random
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import _support
+import openai
+from quizcraft import runtime, llm
+
+MESSAGES = [{"role": "user", "content": "Generate a quiz with 5 multiple-choice questions about glaciers."}]
+
+
+class FakeOpenAI(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, error_rate, latency_ms, seed=0):
+        super().__init__(('127.0.0.1', 0), FakeOpenAIHandler)
+        self.error_rate = error_rate
+        self.latency_ms = latency_ms
+        self.stall_s = 0.0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def api_base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            roll = server.rng.random()
+        time.sleep(server.latency_ms / 1000 + server.stall_s)
+        if roll < server.error_rate:
+            status = 429 if roll < server.error_rate * 0.7 else 503
+            self._send(status, {'error': {'message': 'Rate limit reached' if status == 429 else 'Overloaded',
+                                          'type': 'requests', 'code': None, 'param': None}})
+            return
+        content = llm.stub_reply(body['messages'][-1]['content'])
+        if not body.get('stream'):
+            self._send(200, {
+                'id': 'chatcmpl-bench', 'object': 'chat.completion', 'model': body['model'],
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 20, 'completion_tokens': len(content) // 4, 'total_tokens': 20 + len(content) // 4},
+            })
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+        for piece in pieces + [None]:
+            chunk = {'id': 'chatcmpl-bench', 'object': 'chat.completion.chunk', 'model': body['model'],
+                     'choices': [{'index': 0, 'delta': {'content': piece} if piece else {},
+                                  'finish_reason': None if piece else 'stop'}]}
+            self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+    def _chunk(self, data):
+        self.wfile.write(b'%x\r\n' % len(data) + data + b'\r\n')
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def run(server, call, calls, workers):
+    """Make ``calls`` calls on ``workers`` threads; latencies in ms and failures."""
+    server.connections = 0
+    latencies, failures = [], []
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            call()
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            failures.append(e)
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, range(calls)))
+    ordered = sorted(latencies) or [0.0]
+    return {
+        'ok': len(latencies),
+        'failed': len(failures),
+        'connections': server.connections,
+        'p50_ms': statistics.median(ordered),
+        'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        'wall_ms': (time.perf_counter() - wall) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=10)
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--stall-s', type=float, default=5.0)
+    parser.add_argument('--deadline-s', type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = FakeOpenAI(args.error_rate, args.latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    runtime.get_openai_api_key = lambda: 'sk-benchmark'
+
+    def direct():
+        openai.ChatCompletion.create(model=llm.MODEL, messages=MESSAGES, max_tokens=500, temperature=0.7,
+                                     api_key='sk-benchmark', api_base=server.api_base)
+
+    # The direct rows go first: OpenAIClient installs its shared session in the openai module
+    rows = [('direct ChatCompletion.create', run(server, direct, args.calls, args.workers))]
+    stall_calls = args.workers
+    server.error_rate, server.stall_s = 0.0, args.stall_s
+    rows.append((f'direct, server stalls {args.stall_s:.0f}s', run(server, direct, stall_calls, args.workers)))
+    server.error_rate, server.stall_s = args.error_rate, 0.0
+
+    client = llm.OpenAIClient(api_base=server.api_base, pool_connections=args.workers, retry_base_delay=0.05)
+    rows.append(('llm.OpenAIClient', run(server, lambda: client.complete(MESSAGES, max_tokens=500),
+                                         args.calls, args.workers)))
+    rows.append(('llm.OpenAIClient, streamed', run(server, lambda: client.complete(
+        MESSAGES, max_tokens=500, on_delta=lambda text: None), args.calls, args.workers)))
+    stats = client.stats()
+    print(f"OpenAIClient: {stats['calls']} calls, {stats['retries']} retries, {stats['failures']} failures, "
+          f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens")
+
+    server.error_rate, server.stall_s = 0.0, args.stall_s
+    rows.append((f'OpenAIClient, {args.deadline_s:.0f}s deadline', run(server, lambda: client.complete(
+        MESSAGES, max_tokens=500, deadline=time.monotonic() + args.deadline_s), stall_calls, args.workers)))
+    server.shutdown()
+    _support.print_table(f"LLM calls ({args.calls} calls on {args.workers} threads, "
+                         f"{args.error_rate:.0%} 429/503, {args.latency_ms:.0f} ms server latency)", rows)
+
+
+if __name__ == '__main__':
+    main()
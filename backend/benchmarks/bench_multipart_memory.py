@@ -0,0 +1,91 @@
+"""Peak memory of parsing a base64 multipart PDF upload: cgi.FieldStorage vs quizcraft.multipart.
+
+The request body string (what API Gateway hands to Lambda) is built before
+measuring, so the numbers are the extra memory each parser allocates.
+
+    cd backend && python benchmarks/bench_multipart_memory.py --sizes 1 5 10 25 50
+"""
+import os
+import gc
+import time
+import base64
+import hashlib
+import argparse
+import warnings
+import tracemalloc
+from io import BytesIO
+import _support  # noqa: F401
+from quizcraft import multipart
+
+BOUNDARY = '----QuizCraftBenchmarkBoundary'
+CONTENT_TYPE = f'multipart/form-data; boundary={BOUNDARY}'
+
+
+def build_event_body(size_mb):
+    pdf = b'%PDF-1.4\n' + os.urandom(size_mb * 1024 * 1024)
+    body = (
+        f'--{BOUNDARY}\r\n'
+        'Content-Disposition: form-data; name="pdf"; filename="upload.pdf"\r\n'
+        'Content-Type: application/pdf\r\n\r\n'
+    ).encode() + pdf + f'\r\n--{BOUNDARY}--\r\n'.encode()
+    return base64.b64encode(body).decode('ascii'), hashlib.sha256(pdf).hexdigest()
+
+
+def parse_with_cgi(body_raw):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        import cgi
+    body_bytes = base64.b64decode(body_raw)
+    environ = {
+        'REQUEST_METHOD': 'POST',
+        'CONTENT_TYPE': CONTENT_TYPE,
+        'CONTENT_LENGTH': len(body_bytes),
+    }
+    form = cgi.FieldStorage(fp=BytesIO(body_bytes), environ=environ)
+    pdf_data = form['pdf'].file.read()
+    return hashlib.sha256(pdf_data).hexdigest()
+
+
+def parse_streaming(body_raw):
+    form = multipart.parse_form(body_raw, CONTENT_TYPE, is_base64=True, hash_fields=('pdf',))
+    return form['pdf'].sha256
+
+
+def profile(fn, body_raw):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    digest = fn(body_raw)
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return digest, {'peak_mb': peak / (1024 * 1024), 'time_ms': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 5, 10, 25, 50], help='PDF sizes in MB')
+    args = parser.parse_args()
+
+    try:
+        import cgi  # noqa: F401  (removed in Python 3.13)
+        have_cgi = True
+    except ImportError:
+        have_cgi = False
+
+    rows = []
+    for size in args.sizes:
+        body_raw, expected = build_event_body(size)
+        if have_cgi:
+            digest, stats = profile(parse_with_cgi, body_raw)
+            assert digest == expected
+            rows.append((f'{size:>3} MB cgi.FieldStorage', stats))
+        digest, stats = profile(parse_streaming, body_raw)
+        assert digest == expected
+        rows.append((f'{size:>3} MB quizcraft.multipart', stats))
+        del body_raw
+    _support.print_table("Multipart PDF upload parsing (base64 body, tracemalloc peak)", rows)
+
+
+if __name__ == '__main__':
+    main()
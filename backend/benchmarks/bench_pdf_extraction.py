@@ -0,0 +1,71 @@
+"""PDF text extraction: the original full-document loop vs quizcraft.pdf_text.
+
+Builds a corpus of synthetic text PDFs and compares wall time and
+tracemalloc peak (parent process only) for the old loop, which parses every
+page and truncates afterwards, the bounded serial engine and the optional
+process-pool mode.
+
+    cd backend && python benchmarks/bench_pdf_extraction.py --pages 10 100 500 --workers 4
+"""
+import io
+import gc
+import time
+import argparse
+import tracemalloc
+import _support
+import PyPDF2
+from quizcraft import pdf_text
+
+
+def legacy_extract(pdf_bytes, max_chars):
+    """The pre-engine quiz_generator loop, truncating at the same budget as the engine."""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    text = ""
+    for page in pdf_reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text
+    return text[:max_chars]
+
+
+def profile(fn):
+    """Time fn, then run it again under tracemalloc (which slows PyPDF2 down a lot)."""
+    gc.collect()
+    start = time.perf_counter()
+    text = fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, {'time_ms': elapsed, 'peak_mb': peak / (1024 * 1024)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-chars', type=int, default=pdf_text.MAX_TEXT_CHARS)
+    args = parser.parse_args()
+
+    rows = []
+    for page_count in args.pages:
+        pdf_bytes = _support.make_text_pdf(page_count)
+        expected, stats = profile(lambda: legacy_extract(pdf_bytes, args.max_chars))
+        rows.append((f'{page_count:>4} pages legacy loop', stats))
+        text, stats = profile(lambda: pdf_text.extract_text(pdf_bytes, args.max_chars, workers=0))
+        assert text == expected
+        rows.append((f'{page_count:>4} pages bounded serial', stats))
+        text, stats = profile(lambda: pdf_text.extract_text(pdf_bytes, args.max_chars, workers=args.workers))
+        assert text == expected
+        rows.append((f'{page_count:>4} pages bounded pool x{args.workers}', stats))
+        # Without a budget, to show raw page throughput of each mode
+        _, stats = profile(lambda: pdf_text.extract_text(pdf_bytes, None, workers=0))
+        rows.append((f'{page_count:>4} pages full serial', stats))
+        _, stats = profile(lambda: pdf_text.extract_text(pdf_bytes, None, workers=args.workers))
+        rows.append((f'{page_count:>4} pages full pool x{args.workers}', stats))
+    _support.print_table(f"PDF text extraction (budget {args.max_chars} chars)", rows)
+
+
+if __name__ == '__main__':
+    main()
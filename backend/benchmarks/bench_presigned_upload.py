@@ -0,0 +1,222 @@
+"""Presigned direct-to-S3 uploads end to end, and what they save over multipart through the API.
+
+Against local DynamoDB tables, local_s3.LocalS3 and an SQS stand-in:
+generate_quiz issues the upload form, LocalS3 checks the form POST the way
+S3 does and returns the ObjectCreated event, process_upload records the
+topic and quiz and queues them, and quiz_generator (llm.StubClient)
+completes the quiz. Checks redelivered notifications, repeated PDFs with
+and without the browser's hash, Idempotency-Key replays and the policy's
+size, type and key conditions; exits non-zero if any fails.
+
+The table compares a --size-mb PDF sent both ways: ``api_kb`` is the
+request API Gateway carries (its payload limit is 10 MB), ``lambda_peak_kb``
+the memory generate_quiz allocates for it (tracemalloc) and
+``process_peak_kb`` the same for process_upload.
+
+    cd backend && python benchmarks/bench_presigned_upload.py --size-mb 10
+"""
+import sys
+import json
+import base64
+import hashlib
+import argparse
+import tracemalloc
+import _support
+from local_dynamodb import LocalDynamoDB
+from local_s3 import LocalS3, UploadRejected
+from quizcraft import runtime, quiz_cache, llm
+
+BUCKET = 'quizcraft-pdfs'
+BOUNDARY = '----QuizCraftBenchmarkBoundary'
+
+
+class LocalSQS:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, QueueUrl, MessageBody):
+        self.messages.append(json.loads(MessageBody))
+
+
+class LocalSNS:
+    def publish(self, **kwargs):
+        pass
+
+
+def api_event(body, user_id='u1', key=None):
+    headers = {'Content-Type': 'application/json'}
+    if key:
+        headers['Idempotency-Key'] = key
+    return {'body': json.dumps(body), 'headers': headers,
+            'requestContext': {'authorizer': {'claims': {'sub': user_id}}}}
+
+
+def multipart_event(pdf, user_id='u1'):
+    body = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="pdf"; filename="notes.pdf"\r\n'
+            'Content-Type: application/pdf\r\n\r\n').encode() + pdf + f'\r\n--{BOUNDARY}--\r\n'.encode()
+    return {'body': base64.b64encode(body).decode('ascii'), 'isBase64Encoded': True,
+            'headers': {'Content-Type': f'multipart/form-data; boundary={BOUNDARY}'},
+            'requestContext': {'authorizer': {'claims': {'sub': user_id}}}}
+
+
+class Flow:
+    def __init__(self, uploader, processor, generator):
+        self.uploader, self.processor, self.generator = uploader, processor, generator
+        self.db = LocalDynamoDB()
+        self.quizzes = self.db.create_table('Quizzes', 'quiz_id')
+        self.topics = self.db.create_table('Topics', 'user_id', 'topic_id',
+                                           indexes={'UniqueSourceIndex': ('user_id', 'source_identifier')})
+        self.db.create_table('TopicNames', 'user_id', 'name_key')
+        self.s3, self.sqs = LocalS3(), LocalSQS()
+        runtime._tables.clear()
+        runtime._tables.update({name: self.db.Table(name) for name in ('Quizzes', 'Topics', 'TopicNames')})
+        runtime._clients.update({'s3': self.s3, 'sqs': self.sqs})
+        generator.s3, generator.sns = self.s3, LocalSNS()
+        generator.llm_client = llm.StubClient(time_scale=0)
+        generator.llm_client.emit_metrics = lambda: None
+
+    def request_form(self, pdf, filename='Lecture notes.pdf', send_hash=True, key=None, user_id='u1'):
+        upload = {'filename': filename, 'size': len(pdf)}
+        if send_hash:
+            upload['sha256'] = hashlib.sha256(pdf).hexdigest()
+        response = self.uploader.lambda_handler(api_event({'upload': upload}, user_id, key), None)
+        return response['statusCode'], json.loads(response['body'])
+
+    def upload(self, pdf, **kwargs):
+        """Form request, browser POST and notification; returns (status, body, event)."""
+        status, body = self.request_form(pdf, **kwargs)
+        if status != 200:
+            return status, body, None
+        form = body['upload']
+        event = self.s3.post_form(form['url'], form['fields'], pdf)
+        self.processor.lambda_handler(event, None)
+        return status, body, event
+
+    def generate(self):
+        messages, self.sqs.messages = self.sqs.messages, []
+        records = [{'messageId': str(i), 'body': json.dumps(m)} for i, m in enumerate(messages)]
+        if records:
+            self.generator.lambda_handler({'Records': records}, None)
+        return len(records)
+
+    def items(self, table):
+        return table.scan()['Items']
+
+
+def check_flow(uploader, processor, generator):
+    failures = []
+    pdf, other_pdf = _support.make_text_pdf(3), _support.make_text_pdf(3, seed=1)
+
+    flow = Flow(uploader, processor, generator)
+    status, body, event = flow.upload(pdf)
+    quiz_id = body.get('quiz_id')
+    # The notification is delivered again before and after generation
+    processor.lambda_handler(event, None)
+    queued = flow.generate()
+    processor.lambda_handler(event, None)
+    quiz = flow.quizzes.get_item(Key={'quiz_id': quiz_id}).get('Item', {})
+    topics = flow.items(flow.topics)
+    if status != 200 or quiz.get('status') != 'completed':
+        failures.append(f"upload did not complete a quiz: {status} {quiz.get('status')}")
+    if len(topics) != 1 or len(flow.items(flow.quizzes)) != 1 or flow.sqs.messages:
+        failures.append("redelivered notifications created extra records or messages")
+    if topics and (topics[0].get('name_pending') or topics[0]['s3_key'] != quiz.get('s3_key')):
+        failures.append("topic was not named or does not point at the upload")
+    if generator.llm_client.calls != 1:
+        failures.append(f"{queued} queued messages made {generator.llm_client.calls} LLM calls")
+
+    status, body = flow.request_form(pdf)
+    if status != 400 or body.get('topic_id') != topics[0]['topic_id']:
+        failures.append("repeated PDF with its hash was not refused before upload")
+    objects = len(flow.s3.objects)
+    status, body, event = flow.upload(pdf, send_hash=False)
+    if len(flow.items(flow.topics)) != 1 or flow.sqs.messages or len(flow.s3.objects) != objects:
+        failures.append("repeated PDF without a hash was recorded or its upload kept")
+    # The client polls the quiz it was given; it must end up failed, not missing or pending
+    repeated = flow.quizzes.get_item(Key={'quiz_id': body.get('quiz_id')}).get('Item', {})
+    if repeated.get('status') != 'failed' or repeated.get('topic_id') != topics[0]['topic_id'] \
+            or not repeated.get('error_message'):
+        failures.append(f"repeated PDF without a hash did not fail its quiz: {repeated.get('status')}")
+
+    first = flow.request_form(other_pdf, key='click-1')[1]
+    second = flow.request_form(other_pdf, key='click-1')[1]
+    if first.get('quiz_id') != second.get('quiz_id') or \
+            first['upload']['fields']['key'] != second['upload']['fields']['key']:
+        failures.append("Idempotency-Key replay got a different upload")
+
+    form = flow.request_form(other_pdf)[1]['upload']
+    rejected = []
+    for label, fields, data in (
+            ('oversize', form['fields'], b'0' * (uploader.quiz_requests.MAX_UPLOAD_BYTES + 1)),
+            ('content type', dict(form['fields'], **{'Content-Type': 'text/html'}), other_pdf),
+            ('key', dict(form['fields'], key='uploads/someone-else/x.pdf'), other_pdf),
+            ('expired', form['fields'], other_pdf)):
+        if label == 'expired':
+            flow.s3.clock = lambda: 1e10
+        try:
+            flow.s3.post_form(form['url'], fields, data)
+        except UploadRejected:
+            rejected.append(label)
+    if len(rejected) != 4:
+        failures.append(f"policy only rejected {rejected}")
+    status, body = flow.request_form(b'0' * (uploader.quiz_requests.MAX_UPLOAD_BYTES + 1))
+    if status != 413:
+        failures.append("oversize upload request was not refused")
+    return failures
+
+
+def peak_kb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def compare(uploader, processor, generator, size_mb):
+    pdf = _support.make_text_pdf(1) + b'0' * int(size_mb * 1024 * 1024)
+    flow = Flow(uploader, processor, generator)
+    event = multipart_event(pdf)
+    multipart = {
+        'api_kb': len(event['body']) / 1024,
+        'lambda_peak_kb': peak_kb(lambda: uploader.lambda_handler(event, None)),
+        'process_peak_kb': 0.0,
+    }
+    flow = Flow(uploader, processor, generator)
+    event = api_event({'upload': {'filename': 'notes.pdf', 'size': len(pdf)}})
+    response = {}
+    presigned = {
+        'api_kb': len(event['body']) / 1024,
+        'lambda_peak_kb': peak_kb(lambda: response.update(uploader.lambda_handler(event, None))),
+    }
+    form = json.loads(response['body'])['upload']
+    created = flow.s3.post_form(form['url'], form['fields'], pdf)
+    presigned['process_peak_kb'] = peak_kb(lambda: processor.lambda_handler(created, None))
+    return [('multipart through API', multipart), ('presigned POST', presigned)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=10.0)
+    args = parser.parse_args()
+
+    for name, value in (('S3_BUCKET', BUCKET), ('SQS_QUEUE_URL', 'bench'), ('QUIZZES_TABLE', 'Quizzes'),
+                        ('TOPICS_TABLE', 'Topics'), ('TOPIC_NAMES_TABLE', 'TopicNames'),
+                        ('SNS_TOPIC_ARN', 'arn:bench'), ('LOG_LEVEL', 'ERROR')):
+        _support.os.environ[name] = value
+    uploader = _support.load_handler('generate_quiz')
+    processor = _support.load_handler('process_upload')
+    generator = _support.load_handler('quiz_generator')
+    generator.cache = quiz_cache.QuizCache(quiz_cache.NullBackend())
+    generator.cache.emit_metrics = lambda: None
+
+    _support.print_table(f"{args.size_mb:g} MB PDF", compare(uploader, processor, generator, args.size_mb))
+    failures = check_flow(uploader, processor, generator)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK: presigned uploads generate each PDF once" if not failures else "")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
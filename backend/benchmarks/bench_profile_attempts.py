@@ -0,0 +1,116 @@
+"""Load test: profile's attempt lookup as the Attempts table grows.
+
+Compares the old full-table scan (one call, as the handler did, and the
+same scan followed across every page) with the UserCreatedAtIndex query
+the profile handler now issues, against the local DynamoDB stand-in. The
+user being profiled always has the same number of attempts; only other
+users' rows grow. Their AttemptStats rollup is built with
+attempt_stats.apply, as attempt_aggregator would, and the handler's
+stats are checked against it. The handler pages both lists, so the
+profile row follows next_attempts_cursor as the frontend does and
+checks that the user's USER_QUIZZES quizzes come one page at a time.
+
+    cd backend && python benchmarks/bench_profile_attempts.py --sizes 1000 10000 100000
+"""
+import os
+import time
+import json
+import random
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from quizcraft import attempt_stats
+
+USER_ATTEMPTS = 50
+USER_QUIZZES = 120
+
+
+def build_tables(total_attempts, seed=0):
+    rng = random.Random(seed)
+    db = LocalDynamoDB()
+    quizzes = db.create_table('Quizzes', 'quiz_id', indexes={'UserIdIndex': ('user_id', 'created_at')})
+    for q in range(USER_QUIZZES):
+        quizzes.put_item(Item={'quiz_id': f'target-quiz-{q}', 'user_id': 'target-user', 'status': 'completed',
+                               'created_at': f'2024-12-01T00:00:{q:08d}Z'})
+    attempts = db.create_table('Attempts', 'attempt_id', indexes={'UserCreatedAtIndex': ('user_id', 'created_at')})
+    db.create_table('AttemptStats', 'stats_key')
+    # Spread the target user's attempts evenly through the table
+    target_rows = set(range(0, total_attempts, max(1, total_attempts // USER_ATTEMPTS))[:USER_ATTEMPTS])
+    target_attempts = []
+    for i in range(total_attempts):
+        user_id = 'target-user' if i in target_rows else f'user-{rng.randrange(total_attempts // 10 + 1)}'
+        attempt = {
+            'attempt_id': f'attempt-{i}',
+            'quiz_id': f'quiz-{rng.randrange(1000)}',
+            'user_id': user_id,
+            'score': rng.randrange(6),
+            'total_questions': 5,
+            'answers': {str(q): f'Option {rng.randrange(1, 5)}' for q in range(5)},
+            'correct_answers': {str(q): f'Option {rng.randrange(1, 5)}' for q in range(5)},
+            'created_at': f'2025-01-01T00:00:{i:08d}Z',
+        }
+        attempts.put_item(Item=attempt)
+        if user_id == 'target-user':
+            target_attempts.append(attempt)
+    attempt_stats.apply(db, 'Attempts', 'Quizzes', 'AttemptStats', target_attempts)
+    return db
+
+
+def scan_attempts(table, user_id, follow_pages):
+    kwargs = {'FilterExpression': 'user_id = :uid', 'ExpressionAttributeValues': {':uid': user_id}}
+    items = []
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get('Items', []))
+        if not follow_pages or 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def run(db, fn):
+    db.stats.reset()
+    start = time.perf_counter()
+    count = fn()
+    wall_ms = (time.perf_counter() - start) * 1000
+    return {'attempts': count, 'calls': db.stats.calls, 'read_kb': db.stats.read_bytes // 1024,
+            'modeled_ms': db.stats.modeled_ms, 'wall_ms': wall_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    os.environ['QUIZZES_TABLE'] = 'Quizzes'
+    os.environ['ATTEMPTS_TABLE'] = 'Attempts'
+    os.environ['STATS_TABLE'] = 'AttemptStats'
+    profile = _support.load_handler('profile')
+    def profile_attempts():
+        attempts, cursor = [], None
+        while True:
+            event = {'requestContext': {'authorizer': {'claims': {'sub': 'target-user'}}},
+                     'queryStringParameters': {'attempts_cursor': cursor} if cursor else None}
+            response = profile.lambda_handler(event, None)
+            assert response['statusCode'] == 200, response
+            body = json.loads(response['body'])
+            assert len(body['quizzes']) == profile.listing.DEFAULT_PAGE_SIZE and body['next_cursor']
+            attempts += body['attempts']
+            cursor = body['next_attempts_cursor']
+            if not cursor:
+                break
+        assert body['stats']['attempts'] == len(attempts) == USER_ATTEMPTS, body['stats']
+        return len(attempts)
+
+    rows = []
+    for size in args.sizes:
+        db = build_tables(size)
+        profile.dynamodb = db
+        attempts = db.Table('Attempts')
+        rows.append((f'{size:>7} rows scan (1 page)', run(db, lambda: len(scan_attempts(attempts, 'target-user', False)))))
+        rows.append((f'{size:>7} rows scan (all pages)', run(db, lambda: len(scan_attempts(attempts, 'target-user', True)))))
+        rows.append((f'{size:>7} rows profile handler', run(db, profile_attempts)))
+    _support.print_table("Attempts lookup for one user (local DynamoDB stand-in)", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""Cascading quiz deletes: one DeleteItem per record vs BatchWriteItem and DeleteObjects.
+
+Seeds local DynamoDB tables and local_s3.LocalS3 with --quizzes quizzes of
+--attempts attempts each, their QUIZ# stats, topics, PDFs, text sidecars
+and TopicNames items, then deletes every quiz's dependents both ways.
+``ddb_calls`` and ``s3_calls`` are the requests sent, ``modeled_ms`` the
+DynamoDB latency they model (local_dynamodb.CallStats), ``backoff_ms``
+the retry backoff (added up, not slept) and ``ms`` wall time. The
+throttled row hands back --unprocessed-rate of each batch as
+UnprocessedItems, which batch_delete retries.
+
+Then checks the handlers end to end: delete_quiz cascades small quizzes
+inline, queues large ones for cleanup_worker, keeps topics another quiz
+still uses, refuses other users' quizzes, and DELETE /quiz removes all of
+a user's data, across invocations that run out of time, without touching
+anyone else's: attempts on another user's quiz come out of its stats and
+attempt_count, other users' attempts on the deleted quizzes go, and a
+text sidecar another user's topic shares is kept. Exits non-zero if any
+check fails.
+
+    cd backend && python benchmarks/bench_quiz_cleanup.py --quizzes 50 --attempts 40
+"""
+import sys
+import json
+import time
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from local_s3 import LocalS3
+from quizcraft import runtime, cleanup, attempt_stats, pdf_text, topic_names
+
+BUCKET = 'quizcraft-pdfs'
+TABLES = ('Quizzes', 'Attempts', 'Topics', 'TopicNames', 'AttemptStats')
+
+
+class LocalSQS:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, QueueUrl, MessageBody):
+        self.messages.append(json.loads(MessageBody))
+
+
+class Context:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def make_store(unprocessed_rate=0.0):
+    db = LocalDynamoDB(unprocessed_rate=unprocessed_rate)
+    db.create_table('Quizzes', 'quiz_id', indexes={'UserIdIndex': ('user_id', 'created_at')})
+    db.create_table('Attempts', 'attempt_id', indexes={'UserCreatedAtIndex': ('user_id', 'created_at'),
+                                                       'QuizIdIndex': ('quiz_id', None)})
+    db.create_table('Topics', 'user_id', 'topic_id', indexes={'PdfHashIndex': ('pdf_hash', None)})
+    db.create_table('TopicNames', 'user_id', 'name_key')
+    db.create_table('AttemptStats', 'stats_key')
+    return db, LocalS3()
+
+
+def seed(db, s3, user_id, quizzes, attempts, shared_topic=False):
+    """Quizzes with their own PDF topics; with shared_topic the last two share one."""
+    quiz_ids = []
+    for q in range(quizzes):
+        quiz_id, topic_id = f'{user_id}-quiz-{q}', f'{user_id}-topic-{q}'
+        if shared_topic and q == quizzes - 1:
+            topic_id = f'{user_id}-topic-{q - 1}'
+        else:
+            s3_key = f'uploads/{user_id}/{quiz_id}.pdf'
+            name = f'Notes {q}'
+            db.Table('Topics').put_item(Item={'user_id': user_id, 'topic_id': topic_id, 'name': name,
+                                              's3_key': s3_key, 'pdf_hash': pdf_hash(user_id, q)})
+            db.Table('TopicNames').put_item(Item={'user_id': user_id, 'name_key': topic_names.name_key(name),
+                                                  'allocated': 1})
+            s3.put_object(Bucket=BUCKET, Key=s3_key, Body=b'%PDF')
+            s3.put_object(Bucket=BUCKET, Key=pdf_text.sidecar_key(pdf_hash(user_id, q)), Body=b'text')
+        db.Table('Quizzes').put_item(Item={'quiz_id': quiz_id, 'user_id': user_id, 'topic_id': topic_id,
+                                           'created_at': f'2024-01-01T00:00:{q:02d}Z', 'status': 'completed'})
+        for a in range(attempts):
+            db.Table('Attempts').put_item(Item={'attempt_id': f'{quiz_id}-attempt-{a}', 'quiz_id': quiz_id,
+                                                'user_id': user_id, 'created_at': f'2024-02-01T{a:06d}',
+                                                'score': 3, 'total': 5})
+        if attempts:
+            db.Table('AttemptStats').put_item(Item={'stats_key': attempt_stats.quiz_key(quiz_id), 'attempts': attempts})
+        quiz_ids.append(quiz_id)
+    db.Table('AttemptStats').put_item(Item={'stats_key': attempt_stats.user_key(user_id), 'attempts': attempts})
+    return quiz_ids
+
+
+def pdf_hash(user_id, q):
+    return f'{user_id}{q:060d}'
+
+
+def submit(db, user_id, quiz_id, n, score):
+    """An attempt as submit_quiz writes it, counted in attempt_count straight away."""
+    attempt = {'attempt_id': f'{user_id}-on-{quiz_id}-{n}', 'quiz_id': quiz_id, 'user_id': user_id,
+               'created_at': f'2024-03-01T{n:06d}', 'score': score, 'max_score': 5, 'total_questions': 5}
+    db.Table('Attempts').put_item(Item=attempt)
+    db.Table('Quizzes').update_item(Key={'quiz_id': quiz_id}, UpdateExpression='ADD attempt_count :one',
+                                    ExpressionAttributeValues={':one': 1})
+    return attempt
+
+
+class Backoff:
+    """Adds up the retry backoff instead of sleeping through it."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, seconds):
+        self.seconds += seconds
+
+
+def cascade_for(db, s3, sleep=time.sleep):
+    return cleanup.Cascade(db, s3, BUCKET, 'Quizzes', 'Attempts', 'Topics', 'TopicNames', 'AttemptStats',
+                           sleep=sleep)
+
+
+def per_item_delete(db, s3, quiz, backoff):
+    """The same cascade with one DeleteItem or DeleteObject per record."""
+    cascade = cascade_for(db, s3)
+    for key in cascade.attempt_keys(quiz['quiz_id']):
+        db.Table('Attempts').delete_item(Key=key)
+    db.Table('AttemptStats').delete_item(Key={'stats_key': attempt_stats.quiz_key(quiz['quiz_id'])})
+    topic = db.Table('Topics').get_item(Key={'user_id': quiz['user_id'], 'topic_id': quiz['topic_id']}).get('Item')
+    if topic:
+        for key in cascade.topic_object_keys(quiz['user_id'], topic):
+            s3.delete_object(Bucket=BUCKET, Key=key)
+        db.Table('TopicNames').delete_item(Key={'user_id': quiz['user_id'],
+                                                'name_key': topic_names.name_key(topic['name'])})
+        db.Table('Topics').delete_item(Key={'user_id': quiz['user_id'], 'topic_id': quiz['topic_id']})
+    db.Table('Quizzes').delete_item(Key={'quiz_id': quiz['quiz_id']})
+
+
+def batched_delete(db, s3, quiz, backoff):
+    cascade_for(db, s3, backoff).delete_quiz(quiz)
+
+
+def run(label, delete, quizzes, attempts, unprocessed_rate=0.0):
+    db, s3 = make_store(unprocessed_rate)
+    quiz_ids = seed(db, s3, 'u1', quizzes, attempts)
+    quizzes = [db.Table('Quizzes').get_item(Key={'quiz_id': quiz_id})['Item'] for quiz_id in quiz_ids]
+    backoff = Backoff()
+    db.stats.reset()
+    start = time.perf_counter()
+    for quiz in quizzes:
+        delete(db, s3, quiz, backoff)
+    elapsed = (time.perf_counter() - start) * 1000
+    left = sum(len(db.Table(name).scan()['Items']) for name in TABLES) - 1  # the USER# rollup stays
+    return (label, {'ddb_calls': db.stats.calls, 's3_calls': sum(s3.calls.get(op, 0) for op in
+                                                                  ('delete_object', 'delete_objects')),
+                    'modeled_ms': db.stats.modeled_ms, 'backoff_ms': backoff.seconds * 1000, 'ms': elapsed,
+                    'left': left + len(s3.objects)})
+
+
+def api_event(user_id, quiz_id=None):
+    return {'pathParameters': {'quiz_id': quiz_id} if quiz_id else None, 'httpMethod': 'DELETE',
+            'requestContext': {'authorizer': {'claims': {'sub': user_id}}}}
+
+
+def user_records(db, s3, user_id):
+    records = sum(1 for name in TABLES for item in db.Table(name).scan()['Items']
+                  if item.get('user_id') == user_id or item.get('stats_key', '').startswith(f'QUIZ#{user_id}-')
+                  or item.get('stats_key') == attempt_stats.user_key(user_id))
+    objects = sum(1 for _, key in s3.objects if f'/{user_id}/' in key or key.startswith(f'text/{user_id}'))
+    return records + objects
+
+
+def check_handlers(deleter, worker, unprocessed_rate):
+    failures = []
+    db, s3 = make_store(unprocessed_rate)
+    sqs = LocalSQS()
+    runtime._clients.update({'s3': s3, 'sqs': sqs})
+    deleter.dynamodb = worker.dynamodb = db
+    threshold = deleter.INLINE_CASCADE_MAX_ATTEMPTS
+    small = seed(db, s3, 'u1', 3, 5, shared_topic=True)
+    large = seed(db, s3, 'u2', 1, threshold + 30)[0]
+    u3_quizzes = seed(db, s3, 'u3', 40, 30)
+    seed(db, s3, 'u4', 5, 10)
+    before_u4 = user_records(db, s3, 'u4')
+
+    # u3 and u6 take u5's classroom quiz and u5 takes one of u3's; the last
+    # u3 attempt is counted but not yet applied by attempt_aggregator
+    classroom = seed(db, s3, 'u5', 1, 0)[0]
+    taken = [submit(db, 'u3', classroom, n, 4) for n in range(3)] + [submit(db, 'u6', classroom, 0, 2),
+                                                                      submit(db, 'u5', u3_quizzes[0], 0, 5)]
+    attempt_stats.apply(db, 'Attempts', 'Quizzes', 'AttemptStats', taken)
+    submit(db, 'u3', classroom, 3, 1)
+    # u5 uploaded the same PDF as u3's first topic, so they share its text sidecar
+    shared_sidecar = (BUCKET, pdf_text.sidecar_key(pdf_hash('u3', 0)))
+    db.Table('Topics').put_item(Item={'user_id': 'u5', 'topic_id': 'u5-copy', 'pdf_hash': pdf_hash('u3', 0),
+                                      's3_key': 'uploads/u5/copy.pdf'})
+
+    def handle(user_id, quiz_id=None):
+        return deleter.lambda_handler(api_event(user_id, quiz_id), None)['statusCode']
+
+    def drain(remaining_ms):
+        invocations = 0
+        while sqs.messages:
+            messages, sqs.messages = sqs.messages, []
+            records = [{'messageId': str(i), 'body': json.dumps(m)} for i, m in enumerate(messages)]
+            result = worker.lambda_handler({'Records': records}, Context(remaining_ms))
+            invocations += 1
+            if result['batchItemFailures'] or invocations > 100:
+                failures.append(f"cleanup_worker failed: {result['batchItemFailures']}")
+                return invocations
+        return invocations
+
+    if handle('u2', small[0]) != 404 or not db.Table('Quizzes').get_item(Key={'quiz_id': small[0]}).get('Item'):
+        failures.append("another user's quiz was deleted")
+
+    # small[1] and small[2] share a topic: it must outlive the first of them
+    shared_topic = {'user_id': 'u1', 'topic_id': 'u1-topic-1'}
+    status = handle('u1', small[1])
+    left = db.Table('Attempts').query(IndexName='QuizIdIndex', KeyConditionExpression='quiz_id = :q',
+                                      ExpressionAttributeValues={':q': small[1]})['Items']
+    if status != 200 or left or db.Table('AttemptStats').get_item(
+            Key={'stats_key': attempt_stats.quiz_key(small[1])}).get('Item'):
+        failures.append(f"inline delete left attempts or stats: {status}, {len(left)} attempts")
+    if not db.Table('Topics').get_item(Key=shared_topic).get('Item'):
+        failures.append("topic still used by another quiz was deleted")
+    handle('u1', small[2])
+    if db.Table('Topics').get_item(Key=shared_topic).get('Item') or (BUCKET, 'uploads/u1/u1-quiz-1.pdf') in s3.objects:
+        failures.append("topic or PDF left after its last quiz was deleted")
+    if sqs.messages:
+        failures.append("small quiz deletes were queued")
+
+    status = handle('u2', large)
+    if status != 202 or len(sqs.messages) != 1 or db.Table('Quizzes').get_item(Key={'quiz_id': large}).get('Item'):
+        failures.append(f"large quiz was not deleted and queued: {status}, {len(sqs.messages)} messages")
+    drain(60000)
+    if user_records(db, s3, 'u2') != 1:  # the USER# rollup stays
+        failures.append(f"cleanup_worker left {user_records(db, s3, 'u2') - 1} records of the large quiz")
+
+    status = handle('u3')
+    invocations = drain(worker.DEADLINE_RESERVE_SECONDS * 1000)
+    # The shared sidecar is the one u3 object left
+    if status != 202 or user_records(db, s3, 'u3') != 1:
+        failures.append(f"DELETE /quiz left {user_records(db, s3, 'u3') - 1} records: {status}")
+    if shared_sidecar not in s3.objects:
+        failures.append("delete-all removed a text sidecar another user's topic still uses")
+    classroom_stats = db.Table('AttemptStats').get_item(Key={'stats_key': attempt_stats.quiz_key(classroom)}).get('Item')
+    classroom_count = db.Table('Quizzes').get_item(Key={'quiz_id': classroom})['Item'].get('attempt_count')
+    if not classroom_stats or classroom_stats['attempts'] != 1 or classroom_stats['percent_sum'] != 40 \
+            or classroom_stats.get('hist_8', 0) != 0 or classroom_count != 1:
+        failures.append(f"delete-all did not take its attempts out of another user's quiz: "
+                        f"{classroom_stats}, attempt_count {classroom_count}")
+    left = db.Table('Attempts').query(IndexName='QuizIdIndex', KeyConditionExpression='quiz_id = :q',
+                                      ExpressionAttributeValues={':q': u3_quizzes[0]})['Items']
+    if left:
+        failures.append(f"delete-all left {len(left)} other users' attempts on the deleted quizzes")
+    if invocations < 2:
+        failures.append("delete-all did not carry on across invocations")
+    if user_records(db, s3, 'u4') != before_u4:
+        failures.append("delete-all touched another user's data")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quizzes', type=int, default=50)
+    parser.add_argument('--attempts', type=int, default=40)
+    parser.add_argument('--unprocessed-rate', type=float, default=0.3)
+    args = parser.parse_args()
+
+    for name, value in (('S3_BUCKET', BUCKET), ('QUIZZES_TABLE', 'Quizzes'), ('ATTEMPTS_TABLE', 'Attempts'),
+                        ('TOPICS_TABLE', 'Topics'), ('TOPIC_NAMES_TABLE', 'TopicNames'),
+                        ('STATS_TABLE', 'AttemptStats'), ('CLEANUP_QUEUE_URL', 'bench'), ('LOG_LEVEL', 'ERROR')):
+        _support.os.environ[name] = value
+    deleter = _support.load_handler('delete_quiz')
+    worker = _support.load_handler('cleanup_worker')
+
+    rows = [
+        run('DeleteItem per record', per_item_delete, args.quizzes, args.attempts),
+        run('BatchWriteItem + DeleteObjects', batched_delete, args.quizzes, args.attempts),
+        run(f'batched, {args.unprocessed_rate:.0%} unprocessed', batched_delete, args.quizzes, args.attempts,
+            args.unprocessed_rate),
+    ]
+    _support.print_table(f"Deleting {args.quizzes} quizzes with {args.attempts} attempts each", rows)
+    failures = []
+    for label, stats in rows:
+        if stats['left']:
+            failures.append(f"{label} left {stats['left']} records or objects")
+    failures += check_handlers(deleter, worker, 0.0)
+    failures += [f"throttled: {f}" for f in check_handlers(deleter, worker, args.unprocessed_rate)]
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK: deletes cascade without orphans" if not failures else "")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Quiz item size and capacity units for each quiz_content storage shape.
+
+Compares the legacy native list and JSON string forms with the compressed
+quiz_codec blob, and times decoding each, across question counts.
+
+    cd backend && python benchmarks/bench_quiz_content_size.py --questions 10 50 200
+"""
+import json
+import math
+import random
+import argparse
+import _support
+from local_dynamodb import item_size
+from quizcraft import quiz_codec
+
+WORDS = ('cell membrane protein energy transport gradient enzyme reaction pathway '
+         'molecule structure function signal receptor binding process').split()
+
+
+def make_quiz(question_count, seed=0):
+    rng = random.Random(seed)
+
+    def sentence(n):
+        return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+    quiz = []
+    for _ in range(question_count):
+        options = [sentence(6) for _ in range(4)]
+        quiz.append({
+            'question': sentence(18) + '?',
+            'options': options,
+            'correct_answer': rng.choice(options),
+        })
+    return quiz
+
+
+def quiz_item(content):
+    return {
+        'quiz_id': '7d1f3a52-52a4-4c1e-9a0e-3f7c2b1d9e44',
+        'user_id': '3c4d2e1f-0a9b-4c8d-8e7f-6a5b4c3d2e1f',
+        'topic_id': 'a2b3c4d5-e6f7-4a8b-9c0d-1e2f3a4b5c6d',
+        'topic_name': 'Cell Biology',
+        'status': 'completed',
+        'created_at': '2025-01-01T00:00:00Z',
+        'quiz_content': content,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    for count in args.questions:
+        quiz = make_quiz(count)
+        shapes = [
+            ('native list', quiz),
+            ('json string', json.dumps(quiz)),
+            ('codec v1 (zlib)', quiz_codec.encode(quiz)),
+        ]
+        for label, stored in shapes:
+            assert quiz_codec.decode(stored) == quiz
+            size = item_size(quiz_item(stored))
+            stats = _support.measure(lambda: quiz_codec.decode(stored), args.iterations)
+            rows.append((f'{count:>4} questions {label}', {
+                'item_kb': round(size / 1024, 1),
+                'rcu_strong': math.ceil(size / 4096),
+                'wcu': math.ceil(size / 1024),
+                'decode_ms': stats['mean_ms'],
+            }))
+        encode = _support.measure(lambda: quiz_codec.encode(quiz), args.iterations)
+        rows.append((f'{count:>4} questions codec v1 encode', {
+            'item_kb': '', 'rcu_strong': '', 'wcu': '', 'decode_ms': encode['mean_ms'],
+        }))
+    _support.print_table("Quiz item size by quiz_content shape (decode_ms is encode time on encode rows)", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Serializing large quiz-list payloads: convert_decimals + json.dumps vs quizcraft.responses.
+
+    cd backend && python benchmarks/bench_response_serialization.py --quizzes 100 1000
+"""
+import json
+import random
+import argparse
+from decimal import Decimal
+import _support
+from quizcraft import responses
+
+
+def convert_decimals(obj):
+    """The helper profile and get_quizzes used to carry."""
+    if isinstance(obj, list):
+        return [convert_decimals(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: convert_decimals(v) for k, v in obj.items()}
+    elif isinstance(obj, Decimal):
+        return int(obj)
+    else:
+        return obj
+
+
+def make_payload(quiz_count, seed=0):
+    """Quiz items shaped like boto3 returns them, numbers as Decimal."""
+    rng = random.Random(seed)
+    quizzes = []
+    for i in range(quiz_count):
+        quizzes.append({
+            'quiz_id': f'quiz-{i}',
+            'user_id': 'user-1',
+            'topic_id': f'topic-{i % 40}',
+            'topic_name': f'Topic {i % 40}',
+            'status': 'completed',
+            'attempt_count': Decimal(rng.randrange(50)),
+            'average_score': Decimal(str(round(rng.random() * 5, 2))),
+            'created_at': f'2025-01-01T00:00:{i:06d}Z',
+            'quiz_content': [{
+                'question': f'Question {q} about topic {i % 40}, with enough text to be realistic?',
+                'options': [f'Option {o} for question {q}' for o in range(1, 5)],
+                'correct_answer': f'Option {rng.randrange(1, 5)} for question {q}',
+            } for q in range(10)],
+        })
+    return {'quizzes': quizzes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quizzes', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    orjson = responses.orjson
+    rows = []
+    for count in args.quizzes:
+        payload = make_payload(count)
+        size_kb = len(responses.dumps(payload)) // 1024
+        stats = _support.measure(lambda: json.dumps(convert_decimals(payload)), args.iterations)
+        rows.append((f'{count:>5} quizzes convert_decimals+json', dict(stats, kb=size_kb)))
+        responses.orjson = None
+        stats = _support.measure(lambda: responses.dumps(payload), args.iterations)
+        rows.append((f'{count:>5} quizzes responses (stdlib)', dict(stats, kb=size_kb)))
+        responses.orjson = orjson
+        if orjson is not None:
+            stats = _support.measure(lambda: responses.dumps(payload), args.iterations)
+            rows.append((f'{count:>5} quizzes responses (orjson)', dict(stats, kb=size_kb)))
+    _support.print_table("Quiz list response serialization", rows)
+    if orjson is None:
+        print("orjson is not installed; only the stdlib path was measured")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""PDF quiz generation vs document size: one truncated prompt vs sectioned map-reduce.
+
+Runs quiz_generator.generate_quiz_content against llm.StubClient, whose
+latency follows a token-based model, scaled by --time-scale to keep the
+run short. The stub answers from the sentences of
+the text it is sent, so ``coverage`` is the share of the document the
+prompts actually contained and ``spread`` the share of the document's
+fifths the final questions came from. Each sectioned run is repeated to
+check the quiz is identical under the same seed. Finally checks that a
+quiz with a failed section is served but not cached, while a complete one
+is; exits non-zero if not.
+
+    cd backend && python benchmarks/bench_sectioned_generation.py --chars 8000 40000 160000 400000
+"""
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import _support
+from quizcraft import quiz_cache, sections, llm
+
+LEGACY_CHARS = 40000
+TOPICS = ['photosynthesis', 'mitosis', 'plate tectonics', 'the water cycle', 'supply and demand',
+          'the French Revolution', 'binary search', 'electric circuits', 'protein folding', 'glaciers']
+
+
+def make_document(chars, seed=0):
+    """Paragraphs of numbered sentences; a repeated boilerplate paragraph exercises dedupe."""
+    rng = random.Random(seed)
+    paragraphs, size, n = [], 0, 0
+    while size < chars:
+        if len(paragraphs) % 15 == 14:
+            paragraph = "Review question. Summarize the key points of this chapter."
+        else:
+            sentences = []
+            for _ in range(rng.randrange(4, 9)):
+                n += 1
+                sentences.append(f"Fact {n} is that {rng.choice(TOPICS)} depends on "
+                                 f"{rng.choice(TOPICS)} in {rng.randrange(2, 99)} ways.")
+            paragraph = ' '.join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)
+
+
+def reply(prompt):
+    """Questions about facts drawn from the prompt; the review paragraph always yields the same one."""
+    count = int(re.search(r'Generate (?:a quiz with )?(\d+)', prompt).group(1))
+    facts = re.findall(r'Fact (\d+) is that ([^.]+)\.', prompt)
+    digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+    picks = [facts[(digest >> (8 * i)) % len(facts)] for i in range(count)] if facts else []
+    questions = [{'question': f"Which statement about fact {number} is true?",
+                  'options': [f"{text}", "None of these", "All of these", "It is unknown"],
+                  'correct_answer': text} for number, text in picks]
+    if 'Review question' in prompt:
+        questions.append({'question': 'Summarize the key points of this chapter?',
+                          'options': ['A', 'B', 'C', 'D'], 'correct_answer': 'A'})
+    return json.dumps(questions)
+
+
+def run(generator, fn, total_facts, time_scale):
+    prompts = []
+    stub = llm.StubClient(reply=lambda prompt: prompts.append(prompt) or reply(prompt), time_scale=time_scale)
+    generator.llm_client = stub
+    start = time.perf_counter()
+    quiz = fn()
+    wall = time.perf_counter() - start
+    numbers = [int(re.search(r'fact (\d+)', q['question']).group(1)) for q in quiz if 'fact' in q['question']]
+    return quiz, {
+        'modeled_s': wall / time_scale,
+        'llm_calls': stub.calls,
+        'prompt_tokens': stub.prompt_tokens,
+        'coverage': len({n for p in prompts for n in re.findall(r'Fact (\d+) is', p)}) / total_facts,
+        'questions': len(quiz),
+        'spread': len({n * 5 // (total_facts + 1) for n in numbers}) / 5,
+    }
+
+
+def check_degraded_not_cached(generator, document):
+    """A sectioned quiz missing a failed section is not cached; the complete retry is."""
+    generator.cache = quiz_cache.QuizCache(quiz_cache.MemoryBackend(), variants=1)
+    request_quiz = generator.request_quiz
+    sent = []
+
+    def one_section_fails(prompt, **kwargs):
+        sent.append(prompt)
+        if len(sent) == 2:
+            raise RuntimeError("section failed")
+        return request_quiz(prompt, **kwargs)
+
+    calls = []
+    try:
+        for fn in (one_section_fails, request_quiz, request_quiz):
+            generator.request_quiz = fn
+            stub = llm.StubClient(reply=reply, time_scale=0)
+            generator.llm_client = stub
+            generator.generate_quiz_content(pdf_content=document)
+            calls.append(stub.calls)
+    finally:
+        generator.request_quiz = request_quiz
+        generator.cache = quiz_cache.QuizCache(quiz_cache.NullBackend())
+    # Degraded: generated, not cached. Complete: generated and cached. Then a cache hit
+    return calls[0] > 0 and calls[1] > 0 and calls[2] == 0, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chars', type=int, nargs='+', default=[8000, 40000, 160000, 400000])
+    parser.add_argument('--time-scale', type=float, default=0.02)
+    args = parser.parse_args()
+
+    generator = _support.load_handler('quiz_generator')
+    generator.cache = quiz_cache.QuizCache(quiz_cache.NullBackend())
+
+    rows = []
+    for chars in args.chars:
+        document = make_document(chars)
+        total_facts = len(re.findall(r'Fact \d+ ', document))
+
+        def legacy():
+            prompt = generator.PDF_PROMPT.format(pdf_content=document[:LEGACY_CHARS])
+            return generator.request_quiz(prompt)[0]
+
+        _, stats = run(generator, legacy, total_facts, args.time_scale)
+        rows.append((f'{chars:>7} chars, single prompt (first {LEGACY_CHARS})', stats))
+
+        first, stats = run(generator, lambda: generator.generate_quiz_content(pdf_content=document),
+                           total_facts, args.time_scale)
+        rows.append((f'{chars:>7} chars, sectioned', stats))
+        again, _ = run(generator, lambda: generator.generate_quiz_content(pdf_content=document),
+                       total_facts, args.time_scale)
+        assert first == again, "sectioned generation is not deterministic"
+    _support.print_table(f"PDF quiz generation ({generator.SECTION_TOKENS}-token sections, "
+                         f"up to {generator.MAX_SECTIONS}; tiktoken={'yes' if sections.tiktoken else 'no'})", rows)
+
+    ok, calls = check_degraded_not_cached(generator, make_document(40000))
+    if not ok:
+        print(f"FAIL: quiz with a failed section was cached (LLM calls per run: {calls})")
+        sys.exit(1)
+    print("OK: quizzes with failed sections are not cached")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Time to first question: buffered completions vs streamed, incrementally stored questions.
+
+Runs quiz_generator.process_record for a topic quiz against a local
+Quizzes table and llm.StubClient, recording when
+the quiz item first holds a question and when it is completed. The
+truncated runs cap max_tokens below the reply's length; ``old_parser``
+is what the regex-and-json.loads parse used before this change kept from
+the same reply (0 means the single error question).
+
+    cd backend && python benchmarks/bench_streaming_generation.py --questions 5 10
+"""
+import re
+import json
+import time
+import functools
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from quizcraft import runtime, quiz_cache, quiz_codec, sections, llm
+
+
+def reply(prompt):
+    count = int(re.search(r'Generate (?:a quiz with )?(\d+)', prompt).group(1))
+    return "Here is your quiz:\n" + json.dumps([
+        {'question': f"Question {i + 1} about the topic?",
+         'options': [f"Option {c}" for c in 'ABCD'], 'correct_answer': f"Option {'ABCD'[i % 4]}"}
+        for i in range(count)
+    ], indent=4)
+
+
+def regex_parse(content):
+    """The buffered parse quiz_generator used before streaming."""
+    match = re.search(r'\[.*\]', content, re.DOTALL)
+    try:
+        return json.loads(match.group(0)) if match else None
+    except json.JSONDecodeError:
+        return None
+
+
+class WatchedTable:
+    """Quizzes table wrapper noting when questions first land and when the quiz completes."""
+
+    def __init__(self, table):
+        self.table = table
+        self.start = time.perf_counter()
+        self.first_question = None
+        self.completed = None
+        self.writes = 0
+
+    def update_item(self, **kwargs):
+        response = self.table.update_item(**kwargs)
+        self.writes += 1
+        item = self.table.get_item(Key=kwargs['Key'])['Item']
+        now = time.perf_counter() - self.start
+        if self.first_question is None and item.get('quiz_content'):
+            self.first_question = now
+        if item.get('status') == 'completed':
+            self.completed = now
+        return response
+
+
+def run(generator, stream, max_tokens, time_scale):
+    db = LocalDynamoDB()
+    table = db.create_table('Quizzes', 'quiz_id')
+    table.put_item(Item={'quiz_id': 'q1', 'user_id': 'u1', 'status': 'pending'})
+    replies = []
+    generator.llm_client = llm.StubClient(reply=lambda prompt: replies.append(reply(prompt)) or replies[-1],
+                                          time_scale=time_scale)
+    watched = WatchedTable(table)
+    runtime._tables['Quizzes'] = watched
+    generator.STREAM_COMPLETIONS = stream
+    original = generator.request_quiz
+    generator.request_quiz = functools.partial(original, max_tokens=max_tokens)
+    try:
+        generator.process_record({'body': json.dumps({'quiz_id': 'q1', 'user_id': 'u1', 'topic_name': 'Biology'})}, None)
+    finally:
+        generator.request_quiz = original
+    questions = quiz_codec.decode(table.get_item(Key={'quiz_id': 'q1'})['Item']['quiz_content'])
+    old = regex_parse(replies[-1][:max_tokens * sections.CHARS_PER_TOKEN])
+    return {
+        'first_question_s': watched.first_question / time_scale,
+        'completed_s': watched.completed / time_scale,
+        'writes': watched.writes,
+        'questions': sum(1 for q in questions if not q['question'].startswith('Error')),
+        'old_parser': len(old) if old else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, nargs='+', default=[5, 10])
+    parser.add_argument('--time-scale', type=float, default=0.02)
+    args = parser.parse_args()
+
+    generator = _support.load_handler('quiz_generator')
+    generator.cache = quiz_cache.QuizCache(quiz_cache.NullBackend())
+    generator.os.environ['S3_BUCKET'] = 'bench'
+    generator.os.environ['QUIZZES_TABLE'] = 'Quizzes'
+
+    rows = []
+    for count in args.questions:
+        generator.TOPIC_PROMPT = generator.TOPIC_PROMPT.replace(re.search(
+            r'Generate a quiz with (\d+)', generator.TOPIC_PROMPT).group(0), f'Generate a quiz with {count}')
+        full = len(reply(f'Generate {count}')) // 4 + 50
+        for label, max_tokens in (('full reply', full), ('truncated at 70%', int(full * 0.7))):
+            rows.append((f'{count:>3} questions, {label}, buffered', run(generator, False, max_tokens, args.time_scale)))
+            rows.append((f'{count:>3} questions, {label}, streamed', run(generator, True, max_tokens, args.time_scale)))
+    _support.print_table("Topic quiz generation, time to first stored question", rows)
+
+
+if __name__ == '__main__':
+    main()
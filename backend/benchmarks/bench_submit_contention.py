@@ -0,0 +1,157 @@
+"""Contention: hundreds of concurrent submissions to one quiz.
+
+Runs the submit_quiz handler (attempt put and attempt_count increment in one
+TransactWriteItems) against the local DynamoDB stand-in with a simulated
+round trip, next to the old sequential put_item + update_item path. A
+fraction of legacy submissions "crash" between the two writes to show the
+counter drift the transaction removes. The handler runs twice: retrying
+conflicts for the whole backoff budget, and deferring the increment to
+attempt_aggregator after a few conflicts. The Attempts stream is then fed to
+attempt_aggregator so ``counter`` is the settled attempt_count.
+
+    cd backend && python benchmarks/bench_submit_contention.py --submissions 100 300 --latency-ms 4
+"""
+import os
+import json
+import time
+import uuid
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import _support
+from local_dynamodb import LocalDynamoDB
+from bench_quiz_content_size import make_quiz
+from quizcraft import quiz_codec, answer_key, dynamo
+
+
+class Crash(Exception):
+    pass
+
+
+def build(latency_ms, quiz):
+    db = LocalDynamoDB(latency_ms=latency_ms)
+    quizzes = db.create_table('Quizzes', 'quiz_id')
+    db.create_table('Attempts', 'attempt_id', stream=True)
+    db.create_table('AttemptStats', 'stats_key')
+    quizzes.put_item(Item={'quiz_id': 'hot', 'user_id': 'teacher', 'attempt_count': 0,
+                           'quiz_content': quiz_codec.encode(quiz), 'answer_key': answer_key.build(quiz)})
+    return db
+
+
+def legacy_submit(db, answers, crash_rate, rng):
+    quizzes, attempts = db.Table('Quizzes'), db.Table('Attempts')
+    key = quizzes.get_item(Key={'quiz_id': 'hot'}, ProjectionExpression='quiz_id, answer_key')['Item']['answer_key']
+    score, max_score, total = answer_key.score(key, answers)
+    attempts.put_item(Item={'attempt_id': str(uuid.uuid4()), 'quiz_id': 'hot', 'user_id': 'student',
+                            'score': score, 'max_score': max_score, 'total_questions': total, 'answers': answers})
+    if rng.random() < crash_rate:
+        raise Crash()
+    quizzes.update_item(
+        Key={'quiz_id': 'hot'},
+        UpdateExpression="SET attempt_count = if_not_exists(attempt_count, :zero) + :one",
+        ExpressionAttributeValues={':zero': 0, ':one': 1}
+    )
+
+
+def attempt_count(db):
+    return int(db.Table('Quizzes').get_item(Key={'quiz_id': 'hot'})['Item']['attempt_count'])
+
+
+def run(submissions, fn):
+    latencies = []
+    failures = 0
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            fn(i)
+            return (time.perf_counter() - start) * 1000, None
+        except Exception as e:
+            return (time.perf_counter() - start) * 1000, e
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=submissions) as pool:
+        for elapsed, error in pool.map(one, range(submissions)):
+            latencies.append(elapsed)
+            failures += error is not None
+    wall_ms = (time.perf_counter() - start) * 1000
+    latencies.sort()
+    return {
+        'wall_ms': wall_ms,
+        'p50_ms': latencies[len(latencies) // 2],
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'failed': failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--submissions', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--latency-ms', type=float, default=4.0)
+    parser.add_argument('--crash-rate', type=float, default=0.01)
+    parser.add_argument('--defer-after', type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ['QUIZZES_TABLE'] = 'Quizzes'
+    os.environ['ATTEMPTS_TABLE'] = 'Attempts'
+    os.environ['STATS_TABLE'] = 'AttemptStats'
+    submit_quiz = _support.load_handler('submit_quiz')
+    quiz = make_quiz(20)
+    rng = random.Random(0)
+    answers = {str(i): rng.choice(q['options']) for i, q in enumerate(quiz)}
+    event = {'pathParameters': {'quiz_id': 'hot'}, 'body': json.dumps({'answers': answers}),
+             'requestContext': {'authorizer': {'claims': {'sub': 'student'}}}}
+
+    aggregator = _support.load_handler('attempt_aggregator')
+
+    # Count transaction attempts by wrapping the shared helper
+    attempts_made = []
+    transact_write = dynamo.transact_write
+
+    def counting_transact_write(*a, **kw):
+        try:
+            made = transact_write(*a, **kw)
+        except Exception:
+            attempts_made.append(kw.get('max_attempts', dynamo.TRANSACT_MAX_ATTEMPTS))
+            raise
+        attempts_made.append(made)
+        return made
+
+    def submit(i):
+        response = submit_quiz.lambda_handler(event, None)
+        if response['statusCode'] != 200:
+            raise RuntimeError(response['body'])
+
+    rows = []
+    for count in args.submissions:
+        db = build(args.latency_ms, quiz)
+        crash_rng = random.Random(count)
+        stats = run(count, lambda i: legacy_submit(db, answers, args.crash_rate, crash_rng))
+        stats.update(retries=0, deferred=0, attempts=len(db.Table('Attempts')), counter=attempt_count(db))
+        rows.append((f'{count:>4} concurrent legacy put+update', stats))
+
+        for label, budget in [('transaction, full retry budget', dynamo.TRANSACT_MAX_ATTEMPTS),
+                              (f'transaction, defer after {args.defer_after}', args.defer_after)]:
+            db = build(args.latency_ms, quiz)
+            submit_quiz.dynamodb = db
+            aggregator.dynamodb = db
+            submit_quiz.COUNTER_TRANSACT_ATTEMPTS = budget
+            dynamo.transact_write = counting_transact_write
+            attempts_made.clear()
+            stats = run(count, submit)
+            dynamo.transact_write = transact_write
+            retries = sum(attempts_made) - len(attempts_made)
+
+            attempts = db.Table('Attempts')
+            deferred = sum(1 for r in attempts.stream if r['eventName'] == 'INSERT'
+                           and 'count_pending' in r['dynamodb']['NewImage'])
+            records = list(attempts.stream)
+            for start in range(0, len(records), 100):
+                aggregator.lambda_handler({'Records': records[start:start + 100]}, None)
+            stats.update(retries=retries, deferred=deferred, attempts=len(attempts), counter=attempt_count(db))
+            rows.append((f'{count:>4} concurrent {label}', stats))
+    _support.print_table(f"Concurrent submissions to one quiz ({args.latency_ms} ms simulated round trip)", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Scoring a submission: full quiz fetch and rebuild vs the precomputed answer key.
+
+The legacy path is what submit_quiz did before answer keys: get the whole
+quiz item, decode quiz_content and rebuild correct_answers. The new path is
+the submit_quiz handler itself, reading only answer_key, run against the
+local DynamoDB stand-in.
+
+    cd backend && python benchmarks/bench_submit_scoring.py --questions 10 50 200
+"""
+import os
+import json
+import random
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from bench_quiz_content_size import make_quiz
+from quizcraft import quiz_codec, answer_key
+
+
+def legacy_score(quizzes, quiz_id, answers):
+    quiz = quizzes.get_item(Key={'quiz_id': quiz_id})['Item']
+    quiz_content = quiz_codec.decode(quiz['quiz_content'])
+    correct_answers = {str(i): q['correct_answer'] for i, q in enumerate(quiz_content)}
+    return sum(1 for q_idx, ans in answers.items() if ans == correct_answers.get(q_idx))
+
+
+def keyed_score(quizzes, quiz_id, answers):
+    quiz = quizzes.get_item(Key={'quiz_id': quiz_id}, ProjectionExpression='quiz_id, answer_key',
+                            ConsistentRead=True)['Item']
+    return answer_key.score(quiz['answer_key'], answers)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ['QUIZZES_TABLE'] = 'Quizzes'
+    os.environ['ATTEMPTS_TABLE'] = 'Attempts'
+    submit_quiz = _support.load_handler('submit_quiz')
+
+    rows = []
+    for count in args.questions:
+        quiz = make_quiz(count)
+        rng = random.Random(count)
+        answers = {str(i): rng.choice(q['options']) for i, q in enumerate(quiz)}
+        expected = sum(1 for i, q in enumerate(quiz) if answers[str(i)] == q['correct_answer'])
+
+        db = LocalDynamoDB()
+        quizzes = db.create_table('Quizzes', 'quiz_id')
+        db.create_table('Attempts', 'attempt_id')
+        quizzes.put_item(Item={'quiz_id': 'legacy', 'user_id': 'u', 'quiz_content': quiz})
+        quizzes.put_item(Item={'quiz_id': 'keyed', 'user_id': 'u', 'quiz_content': quiz_codec.encode(quiz),
+                               'answer_key': answer_key.build(quiz)})
+        submit_quiz.dynamodb = db
+
+        assert legacy_score(quizzes, 'legacy', answers) == expected
+        assert keyed_score(quizzes, 'keyed', answers) == expected
+        event = {'pathParameters': {'quiz_id': 'keyed'}, 'body': json.dumps({'answers': answers}),
+                 'requestContext': {'authorizer': {'claims': {'sub': 'u'}}}}
+        assert json.loads(submit_quiz.lambda_handler(event, None)['body'])['score'] == expected
+
+        for label, fn in [
+            ('read+score full quiz (legacy)', lambda: legacy_score(quizzes, 'legacy', answers)),
+            ('read+score answer_key', lambda: keyed_score(quizzes, 'keyed', answers)),
+            ('submit_quiz handler (incl. writes)', lambda: submit_quiz.lambda_handler(event, None)),
+        ]:
+            db.stats.reset()
+            fn()
+            calls = db.stats.calls
+            read_kb = db.stats.read_bytes / 1024
+            modeled = db.stats.modeled_ms
+            stats = _support.measure(fn, args.iterations)
+            rows.append((f'{count:>4} questions {label}', {
+                'calls': calls, 'read_kb': read_kb, 'modeled_ms': modeled, 'wall_ms': stats['mean_ms'],
+            }))
+    _support.print_table("Submission scoring, per submission", rows)
+
+
+if __name__ == '__main__':
+    main()
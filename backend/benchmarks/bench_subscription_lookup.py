@@ -0,0 +1,123 @@
+"""Post-confirmation hook: scanning the topic's subscriptions vs the Subscriptions registry.
+
+An in-memory SNS stand-in holds --users confirmed email subscriptions and
+pages list_subscriptions_by_topic 100 at a time like the service. Each row
+confirms --signups new users and re-confirms as many existing ones (as a
+password reset does). ``sns_calls`` and ``db_calls`` are per confirmation;
+``modeled_ms`` prices them at --sns-ms and --dynamodb-ms;
+``resubscribed`` counts existing users subscribed again. The "first page"
+row is the hook as it was; "all pages" is the same scan following NextToken.
+
+    cd backend && python benchmarks/bench_subscription_lookup.py --users 100 1000 10000
+"""
+import json
+import random
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from quizcraft import runtime
+
+PAGE_SIZE = 100
+TOPIC_ARN = 'arn:aws:sns:us-east-1:000000000000:quizcraft'
+
+
+class LocalSNS:
+    def __init__(self):
+        self.subscriptions = []
+        self.attributes = {}
+        self.calls = 0
+
+    def list_subscriptions_by_topic(self, TopicArn, NextToken=None):
+        self.calls += 1
+        start = int(NextToken or 0)
+        page = {'Subscriptions': self.subscriptions[start:start + PAGE_SIZE]}
+        if start + PAGE_SIZE < len(self.subscriptions):
+            page['NextToken'] = str(start + PAGE_SIZE)
+        return page
+
+    def get_subscription_attributes(self, SubscriptionArn):
+        self.calls += 1
+        return {'Attributes': self.attributes[SubscriptionArn]}
+
+    def subscribe(self, TopicArn, Protocol, Endpoint, Attributes, ReturnSubscriptionArn=False):
+        self.calls += 1
+        arn = f"{TopicArn}:{len(self.subscriptions)}"
+        self.subscriptions.append({'SubscriptionArn': arn, 'Protocol': Protocol, 'Endpoint': Endpoint})
+        self.attributes[arn] = dict(Attributes)
+        return {'SubscriptionArn': arn}
+
+
+def legacy_hook(sns, event, all_pages):
+    """The subscription check subscribe_to_sns made before the registry."""
+    user_email = event['request']['userAttributes']['email']
+    user_id = event['request']['userAttributes']['sub']
+    kwargs = {'TopicArn': TOPIC_ARN}
+    while True:
+        subscriptions = sns.list_subscriptions_by_topic(**kwargs)
+        for sub in subscriptions['Subscriptions']:
+            if sub['Protocol'] == 'email' and sub['Endpoint'] == user_email:
+                attributes = sns.get_subscription_attributes(SubscriptionArn=sub['SubscriptionArn'])
+                policy = json.loads(attributes['Attributes'].get('FilterPolicy') or '{}')
+                if policy.get('user_id') == [user_id]:
+                    return event
+        if not all_pages or 'NextToken' not in subscriptions:
+            break
+        kwargs['NextToken'] = subscriptions['NextToken']
+    sns.subscribe(TopicArn=TOPIC_ARN, Protocol='email', Endpoint=user_email,
+                  Attributes={'FilterPolicy': json.dumps({'user_id': [user_id]})})
+    return event
+
+
+def confirmation(n):
+    return {'request': {'userAttributes': {'email': f"user{n}@example.com", 'sub': f"user-{n}"}}}
+
+
+def run(users, signups, variant, sns_ms, dynamodb_ms, seed=0):
+    sns = LocalSNS()
+    db = LocalDynamoDB()
+    table = db.create_table('Subscriptions', 'user_id')
+    for n in range(users):
+        sns.subscribe(TopicArn=TOPIC_ARN, Protocol='email', Endpoint=f"user{n}@example.com",
+                      Attributes={'FilterPolicy': json.dumps({'user_id': [f"user-{n}"]})})
+        table.put_item(Item={'user_id': f"user-{n}", 'status': 'subscribed'})
+    sns.calls = 0
+    db.stats.reset()
+    rng = random.Random(seed)
+    events = [confirmation(users + i) for i in range(signups)] + \
+             [confirmation(rng.randrange(users)) for _ in range(signups)]
+    hook = _support.load_handler('subscribe_to_sns')
+    hook.sns = sns
+    runtime._tables['Subscriptions'] = table
+    for event in events:
+        if variant == 'registry':
+            hook.lambda_handler(event, None)
+        else:
+            legacy_hook(sns, event, all_pages=variant == 'all pages')
+    confirmations = len(events)
+    return {
+        'sns_calls': sns.calls / confirmations,
+        'db_calls': db.stats.calls / confirmations,
+        'modeled_ms': (sns.calls * sns_ms + db.stats.calls * dynamodb_ms) / confirmations,
+        'resubscribed': len(sns.subscriptions) - users - signups,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--signups', type=int, default=50)
+    parser.add_argument('--sns-ms', type=float, default=30.0)
+    parser.add_argument('--dynamodb-ms', type=float, default=5.0)
+    args = parser.parse_args()
+    _support.os.environ.update({'SNS_TOPIC_ARN': TOPIC_ARN, 'SUBSCRIPTIONS_TABLE': 'Subscriptions'})
+
+    rows = []
+    for users in args.users:
+        for variant in ('first page', 'all pages', 'registry'):
+            rows.append((f'{users:>6} users, {variant}',
+                         run(users, args.signups, variant, args.sns_ms, args.dynamodb_ms)))
+    _support.print_table(f"{args.signups} new + {args.signups} repeat confirmations per row", rows)
+
+
+if __name__ == '__main__':
+    main()
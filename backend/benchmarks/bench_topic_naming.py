@@ -0,0 +1,104 @@
+"""Unique topic naming: begins_with query and count vs the TopicNames reservation counter.
+
+A user has --existing topics named "Photosynthesis", "Photosynthesis (2)",
+...; --pdf-share of them came from PDFs, so their source_identifier is
+pdf_<hash>. Each row then names --names more generated "Photosynthesis"
+topics and stores them the way quiz_generator does. ``read_kb`` and
+``modeled_ms`` come from the local table's call stats (per name);
+``duplicates`` counts generated names that were already taken.
+
+    cd backend && python benchmarks/bench_topic_naming.py --existing 10 100 1000 5000
+"""
+import time
+import uuid
+import hashlib
+import argparse
+import _support
+from local_dynamodb import LocalDynamoDB
+from quizcraft import topic_names
+
+USER = 'user-1'
+BASE = 'Photosynthesis'
+
+
+def old_unique_name(topics_table, user_id, name):
+    """The query-and-count naming quiz_generator used before this change."""
+    response = topics_table.query(
+        IndexName='UniqueSourceIndex',
+        KeyConditionExpression='user_id = :uid AND begins_with(source_identifier, :sid)',
+        ExpressionAttributeValues={':uid': user_id, ':sid': f"topic_{name}"}
+    )
+    if response.get('Items'):
+        return f"{name} ({len(response['Items']) + 1})"
+    return name
+
+
+def store_topic(table, name, from_pdf):
+    digest = hashlib.sha256(name.encode('utf-8')).hexdigest()
+    table.put_item(Item={
+        'user_id': USER,
+        'topic_id': str(uuid.uuid4()),
+        'name': name,
+        'source': 'pdf' if from_pdf else 'topic',
+        'pdf_hash': digest if from_pdf else None,
+        's3_key': f"quizzes/{digest[:36]}.pdf" if from_pdf else None,
+        'source_identifier': f"pdf_{digest}" if from_pdf else f"topic_{name}",
+        'created_at': '2025-01-01T00:00:00Z',
+    })
+
+
+def setup(existing, pdf_share):
+    db = LocalDynamoDB()
+    topics = db.create_table('Topics', 'user_id', 'topic_id',
+                             indexes={'UniqueSourceIndex': ('user_id', 'source_identifier')})
+    names = db.create_table('TopicNames', 'user_id', 'name_key')
+    every = int(1 / pdf_share) if pdf_share else 0
+    for n in range(1, existing + 1):
+        store_topic(topics, topic_names.suffixed(BASE, n), bool(every) and n % every == 0)
+    for key, allocated in topic_names.allocations(
+            [topic_names.suffixed(BASE, n) for n in range(1, existing + 1)]).items():
+        names.put_item(Item={'user_id': USER, 'name_key': key, 'allocated': allocated})
+    return db, topics, names
+
+
+def run(db, topics, name_fn, count):
+    taken = {topic_names.name_key(t['name']) for t in topics.scan()['Items']}
+    duplicates = 0
+    db.stats.reset()
+    start = time.perf_counter()
+    for _ in range(count):
+        name = name_fn()
+        duplicates += topic_names.name_key(name) in taken
+        taken.add(topic_names.name_key(name))
+        store_topic(topics, name, True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    return {
+        'wall_ms': wall_ms / count,
+        'calls': db.stats.calls / count,
+        'read_kb': db.stats.read_bytes / 1024 / count,
+        'modeled_ms': db.stats.modeled_ms / count,
+        'duplicates': duplicates,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--existing', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--names', type=int, default=20)
+    parser.add_argument('--pdf-share', type=float, default=0.5)
+    args = parser.parse_args()
+
+    rows = []
+    for existing in args.existing:
+        db, topics, _ = setup(existing, args.pdf_share)
+        rows.append((f'{existing:>5} existing, begins_with + count',
+                     run(db, topics, lambda: old_unique_name(topics, USER, BASE), args.names)))
+        db, topics, names = setup(existing, args.pdf_share)
+        rows.append((f'{existing:>5} existing, reservation counter',
+                     run(db, topics, lambda: topic_names.reserve(names, USER, BASE), args.names)))
+    _support.print_table(f"Naming {args.names} generated topics per row "
+                         f"({args.pdf_share:.0%} of existing names from PDFs; per-name costs)", rows)
+
+
+if __name__ == '__main__':
+    main()
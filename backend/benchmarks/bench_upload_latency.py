@@ -0,0 +1,169 @@
+"""PDF upload latency with the topic named at upload vs by the generator, and LLM calls per quiz.
+
+Runs generate_quiz.lambda_handler on a multipart PDF upload against local
+Topics/Quizzes tables and in-memory S3/SQS stand-ins with a fixed
+round trip. The "named at upload" rows add the work the upload path did
+before this change: extract the text, store the sidecar and wait for a
+10-token topic-name completion from llm.StubClient, whose latency follows
+its token model (not scaled here). ``failure_rate`` on the stub adds the
+429 retries that make that call's tail. The generator rows count LLM
+calls for the first ten queued quizzes: generate_quiz_content plus the
+upload's naming call before, process_record with ``name_topic`` after.
+
+    cd backend && python benchmarks/bench_upload_latency.py --uploads 100 --failure-rate 0.05
+"""
+import io
+import json
+import time
+import base64
+import logging
+import argparse
+import _support
+from botocore.exceptions import ClientError
+from local_dynamodb import LocalDynamoDB
+from quizcraft import runtime, pdf_text, quiz_cache, llm
+
+BOUNDARY = '----QuizCraftBenchmarkBoundary'
+
+
+class LocalS3:
+    """put_object/get_object on a dict, sleeping ``latency_ms`` per call.
+
+    Like S3 for the generator's role, which has no s3:ListBucket, a GET on
+    a missing key fails with 403 AccessDenied rather than NoSuchKey.
+    """
+
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        time.sleep(self.latency_ms / 1000)
+        self.objects[Key] = Body if isinstance(Body, bytes) else Body.read()
+
+    def get_object(self, Bucket, Key):
+        time.sleep(self.latency_ms / 1000)
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'Access Denied'}}, 'GetObject')
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+
+class LocalSQS:
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.messages = []
+
+    def send_message(self, QueueUrl, MessageBody):
+        time.sleep(self.latency_ms / 1000)
+        self.messages.append(MessageBody)
+
+
+class LocalSNS:
+    def publish(self, **kwargs):
+        pass
+
+
+def upload_event(pdf, user_id, filename='Lecture notes.pdf'):
+    body = (
+        f'--{BOUNDARY}\r\n'
+        f'Content-Disposition: form-data; name="pdf"; filename="{filename}"\r\n'
+        'Content-Type: application/pdf\r\n\r\n'
+    ).encode() + pdf + f'\r\n--{BOUNDARY}--\r\n'.encode()
+    return {
+        'body': base64.b64encode(body).decode('ascii'),
+        'isBase64Encoded': True,
+        'headers': {'Content-Type': f'multipart/form-data; boundary={BOUNDARY}'},
+        'requestContext': {'authorizer': {'claims': {'sub': user_id}}},
+    }
+
+
+def setup(latency_ms):
+    db = LocalDynamoDB(latency_ms=latency_ms)
+    db.create_table('Topics', 'user_id', 'topic_id',
+                    indexes={'UniqueSourceIndex': ('user_id', 'source_identifier')})
+    db.create_table('Quizzes', 'quiz_id')
+    db.create_table('TopicNames', 'user_id', 'name_key')
+    runtime._tables.clear()
+    runtime._tables.update({name: db.Table(name) for name in ('Topics', 'Quizzes', 'TopicNames')})
+    return db, LocalS3(latency_ms), LocalSQS(latency_ms)
+
+
+def run_uploads(uploader, s3, sqs, pdfs, name_stub):
+    uploader.runtime._clients.update({'s3': s3, 'sqs': sqs})
+    samples = []
+    for i, pdf in enumerate(pdfs):
+        event = upload_event(pdf, f'user-{i % 10}')
+        start = time.perf_counter()
+        if name_stub:
+            # What the upload path did before: extract, store the sidecar, name the topic
+            text = pdf_text.extract_text(io.BytesIO(pdf))
+            pdf_text.put_text_sidecar(s3, 'bench', f'text/{i}.txt.gz', text)
+            name_stub.complete([{'role': 'user', 'content': f"Generate a concise topic name based on the "
+                                 f"following text:\n\n{text[:1000]}"}], max_tokens=10, temperature=0.5)
+        response = uploader.lambda_handler(event, None)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response['statusCode'] == 200, response
+    samples.sort()
+    return {
+        'p50_ms': samples[len(samples) // 2],
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        'max_ms': samples[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uploads', type=int, default=100)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--io-latency-ms', type=float, default=5.0)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    for name, value in (('S3_BUCKET', 'bench'), ('SQS_QUEUE_URL', 'bench'),
+                        ('QUIZZES_TABLE', 'Quizzes'), ('TOPICS_TABLE', 'Topics'),
+                        ('TOPIC_NAMES_TABLE', 'TopicNames'), ('LOG_LEVEL', 'ERROR')):
+        _support.os.environ[name] = value
+    uploader = _support.load_handler('generate_quiz')
+    generator = _support.load_handler('quiz_generator')
+    generator.cache = quiz_cache.QuizCache(quiz_cache.NullBackend())
+    generator.sns = LocalSNS()
+    logging.getLogger().setLevel(logging.ERROR)
+    pdfs = [_support.make_text_pdf(args.pages, seed=i) for i in range(args.uploads)]
+
+    rows = []
+    _, s3, sqs = setup(args.io_latency_ms)
+    stub = llm.StubClient(failure_rate=args.failure_rate, seed=1, retry_base_delay=0.5)
+    rows.append(('topic named at upload', run_uploads(uploader, s3, sqs, pdfs, stub)))
+    _, s3, sqs = setup(args.io_latency_ms)
+    rows.append(('placeholder, named by generator', run_uploads(uploader, s3, sqs, pdfs, None)))
+    _support.print_table(f"PDF upload latency ({args.uploads} uploads of {args.pages} pages, "
+                         f"{args.io_latency_ms:.0f} ms per S3/SQS/DynamoDB call, "
+                         f"{args.failure_rate:.0%} LLM 429s)", rows)
+
+    # Generate the queued quizzes: one LLM call names the topic and writes the questions.
+    # Before, the generator made the same quiz calls with the name already set at upload.
+    generator.s3 = s3
+    messages = sqs.messages[:10]
+    before = llm.StubClient(time_scale=0.01)
+    generator.llm_client = before
+    for body in messages:
+        # No sidecar exists yet: the AccessDenied GET falls back to the PDF and writes one
+        text = generator.load_pdf_text('bench', json.loads(body)['s3_key'], json.loads(body)['text_key'])
+        assert json.loads(body)['text_key'] in s3.objects
+        generator.generate_quiz_content(pdf_content=text)
+    after = llm.StubClient(time_scale=0.01)
+    generator.llm_client = after
+    for body in messages:
+        generator.process_record({'body': body}, None)
+    topics = [runtime._tables['Topics'].get_item(Key={'user_id': m['user_id'], 'topic_id': m['topic_id']})['Item']
+              for m in map(json.loads, messages)]
+    named = [t['name'] for t in topics if not t.get('name_pending')]
+    _support.print_table(f"Generator LLM calls per PDF quiz ({len(messages)} quizzes)", [
+        ('topic named at upload', {'llm_calls': (before.calls + len(messages)) / len(messages)}),
+        ('named by generator', {'llm_calls': after.calls / len(messages)}),
+    ])
+    print(f"{len(named)} of {len(topics)} topics named, e.g. {named[:3]}")
+
+
+if __name__ == '__main__':
+    main()
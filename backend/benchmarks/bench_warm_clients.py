@@ -0,0 +1,61 @@
+"""Warm-invocation setup cost: per-request clients vs the shared runtime module.
+
+The "before" path mirrors what generate_quiz used to do on every request:
+build Secrets Manager, S3, SQS and DynamoDB clients and fetch the OpenAI key.
+The "after" path goes through quizcraft.runtime. Secrets Manager is a local
+stub with a fixed simulated round-trip, so no AWS access is needed.
+
+    cd backend && python benchmarks/bench_warm_clients.py
+"""
+import time
+import argparse
+import _support  # noqa: F401  (sets sys.path and a dummy region)
+import boto3
+from quizcraft import runtime
+
+
+class StubSecretsClient:
+    """Secrets Manager stand-in that sleeps to simulate a network round trip."""
+
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def get_secret_value(self, SecretId):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        return {'SecretString': 'sk-benchmark', 'VersionId': 'v1'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--secret-latency-ms', type=float, default=25.0)
+    args = parser.parse_args()
+
+    before_stub = StubSecretsClient(args.secret_latency_ms)
+    after_stub = StubSecretsClient(args.secret_latency_ms)
+    cache = runtime.SecretCache(ttl_seconds=300, secrets_client=after_stub)
+
+    def before():
+        boto3.client('secretsmanager')
+        boto3.client('s3')
+        boto3.client('sqs')
+        boto3.resource('dynamodb').Table('Quizzes')
+        before_stub.get_secret_value(SecretId='openai')['SecretString']
+
+    def after():
+        runtime.client('s3')
+        runtime.client('sqs')
+        runtime.table('Quizzes')
+        cache.get('openai')
+
+    rows = [
+        ('per-request clients', dict(_support.measure(before, args.iterations), secret_calls=before_stub.calls)),
+        ('quizcraft.runtime', dict(_support.measure(after, args.iterations), secret_calls=after_stub.calls)),
+    ]
+    _support.print_table(f"Warm invocation setup ({args.iterations} iterations)", rows)
+
+
+if __name__ == '__main__':
+    main()
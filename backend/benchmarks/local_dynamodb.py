@@ -0,0 +1,665 @@
+"""In-memory DynamoDB stand-in for the offline benchmarks.
+
+It implements the subset of the boto3 Table API the handlers use, with
+string expressions only, and enforces DynamoDB's paging rules. Query and
+Scan stop once a page has read 1 MB of items and return LastEvaluatedKey;
+Limit counts items evaluated before filtering. Every call is recorded with
+the bytes it read, so benchmarks can report a modeled service latency
+(round trip plus read throughput) next to wall time. TransactWriteItems is
+available through ``meta.client``, BatchGetItem and BatchWriteItem on the
+resource (with optional simulated UnprocessedKeys and UnprocessedItems),
+and tables can record a change stream in the DynamoDB Streams record
+format.
+"""
+import re
+import json
+import time
+import random
+import itertools
+import threading
+from decimal import Decimal
+
+PAGE_LIMIT_BYTES = 1024 * 1024
+BATCH_GET_LIMIT_BYTES = 16 * 1024 * 1024
+
+_sequence_numbers = itertools.count(1)
+
+
+class ConditionalCheckFailedException(Exception):
+    """Raised when a ConditionExpression does not hold."""
+
+    def __init__(self, message="The conditional request failed", item=None):
+        super().__init__(message)
+        self.response = {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': message}}
+        # Set by ReturnValuesOnConditionCheckFailure='ALL_OLD' when the item exists
+        if item is not None:
+            self.response['Item'] = dict(item)
+
+
+class TransactionCanceledException(Exception):
+    """Raised by transact_write_items, with one CancellationReasons entry per action."""
+
+    def __init__(self, reasons):
+        codes = ', '.join(r['Code'] for r in reasons)
+        message = f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]"
+        super().__init__(message)
+        self.response = {
+            'Error': {'Code': 'TransactionCanceledException', 'Message': message},
+            'CancellationReasons': reasons,
+        }
+
+
+class _Exceptions:
+    ConditionalCheckFailedException = ConditionalCheckFailedException
+    TransactionCanceledException = TransactionCanceledException
+
+
+class CallStats:
+    """Counts calls and bytes read, and turns them into a modeled latency."""
+
+    def __init__(self, rtt_ms=4.0, ms_per_mb=12.0):
+        self.rtt_ms = rtt_ms
+        self.ms_per_mb = ms_per_mb
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.read_bytes = 0
+
+    def record(self, read_bytes):
+        self.calls += 1
+        self.read_bytes += read_bytes
+
+    @property
+    def modeled_ms(self):
+        return self.calls * self.rtt_ms + self.read_bytes / (1024 * 1024) * self.ms_per_mb
+
+
+def item_size(item):
+    """Approximate DynamoDB's item size: attribute names plus encoded values."""
+    return sum(len(name.encode('utf-8')) + _value_size(value) for name, value in item.items())
+
+
+def _value_size(value):
+    value = getattr(value, 'value', value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        digits = len(str(value).lstrip('-').replace('.', '').strip('0')) or 1
+        return (digits + 1) // 2 + 1
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode('utf-8')) + _value_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 3 + sum(_value_size(v) + 1 for v in value)
+    return len(json.dumps(value, default=str))
+
+
+def _resolve(token, names, values):
+    token = token.strip()
+    if token.startswith(':'):
+        return values[token]
+    return names.get(token, token) if token.startswith('#') else token
+
+
+_KEY_CONDITION = re.compile(
+    r'^\s*(?P<hash>[#\w]+)\s*=\s*(?P<hash_value>:\w+)\s*'
+    r'(?:AND\s+(?:'
+    r'begins_with\s*\(\s*(?P<bw_attr>[#\w]+)\s*,\s*(?P<bw_value>:\w+)\s*\)'
+    r'|(?P<bt_attr>[#\w]+)\s+BETWEEN\s+(?P<bt_low>:\w+)\s+AND\s+(?P<bt_high>:\w+)'
+    r'|(?P<cmp_attr>[#\w]+)\s*(?P<op><=|>=|<|>|=)\s*(?P<cmp_value>:\w+)'
+    r'))?\s*$',
+    re.IGNORECASE,
+)
+
+_COMPARE = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def _parse_key_condition(expression, names, values):
+    match = _KEY_CONDITION.match(expression)
+    if not match:
+        raise ValueError(f"Unsupported KeyConditionExpression: {expression}")
+    hash_attr = _resolve(match.group('hash'), names, values)
+    hash_value = values[match.group('hash_value')]
+    range_test = None
+    if match.group('bw_attr'):
+        attr, prefix = _resolve(match.group('bw_attr'), names, values), values[match.group('bw_value')]
+        range_test = (attr, lambda v: isinstance(v, str) and v.startswith(prefix))
+    elif match.group('bt_attr'):
+        attr = _resolve(match.group('bt_attr'), names, values)
+        low, high = values[match.group('bt_low')], values[match.group('bt_high')]
+        range_test = (attr, lambda v: v is not None and low <= v <= high)
+    elif match.group('cmp_attr'):
+        attr = _resolve(match.group('cmp_attr'), names, values)
+        op, operand = match.group('op'), values[match.group('cmp_value')]
+        range_test = (attr, lambda v: v is not None and _COMPARE[op](v, operand))
+    return hash_attr, hash_value, range_test
+
+
+def evaluate_condition(expression, item, names=None, values=None):
+    """Evaluate a small ConditionExpression/FilterExpression grammar against an item.
+
+    Supports AND/OR of comparisons, attribute_exists, attribute_not_exists,
+    begins_with and IN; that covers every expression the handlers send.
+    """
+    names = names or {}
+    values = values or {}
+    if item is None:
+        item = {}
+
+    def term(text):
+        text = text.strip()
+        while text.startswith('(') and text.endswith(')'):
+            text = text[1:-1].strip()
+        m = re.match(r'^attribute_not_exists\s*\(\s*([#\w.]+)\s*\)$', text)
+        if m:
+            return _resolve(m.group(1), names, values) not in item
+        m = re.match(r'^attribute_exists\s*\(\s*([#\w.]+)\s*\)$', text)
+        if m:
+            return _resolve(m.group(1), names, values) in item
+        m = re.match(r'^begins_with\s*\(\s*([#\w]+)\s*,\s*(:\w+)\s*\)$', text)
+        if m:
+            value = item.get(_resolve(m.group(1), names, values))
+            return isinstance(value, str) and value.startswith(values[m.group(2)])
+        m = re.match(r'^([#\w]+)\s+IN\s*\((.*)\)$', text, re.IGNORECASE)
+        if m:
+            value = item.get(_resolve(m.group(1), names, values))
+            return value in [values[v.strip()] for v in m.group(2).split(',')]
+        m = re.match(r'^([#\w]+)\s*(<>|<=|>=|<|>|=)\s*([#:\w]+)$', text)
+        if m:
+            left = item.get(_resolve(m.group(1), names, values))
+            right_token = m.group(3)
+            right = values[right_token] if right_token.startswith(':') else item.get(_resolve(right_token, names, values))
+            if left is None or right is None:
+                return m.group(2) == '<>' and left != right
+            return _COMPARE[m.group(2)](left, right)
+        raise ValueError(f"Unsupported condition: {text}")
+
+    return any(
+        all(term(part) for part in re.split(r'\s+AND\s+', clause, flags=re.IGNORECASE))
+        for clause in re.split(r'\s+OR\s+', expression, flags=re.IGNORECASE)
+    )
+
+
+def _project(item, projection, names):
+    if not projection:
+        return dict(item)
+    attrs = [_resolve(a, names, {}) for a in projection.split(',')]
+    return {a: item[a] for a in attrs if a in item}
+
+
+class LocalTable:
+    """A single table with optional GSIs, indexed by hash key for O(matching items) queries."""
+
+    def __init__(self, name, hash_key, range_key=None, indexes=None, stats=None, latency_ms=0.0, stream=False):
+        self.name = name
+        self.table_name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.indexes = dict(indexes or {})
+        self.stats = stats or CallStats()
+        self.meta = type('Meta', (), {'client': type('Client', (), {'exceptions': _Exceptions})()})()
+        self._items = {}
+        self._sizes = {}
+        self._index_buckets = {name: {} for name in self.indexes}
+        self._lock = threading.RLock()
+        self.latency_ms = latency_ms
+        # Keys held by in-flight transactions, for conflict detection
+        self._transaction_keys = set()
+        # Change records in DynamoDB Streams format, when the stream is enabled
+        self.stream = [] if stream else None
+
+    # -- helpers -------------------------------------------------------
+    def _wait(self):
+        # Simulated network round trip, outside the table lock so callers overlap
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def _pk(self, item):
+        return (item[self.hash_key], item.get(self.range_key) if self.range_key else None)
+
+    def _index_add(self, pk, item):
+        for name, (hash_attr, range_attr) in self.indexes.items():
+            if hash_attr in item and (range_attr is None or range_attr in item):
+                self._index_buckets[name].setdefault(item[hash_attr], {})[pk] = item
+
+    def _index_remove(self, pk, item):
+        for name, (hash_attr, _) in self.indexes.items():
+            bucket = self._index_buckets[name].get(item.get(hash_attr))
+            if bucket is not None:
+                bucket.pop(pk, None)
+
+    def _store(self, item):
+        pk = self._pk(item)
+        old = self._items.get(pk)
+        if old is not None:
+            self._index_remove(pk, old)
+        self._items[pk] = item
+        self._sizes[pk] = item_size(item)
+        self._index_add(pk, item)
+        self._emit('MODIFY' if old is not None else 'INSERT', pk, old, item)
+
+    def _remove(self, pk):
+        old = self._items.pop(pk)
+        del self._sizes[pk]
+        self._index_remove(pk, old)
+        self._emit('REMOVE', pk, old, None)
+
+    def _emit(self, event_name, pk, old, new):
+        if self.stream is None:
+            return
+        from boto3.dynamodb.types import TypeSerializer
+        serialize = TypeSerializer().serialize
+        key = {self.hash_key: pk[0]}
+        if self.range_key:
+            key[self.range_key] = pk[1]
+        change = {
+            'Keys': {k: serialize(v) for k, v in key.items()},
+            'SequenceNumber': f"{next(_sequence_numbers):021d}",
+        }
+        if new is not None:
+            change['NewImage'] = {k: serialize(v) for k, v in new.items()}
+        if old is not None:
+            change['OldImage'] = {k: serialize(v) for k, v in old.items()}
+        self.stream.append({'eventName': event_name, 'eventSource': 'aws:dynamodb', 'dynamodb': change})
+
+    def _key_tuple(self, key):
+        return (key[self.hash_key], key.get(self.range_key) if self.range_key else None)
+
+    def __len__(self):
+        return len(self._items)
+
+    # -- item API ------------------------------------------------------
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None, **kwargs):
+        self._wait()
+        with self._lock:
+            item = dict(Item)
+            existing = self._items.get(self._pk(item))
+            if ConditionExpression and not evaluate_condition(
+                    ConditionExpression, existing, ExpressionAttributeNames, ExpressionAttributeValues):
+                self.stats.record(0)
+                raise ConditionalCheckFailedException()
+            self._store(item)
+            self.stats.record(0)
+            return {}
+
+    def get_item(self, Key, ProjectionExpression=None, ExpressionAttributeNames=None,
+                 ConsistentRead=False, **kwargs):
+        self._wait()
+        with self._lock:
+            pk = self._key_tuple(Key)
+            item = self._items.get(pk)
+            if item is None:
+                self.stats.record(0)
+                return {}
+            # Capacity is charged on the whole item, but only projected attributes cross the wire
+            projected = _project(item, ProjectionExpression, ExpressionAttributeNames or {})
+            self.stats.record(item_size(projected) if ProjectionExpression else self._sizes[pk])
+            return {'Item': projected}
+
+    def delete_item(self, Key, ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues=None, **kwargs):
+        self._wait()
+        with self._lock:
+            pk = self._key_tuple(Key)
+            existing = self._items.get(pk)
+            if ConditionExpression and not evaluate_condition(
+                    ConditionExpression, existing, ExpressionAttributeNames, ExpressionAttributeValues):
+                self.stats.record(0)
+                raise ConditionalCheckFailedException()
+            self.stats.record(0)
+            if existing is None:
+                return {}
+            self._remove(pk)
+            return {'Attributes': dict(existing)} if ReturnValues == 'ALL_OLD' else {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ConditionExpression=None, ReturnValues=None,
+                    ReturnValuesOnConditionCheckFailure=None, **kwargs):
+        self._wait()
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        with self._lock:
+            pk = self._key_tuple(Key)
+            existing = self._items.get(pk)
+            if ConditionExpression and not evaluate_condition(ConditionExpression, existing, names, values):
+                self.stats.record(0)
+                raise ConditionalCheckFailedException(
+                    item=existing if ReturnValuesOnConditionCheckFailure == 'ALL_OLD' else None)
+            item = dict(existing) if existing else dict(Key)
+            _apply_update(item, UpdateExpression, names, values)
+            self._store(item)
+            self.stats.record(0)
+            if ReturnValues in ('ALL_NEW', 'UPDATED_NEW'):
+                return {'Attributes': dict(item)}
+            return {}
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues=None, ExpressionAttributeNames=None,
+              IndexName=None, Limit=None, ExclusiveStartKey=None, ScanIndexForward=True,
+              ProjectionExpression=None, FilterExpression=None, Select=None, ConsistentRead=False, **kwargs):
+        self._wait()
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        hash_attr, hash_value, range_test = _parse_key_condition(KeyConditionExpression, names, values)
+        with self._lock:
+            if IndexName:
+                index_hash, index_range = self.indexes[IndexName]
+                if hash_attr != index_hash:
+                    raise ValueError(f"{hash_attr} is not the hash key of {IndexName}")
+                candidates = list(self._index_buckets[IndexName].get(hash_value, {}).items())
+                range_attr = index_range
+            else:
+                if hash_attr != self.hash_key:
+                    raise ValueError(f"{hash_attr} is not the hash key of {self.name}")
+                candidates = [(pk, item) for pk, item in self._items.items() if pk[0] == hash_value]
+                range_attr = self.range_key
+            if range_test:
+                attr, test = range_test
+                candidates = [(pk, item) for pk, item in candidates if test(item.get(attr))]
+            if range_attr:
+                candidates.sort(key=lambda c: (c[1].get(range_attr), c[0]), reverse=not ScanIndexForward)
+            else:
+                candidates.sort(key=lambda c: c[0], reverse=not ScanIndexForward)
+            return self._page(candidates, IndexName, range_attr, Limit, ExclusiveStartKey,
+                              FilterExpression, names, values, ProjectionExpression, Select)
+
+    def scan(self, FilterExpression=None, ExpressionAttributeValues=None, ExpressionAttributeNames=None,
+             Limit=None, ExclusiveStartKey=None, ProjectionExpression=None, Select=None, **kwargs):
+        self._wait()
+        with self._lock:
+            candidates = list(self._items.items())
+            return self._page(candidates, None, None, Limit, ExclusiveStartKey, FilterExpression,
+                              ExpressionAttributeNames or {}, ExpressionAttributeValues or {},
+                              ProjectionExpression, Select)
+
+    def _page(self, candidates, index_name, range_attr, limit, start_key, filter_expression,
+              names, values, projection, select):
+        start = 0
+        if start_key:
+            start_pk = self._key_tuple(start_key)
+            for i, (pk, _) in enumerate(candidates):
+                if pk == start_pk:
+                    start = i + 1
+                    break
+        items = []
+        read_bytes = 0
+        evaluated = 0
+        last_key = None
+        i = start
+        while i < len(candidates):
+            pk, item = candidates[i]
+            read_bytes += self._sizes[pk]
+            evaluated += 1
+            if not filter_expression or evaluate_condition(filter_expression, item, names, values):
+                items.append(item)
+            i += 1
+            if (limit and evaluated >= limit) or read_bytes >= PAGE_LIMIT_BYTES:
+                if i < len(candidates):
+                    last_key = self._last_evaluated_key(item, index_name, range_attr)
+                break
+        self.stats.record(read_bytes)
+        response = {'Count': len(items), 'ScannedCount': evaluated}
+        if select != 'COUNT':
+            response['Items'] = [_project(item, projection, names) for item in items]
+        if last_key:
+            response['LastEvaluatedKey'] = last_key
+        return response
+
+    def _last_evaluated_key(self, item, index_name, range_attr):
+        key = {self.hash_key: item[self.hash_key]}
+        if self.range_key:
+            key[self.range_key] = item[self.range_key]
+        if index_name:
+            index_hash, index_range = self.indexes[index_name]
+            key[index_hash] = item[index_hash]
+            if index_range:
+                key[index_range] = item[index_range]
+        return key
+
+
+def _split_top_level(text, sep=','):
+    parts, depth, current = [], 0, ''
+    for ch in text:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current)
+    return parts
+
+
+def _apply_update(item, expression, names, values):
+    """Apply SET / ADD / REMOVE clauses (with if_not_exists and +/- arithmetic)."""
+    clauses = re.split(r'\b(SET|ADD|REMOVE)\b', expression)
+    action = None
+    for chunk in clauses:
+        chunk = chunk.strip()
+        if chunk in ('SET', 'ADD', 'REMOVE'):
+            action = chunk
+            continue
+        if not chunk:
+            continue
+        for assignment in _split_top_level(chunk):
+            assignment = assignment.strip()
+            if action == 'SET':
+                target, value_expr = [p.strip() for p in assignment.split('=', 1)]
+                item[_resolve(target, names, values)] = _eval_value(value_expr, item, names, values)
+            elif action == 'ADD':
+                target, operand = assignment.split()
+                attr = _resolve(target, names, values)
+                delta = values[operand]
+                if isinstance(delta, set):
+                    item[attr] = set(item.get(attr, set())) | delta
+                else:
+                    item[attr] = item.get(attr, 0) + delta
+            elif action == 'REMOVE':
+                item.pop(_resolve(assignment, names, values), None)
+
+
+def _eval_value(expr, item, names, values):
+    expr = expr.strip()
+    parts = _split_top_level(expr.replace(' + ', ',+,').replace(' - ', ',-,'))
+    if len(parts) == 3:
+        left = _eval_value(parts[0], item, names, values)
+        right = _eval_value(parts[2], item, names, values)
+        return left + right if parts[1].strip() == '+' else left - right
+    m = re.match(r'^if_not_exists\s*\(\s*([#\w]+)\s*,\s*(:\w+)\s*\)$', expr)
+    if m:
+        attr = _resolve(m.group(1), names, values)
+        return item[attr] if attr in item else values[m.group(2)]
+    m = re.match(r'^list_append\s*\(\s*(.+?)\s*,\s*(.+?)\s*\)$', expr)
+    if m:
+        return list(_eval_value(m.group(1), item, names, values)) + list(_eval_value(m.group(2), item, names, values))
+    if expr.startswith(':'):
+        return values[expr]
+    return item.get(_resolve(expr, names, values))
+
+
+class LocalClient:
+    """The slice of the low-level client the handlers reach through ``resource.meta.client``.
+
+    Transactions hold their items for one simulated round trip inside the
+    service (DynamoDB does a prepare and a commit). A transaction that
+    touches an item another transaction holds is cancelled with a
+    TransactionConflict reason, like the service does under contention.
+    """
+
+    exceptions = _Exceptions
+
+    def __init__(self, db):
+        self.db = db
+
+    def transact_write_items(self, TransactItems, ClientRequestToken=None, **kwargs):
+        if not TransactItems or len(TransactItems) > 100:
+            raise ValueError("TransactItems must contain between 1 and 100 actions")
+        actions = []
+        for entry in TransactItems:
+            (kind, spec), = entry.items()
+            table = self.db.tables[spec['TableName']]
+            key = spec['Item'] if kind == 'Put' else spec['Key']
+            actions.append((kind, spec, table, table._key_tuple(key)))
+
+        half_trip = self.db.latency_ms / 2000
+        if half_trip:
+            time.sleep(half_trip)
+        with self.db._transaction_lock:
+            reasons = [{'Code': 'TransactionConflict' if pk in table._transaction_keys else 'None'}
+                       for _, _, table, pk in actions]
+            conflict = any(r['Code'] != 'None' for r in reasons)
+            if not conflict:
+                for _, _, table, pk in actions:
+                    table._transaction_keys.add(pk)
+        if conflict:
+            if half_trip:
+                time.sleep(half_trip)
+            self.db.stats.record(0)
+            raise TransactionCanceledException(reasons)
+        try:
+            if half_trip:
+                # Prepare and commit rounds inside the service
+                time.sleep(2 * half_trip)
+            with self.db._transaction_lock:
+                self._apply(actions)
+        finally:
+            with self.db._transaction_lock:
+                for _, _, table, pk in actions:
+                    table._transaction_keys.discard(pk)
+        if half_trip:
+            time.sleep(half_trip)
+        self.db.stats.record(0)
+        return {}
+
+    def _apply(self, actions):
+        reasons = []
+        for kind, spec, table, pk in actions:
+            condition = spec.get('ConditionExpression')
+            ok = not condition or evaluate_condition(
+                condition, table._items.get(pk), spec.get('ExpressionAttributeNames'),
+                spec.get('ExpressionAttributeValues'))
+            reasons.append({'Code': 'None' if ok else 'ConditionalCheckFailed'})
+        if any(r['Code'] != 'None' for r in reasons):
+            self.db.stats.record(0)
+            raise TransactionCanceledException(reasons)
+        for kind, spec, table, pk in actions:
+            existing = table._items.get(pk)
+            if kind == 'Put':
+                table._store(dict(spec['Item']))
+            elif kind == 'Update':
+                item = dict(existing) if existing else dict(spec['Key'])
+                _apply_update(item, spec['UpdateExpression'], spec.get('ExpressionAttributeNames') or {},
+                              spec.get('ExpressionAttributeValues') or {})
+                table._store(item)
+            elif kind == 'Delete' and existing is not None:
+                table._remove(pk)
+
+
+class LocalDynamoDB:
+    """Resource-like container: ``LocalDynamoDB().Table(name)`` after ``create_table``.
+
+    ``latency_ms`` adds a simulated round trip to every call, so concurrent
+    benchmarks overlap the way they would against the service.
+    """
+
+    def __init__(self, stats=None, latency_ms=0.0, unprocessed_rate=0.0, seed=0):
+        self.stats = stats or CallStats()
+        self.latency_ms = latency_ms
+        # Fraction of batch keys or writes handed back unprocessed, like a throttled table
+        self.unprocessed_rate = unprocessed_rate
+        self._rng = random.Random(seed)
+        self.tables = {}
+        self._transaction_lock = threading.RLock()
+        self.meta = type('Meta', (), {'client': LocalClient(self)})()
+
+    def create_table(self, name, hash_key, range_key=None, indexes=None, stream=False):
+        table = LocalTable(name, hash_key, range_key, indexes, stats=self.stats, latency_ms=self.latency_ms,
+                           stream=stream)
+        table.meta = self.meta
+        self.tables[name] = table
+        return table
+
+    def Table(self, name):
+        return self.tables[name]
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if sum(len(r['Keys']) for r in RequestItems.values()) > 100:
+            raise ValueError("Too many items requested for the BatchGetItem call")
+        responses, unprocessed = {}, {}
+        read_bytes = 0
+        for name, request in RequestItems.items():
+            table = self.tables[name]
+            pks = [table._key_tuple(key) for key in request['Keys']]
+            if len(set(pks)) != len(pks):
+                raise ValueError("Provided list of item keys contains duplicates")
+            names = request.get('ExpressionAttributeNames') or {}
+            found, deferred = [], []
+            with table._lock:
+                for key, pk in zip(request['Keys'], pks):
+                    if read_bytes >= BATCH_GET_LIMIT_BYTES or self._rng.random() < self.unprocessed_rate:
+                        deferred.append(key)
+                        continue
+                    item = table._items.get(pk)
+                    if item is not None:
+                        projected = _project(item, request.get('ProjectionExpression'), names)
+                        read_bytes += item_size(projected)
+                        found.append(projected)
+            responses[name] = found
+            if deferred:
+                unprocessed[name] = dict(request, Keys=deferred)
+        self.stats.record(read_bytes)
+        return {'Responses': responses, 'UnprocessedKeys': unprocessed}
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if sum(len(r) for r in RequestItems.values()) > 25:
+            raise ValueError("Too many items requested for the BatchWriteItem call")
+        unprocessed = {}
+        for name, requests in RequestItems.items():
+            table = self.tables[name]
+            pks = [table._key_tuple(r['DeleteRequest']['Key']) if 'DeleteRequest' in r
+                   else table._pk(r['PutRequest']['Item']) for r in requests]
+            if len(set(pks)) != len(pks):
+                raise ValueError("Provided list of item keys contains duplicates")
+            deferred = []
+            with table._lock:
+                for request, pk in zip(requests, pks):
+                    if self._rng.random() < self.unprocessed_rate:
+                        deferred.append(request)
+                    elif 'PutRequest' in request:
+                        table._store(dict(request['PutRequest']['Item']))
+                    elif pk in table._items:
+                        table._remove(pk)
+            if deferred:
+                unprocessed[name] = deferred
+        self.stats.record(0)
+        return {'UnprocessedItems': unprocessed}
+
+
+def to_decimal(value):
+    """Convert floats in a nested structure to Decimal, as boto3 requires."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_decimal(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_decimal(v) for v in value]
+    return value
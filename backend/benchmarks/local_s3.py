@@ -0,0 +1,154 @@
+"""In-memory S3 stand-in for the offline benchmarks, including presigned POST uploads.
+
+generate_presigned_post returns a form the way boto3 does: the caller's
+fields plus a base64 policy and its signature. post_form plays the browser
+and S3's checks on it: the signature must match, the policy must not have
+expired, every form field must be allowed by a condition and the file size
+must be in content-length-range. An accepted upload is stored with its
+x-amz-meta-* fields as Metadata and returns the ObjectCreated notification
+S3 would send, ready to pass to a handler. ``calls`` counts requests per
+operation, so a bulk DeleteObjects shows up as one call.
+"""
+import io
+import hmac
+import json
+import time
+import base64
+import hashlib
+import threading
+from urllib.parse import quote_plus
+from botocore.exceptions import ClientError
+
+SIGNING_KEY = b'local-s3-signing-key'
+# Form fields S3 itself consumes; they need no policy condition
+UNCHECKED_FIELDS = {'policy', 'x-amz-signature', 'file'}
+
+
+class NoSuchKey(ClientError):
+    """What boto3 raises for a GET on a missing key when the caller may list the bucket."""
+
+    def __init__(self, key):
+        super().__init__({'Error': {'Code': 'NoSuchKey', 'Message': f'The specified key does not exist: {key}'}},
+                         'GetObject')
+
+
+class UploadRejected(Exception):
+    """S3 answered the form POST with 403 (policy) or 400 (size)."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class StreamingBody:
+    """The part of botocore's StreamingBody the handlers use."""
+
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    def read(self, amt=None):
+        return self._stream.read(amt)
+
+    def iter_chunks(self, chunk_size=1024):
+        while True:
+            chunk = self._stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class LocalS3:
+    class exceptions:
+        NoSuchKey = NoSuchKey
+
+    def __init__(self, url='https://local-s3.example.com', clock=time.time):
+        self.url = url
+        self.clock = clock
+        self.objects = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def put_object(self, Bucket, Key, Body, Metadata=None, **kwargs):
+        self._count('put_object')
+        body = Body if isinstance(Body, bytes) else Body.read()
+        self.objects[(Bucket, Key)] = {'Body': body, 'Metadata': dict(Metadata or {}),
+                                       'ContentType': kwargs.get('ContentType')}
+        return {}
+
+    def get_object(self, Bucket, Key):
+        self._count('get_object')
+        obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise NoSuchKey(Key)
+        return {'Body': StreamingBody(obj['Body']), 'ContentLength': len(obj['Body']),
+                'ContentType': obj['ContentType'], 'Metadata': dict(obj['Metadata'])}
+
+    def delete_object(self, Bucket, Key):
+        self._count('delete_object')
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete):
+        self._count('delete_objects')
+        if len(Delete['Objects']) > 1000:
+            raise ValueError("MalformedXML: more than 1000 keys")
+        deleted = []
+        for obj in Delete['Objects']:
+            self.objects.pop((Bucket, obj['Key']), None)
+            deleted.append({'Key': obj['Key']})
+        return {} if Delete.get('Quiet') else {'Deleted': deleted}
+
+    def generate_presigned_post(self, Bucket, Key, Fields=None, Conditions=None, ExpiresIn=3600):
+        self._count('generate_presigned_post')
+        fields = dict(Fields or {}, key=Key)
+        conditions = list(Conditions or []) + [{'bucket': Bucket}, {'key': Key}]
+        expiration = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.clock() + ExpiresIn))
+        policy = base64.b64encode(json.dumps({'expiration': expiration, 'conditions': conditions}).encode())
+        fields['policy'] = policy.decode('ascii')
+        fields['x-amz-signature'] = hmac.new(SIGNING_KEY, policy, hashlib.sha256).hexdigest()
+        return {'url': f"{self.url}/{Bucket}", 'fields': fields}
+
+    def post_form(self, url, fields, data):
+        """Upload ``data`` with a presigned form; returns the ObjectCreated event."""
+        bucket = url.rsplit('/', 1)[-1]
+        policy = fields.get('policy', '').encode('ascii')
+        expected = hmac.new(SIGNING_KEY, policy, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, fields.get('x-amz-signature', '')):
+            raise UploadRejected(403, "SignatureDoesNotMatch")
+        document = json.loads(base64.b64decode(policy))
+        if time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.clock())) > document['expiration']:
+            raise UploadRejected(403, "Policy expired")
+        exact, size_range = {}, None
+        for condition in document['conditions']:
+            if isinstance(condition, dict):
+                exact.update(condition)
+            elif condition[0] == 'content-length-range':
+                size_range = (condition[1], condition[2])
+        values = dict(fields, bucket=bucket)
+        for name, value in values.items():
+            if name in UNCHECKED_FIELDS:
+                continue
+            if name not in exact:
+                raise UploadRejected(403, f"Extra input field: {name}")
+            if exact[name] != value:
+                raise UploadRejected(403, f"Policy condition failed: [\"eq\", \"${name}\", \"{exact[name]}\"]")
+        for name in exact:
+            if name not in values:
+                raise UploadRejected(403, f"Missing field: {name}")
+        if size_range and not size_range[0] <= len(data) <= size_range[1]:
+            raise UploadRejected(400, "EntityTooLarge" if len(data) > size_range[1] else "EntityTooSmall")
+
+        key = fields['key']
+        metadata = {name[len('x-amz-meta-'):]: value for name, value in fields.items()
+                    if name.startswith('x-amz-meta-')}
+        self.objects[(bucket, key)] = {'Body': bytes(data), 'Metadata': metadata,
+                                       'ContentType': fields.get('Content-Type')}
+        return {'Records': [{
+            'eventSource': 'aws:s3',
+            'eventName': 'ObjectCreated:Post',
+            's3': {'bucket': {'name': bucket}, 'object': {'key': quote_plus(key, safe='/'), 'size': len(data)}},
+        }]}
@@ -0,0 +1,48 @@
+import os
+import json
+import time
+import logging
+from quizcraft import runtime, cleanup, request_log
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+dynamodb = runtime.resource('dynamodb')
+
+# Seconds kept back to queue the rest of a cleanup before Lambda stops the invocation
+DEADLINE_RESERVE_SECONDS = 20
+
+def lambda_handler(event, context):
+    """Run the cascades delete_quiz queued: one large quiz, or all of a user's quizzes.
+
+    A user cleanup that runs out of time queues itself again to carry on.
+    Failed messages are reported in batchItemFailures and retried by SQS;
+    every step is idempotent, so a retry just finishes the job.
+    """
+    request_log.begin(logger, context)
+    request_log.log_event(logger, event)
+    deadline = None
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - DEADLINE_RESERVE_SECONDS
+    cascade = cleanup.Cascade.from_environment(dynamodb, runtime.client('s3'))
+
+    batch_item_failures = []
+    for record in event.get('Records', []):
+        try:
+            process_message(cascade, json.loads(record['body']), deadline)
+        except Exception as e:
+            logger.error(f"Error processing message {record['messageId']}: {str(e)}", exc_info=True)
+            batch_item_failures.append({'itemIdentifier': record['messageId']})
+    return {'batchItemFailures': batch_item_failures}
+
+def process_message(cascade, message, deadline):
+    action = message['action']
+    if action == 'delete_quiz':
+        cascade.delete_quiz(message)
+    elif action == 'delete_user_quizzes':
+        done, counts = cascade.delete_user_quizzes(message['user_id'], deadline)
+        if not done:
+            logger.info(f"Out of time after {counts}, queueing the rest")
+            cleanup.send_cleanup_message(runtime.client('sqs'), os.environ['CLEANUP_QUEUE_URL'], message)
+    else:
+        logger.warning(f"Ignoring unknown cleanup action: {action}")
@@ -1,51 +1,52 @@
-import json
-import boto3
 import os
 import logging
+from quizcraft import runtime, responses, cleanup
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = runtime.resource('dynamodb')
+
+ALLOWED_METHODS = 'DELETE,OPTIONS'
+# Quizzes with more attempts than this are cleaned up by cleanup_worker
+# instead of inside the API request
+INLINE_CASCADE_MAX_ATTEMPTS = int(os.environ.get('INLINE_CASCADE_MAX_ATTEMPTS', '100'))
 
 def lambda_handler(event, context):
+    """DELETE /quiz/{quiz_id} deletes one quiz with its attempts, stats and unused topic.
+
+    DELETE /quiz deletes all of the caller's quizzes; that always runs in
+    cleanup_worker and answers 202.
+    """
     try:
-        quiz_id = event['pathParameters']['quiz_id']
         user_id = event['requestContext']['authorizer']['claims']['sub']
-        table_name = os.environ['QUIZZES_TABLE']
-        table = dynamodb.Table(table_name)
+        quiz_id = (event.get('pathParameters') or {}).get('quiz_id')
+        if not quiz_id:
+            cleanup.send_cleanup_message(runtime.client('sqs'), os.environ['CLEANUP_QUEUE_URL'],
+                                         {'action': 'delete_user_quizzes', 'user_id': user_id})
+            return responses.json_response(202, {'message': 'Deleting all quizzes'}, ALLOWED_METHODS)
 
+        table = dynamodb.Table(os.environ['QUIZZES_TABLE'])
         response = table.get_item(Key={'quiz_id': quiz_id})
         item = response.get('Item')
         if not item or item['user_id'] != user_id:
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Quiz not found or not authorized'}),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'DELETE,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
-
-        table.delete_item(Key={'quiz_id': quiz_id})
-        return {
-            'statusCode': 200,
-            'body': json.dumps({'message': 'Quiz deleted successfully'}),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'DELETE,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
+            return responses.error_response(404, 'Quiz not found or not authorized', ALLOWED_METHODS)
+
+        cascade = cleanup.Cascade.from_environment(dynamodb, runtime.client('s3'))
+        attempt_keys = cascade.attempt_keys(quiz_id, max_items=INLINE_CASCADE_MAX_ATTEMPTS + 1)
+        if len(attempt_keys) > INLINE_CASCADE_MAX_ATTEMPTS:
+            # Queue first: if sending fails the quiz is still there to delete again
+            cleanup.send_cleanup_message(runtime.client('sqs'), os.environ['CLEANUP_QUEUE_URL'], {
+                'action': 'delete_quiz',
+                'quiz_id': quiz_id,
+                'user_id': user_id,
+                'topic_id': item.get('topic_id')
+            })
+            table.delete_item(Key={'quiz_id': quiz_id})
+            return responses.json_response(202, {'message': 'Quiz deleted, removing its attempts'}, ALLOWED_METHODS)
+
+        cascade.delete_quiz(item, attempt_keys)
+        return responses.json_response(200, {'message': 'Quiz deleted successfully'}, ALLOWED_METHODS)
     except Exception as e:
         logger.error(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': str(e)}),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'DELETE,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
\ No newline at end of file
+        return responses.error_response(500, str(e), ALLOWED_METHODS)
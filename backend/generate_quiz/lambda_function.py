@@ -1,48 +1,40 @@
 import json
-import boto3
 import uuid
 import os
 import base64
 import logging
 from datetime import datetime
-import hashlib
-import PyPDF2
-import openai
-from io import BytesIO
-import cgi
+from quizcraft import runtime, multipart, pdf_text, responses, topic_names, request_log, quiz_requests
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-def lambda_handler(event, context):
-    try:
-        logger.info(f"Event: {json.dumps(event)}")
+ALLOWED_METHODS = 'POST,OPTIONS'
 
-        # Initialize AWS clients
-        secrets_client = boto3.client('secretsmanager')
-        s3 = boto3.client('s3')
-        sqs = boto3.client('sqs')
-        dynamodb = boto3.resource('dynamodb')
+# Requests from one user with the same Idempotency-Key map to the same quiz_id
+IDEMPOTENCY_NAMESPACE = uuid.UUID('5b0e7c52-3d7a-4f8e-9a51-6c2f1d0b8e47')
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
 
-        # Retrieve OpenAI API key
-        secret_arn = os.environ.get('OPENAI_API_KEY')
-        if not secret_arn:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
-        secret_value = secrets_client.get_secret_value(SecretId=secret_arn)
-        openai.api_key = secret_value['SecretString']
-        logger.info("OpenAI API key retrieved successfully")
+def lambda_handler(event, context):
+    claimed_quiz_id = None
+    quizzes_table = None
+    try:
+        # Uploads carry the whole PDF as base64, so only a redacted summary is logged
+        request_log.begin(logger, context)
+        request_log.log_event(logger, event)
 
         # Environment variables
-        required_vars = ['S3_BUCKET', 'SQS_QUEUE_URL', 'QUIZZES_TABLE', 'TOPICS_TABLE']
-        s3_bucket, sqs_queue_url, quizzes_table_name, topics_table_name = [
+        required_vars = ['S3_BUCKET', 'SQS_QUEUE_URL', 'QUIZZES_TABLE', 'TOPICS_TABLE', 'TOPIC_NAMES_TABLE']
+        s3_bucket, sqs_queue_url, quizzes_table_name, topics_table_name, topic_names_table_name = [
             os.environ.get(var) for var in required_vars
         ]
-        if not all([s3_bucket, sqs_queue_url, quizzes_table_name, topics_table_name]):
+        if not all([s3_bucket, sqs_queue_url, quizzes_table_name, topics_table_name, topic_names_table_name]):
             missing = [var for var in required_vars if not os.environ.get(var)]
             raise ValueError(f"Missing environment variables: {', '.join(missing)}")
 
-        quizzes_table = dynamodb.Table(quizzes_table_name)
-        topics_table = dynamodb.Table(topics_table_name)
+        quizzes_table = runtime.table(quizzes_table_name)
+        topics_table = runtime.table(topics_table_name)
+        names_table = runtime.table(topic_names_table_name)
 
         # Parse request body
         body_raw = event.get('body', '')
@@ -51,36 +43,24 @@ def lambda_handler(event, context):
 
         headers = {k.lower(): v for k, v in event.get('headers', {}).items()}
         content_type = headers.get('content-type', '')
-        logger.info(f"Content-Type: {content_type}")
+        logger.debug("Content-Type: %s", content_type)
 
         if 'multipart/form-data' in content_type.lower():
-            # Extract boundary
-            boundary = content_type.split('boundary=')[1] if 'boundary=' in content_type else None
-            if not boundary:
-                raise ValueError("Boundary not found in Content-Type header")
-
-            # Decode body if base64 encoded
-            body_bytes = base64.b64decode(body_raw) if event.get('isBase64Encoded', False) else body_raw.encode('utf-8')
-
-            # Use cgi.FieldStorage to parse multipart form data
-            environ = {
-                'REQUEST_METHOD': 'POST',
-                'CONTENT_TYPE': content_type,
-                'CONTENT_LENGTH': len(body_bytes),
-            }
-            form = cgi.FieldStorage(fp=BytesIO(body_bytes), environ=environ)
+            # Stream-parse the form: base64 is decoded chunk by chunk and the PDF
+            # part is hashed while it is copied out, so it is scanned only once
+            form = multipart.parse_form(
+                body_raw,
+                content_type,
+                is_base64=event.get('isBase64Encoded', False),
+                hash_fields=('pdf',),
+            )
 
             # Extract PDF file
-            if 'pdf' in form:
-                pdf_field = form['pdf']
-                if pdf_field.file:
-                    pdf_data = pdf_field.file.read()
-                    logger.info(f"Extracted PDF data of size {len(pdf_data)} bytes")
-                    body = pdf_data
-                else:
-                    raise ValueError("No PDF file found in request")
-            else:
+            pdf_part = form.get('pdf')
+            if not pdf_part or not pdf_part.size:
                 raise ValueError("No PDF file found in request")
+            logger.info(f"Extracted PDF data of size {pdf_part.size} bytes")
+            body = pdf_part
         else:
             try:
                 body_str = (
@@ -95,9 +75,29 @@ def lambda_handler(event, context):
         user_id = event.get('requestContext', {}).get('authorizer', {}).get('claims', {}).get('sub')
         if not user_id:
             raise ValueError("User ID not found in authorizer claims")
-        logger.info(f"User ID: {user_id}")
+        logger.debug("User ID: %s", user_id)
 
-        quiz_id = str(uuid.uuid4())
+        # A retried or double-submitted request with the same Idempotency-Key
+        # gets the first request's quiz instead of queueing a second generation
+        idempotency_key = headers.get('idempotency-key')
+        if idempotency_key:
+            if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                return responses.error_response(400, "Idempotency-Key is too long", ALLOWED_METHODS)
+            quiz_id = str(uuid.uuid5(IDEMPOTENCY_NAMESPACE, f"{user_id}:{idempotency_key}"))
+        else:
+            quiz_id = str(uuid.uuid4())
+
+        # Step one of a direct upload: nothing is written until the PDF arrives
+        # in S3 (process_upload), so a retry just gets a fresh form for the same key
+        if isinstance(body, dict) and 'upload' in body:
+            return upload_form(body['upload'], user_id, quiz_id, s3_bucket, topics_table)
+
+        if idempotency_key:
+            if not claim_request(quizzes_table, quiz_id, user_id):
+                logger.info(f"Replaying Idempotency-Key request for quiz_id: {quiz_id}")
+                return responses.json_response(
+                    200, {'message': "Quiz generation queued", 'quiz_id': quiz_id}, ALLOWED_METHODS)
+            claimed_quiz_id = quiz_id
 
         # Handle quiz regeneration
         if isinstance(body, dict) and body.get('regenerate') and 'topic_id' in body:
@@ -107,10 +107,13 @@ def lambda_handler(event, context):
             topic_response = topics_table.get_item(Key={'user_id': user_id, 'topic_id': topic_id})
             topic = topic_response.get('Item')
             if not topic:
-                return error_response(404, "Topic not found")
+                release_request(quizzes_table, claimed_quiz_id)
+                return responses.error_response(404, "Topic not found", ALLOWED_METHODS)
             source = topic['source']
             s3_key = topic.get('s3_key') if source == 'pdf' else None
+            text_key = pdf_text.sidecar_key(topic['pdf_hash']) if source == 'pdf' and topic.get('pdf_hash') else None
             topic_name = topic['name']
+            name_topic = bool(topic.get('name_pending'))
             quizzes_table.put_item(Item={
                 'quiz_id': quiz_id,
                 'user_id': user_id,
@@ -121,32 +124,36 @@ def lambda_handler(event, context):
                 'attempt_count': 0,
                 'created_at': datetime.utcnow().isoformat() + 'Z'
             })
-            send_sqs_message(sqs, sqs_queue_url, quiz_id, user_id, topic_id, source, s3_key, topic_name)
-            return success_response("Quiz regeneration queued")
+            quiz_requests.send_generation_message(runtime.client('sqs'), sqs_queue_url, quiz_id, user_id, topic_id,
+                                                  source, s3_key, topic_name, text_key, name_topic)
+            return responses.json_response(200, {'message': "Quiz regeneration queued", 'quiz_id': quiz_id}, ALLOWED_METHODS)
 
         # Handle new quiz generation
-        if isinstance(body, bytes):  # PDF upload
-            pdf_bytes = body
-            pdf_hash = hashlib.sha256(pdf_bytes).hexdigest()
+        if isinstance(body, multipart.Part):  # PDF upload
+            pdf_hash = body.sha256
             source = "pdf"
-            response = topics_table.query(
-                IndexName='UniqueSourceIndex',
-                KeyConditionExpression='user_id = :uid AND source_identifier = :sid',
-                ExpressionAttributeValues={':uid': user_id, ':sid': f"pdf_{pdf_hash}"}
-            )
-            if response.get('Items'):
-                topic_id = response['Items'][0]['topic_id']
-                return error_response(400, "This PDF has already been used", {'topic_id': topic_id})
+            existing = quiz_requests.find_topic(topics_table, user_id, f"pdf_{pdf_hash}")
+            if existing:
+                release_request(quizzes_table, claimed_quiz_id)
+                return responses.error_response(400, "This PDF has already been used", ALLOWED_METHODS,
+                                                {'topic_id': existing['topic_id']})
             s3_key = f"quizzes/{quiz_id}.pdf"
-            s3.put_object(Bucket=s3_bucket, Key=s3_key, Body=pdf_bytes)
-            pdf_text = extract_pdf_text(s3, s3_bucket, s3_key)  # Pass s3 client
-            generated_name = generate_topic_name(pdf_text)
-            name = ensure_unique_name(user_id, generated_name, topics_table)
+            text_key = pdf_text.sidecar_key(pdf_hash)
+            # Text extraction and naming happen in the generator, which names
+            # the topic from the same LLM call that writes the quiz.
+            # Only this path needs S3, so JSON requests never build the client
+            # The topic claims pdf_<hash> for good, so it is only written once
+            # the PDF is stored; a failed upload must leave the PDF usable again
+            s3 = runtime.client('s3')
+            s3.put_object(Bucket=s3_bucket, Key=s3_key, Body=body.stream())
+            name = quiz_requests.placeholder_name(body.filename)
+            name_topic = True
             topic_id = str(uuid.uuid4())
             topics_table.put_item(Item={
                 'user_id': user_id,
                 'topic_id': topic_id,
                 'name': name,
+                'name_pending': True,
                 'source': 'pdf',
                 'pdf_hash': pdf_hash,
                 's3_key': s3_key,
@@ -158,14 +165,11 @@ def lambda_handler(event, context):
             if not provided_topic:
                 raise ValueError("Topic cannot be empty")
             source = "topic"
-            response = topics_table.query(
-                IndexName='UniqueSourceIndex',
-                KeyConditionExpression='user_id = :uid AND source_identifier = :sid',
-                ExpressionAttributeValues={':uid': user_id, ':sid': f"topic_{provided_topic}"}
-            )
-            if response.get('Items'):
-                topic_id = response['Items'][0]['topic_id']
-                return error_response(400, "Topic already exists", {'topic_id': topic_id})
+            existing = quiz_requests.find_topic(topics_table, user_id, f"topic_{provided_topic}")
+            if existing:
+                release_request(quizzes_table, claimed_quiz_id)
+                return responses.error_response(400, "Topic already exists", ALLOWED_METHODS,
+                                                {'topic_id': existing['topic_id']})
             topic_id = str(uuid.uuid4())
             topics_table.put_item(Item={
                 'user_id': user_id,
@@ -175,7 +179,10 @@ def lambda_handler(event, context):
                 'source_identifier': f"topic_{provided_topic}",
                 'created_at': datetime.utcnow().isoformat() + 'Z'
             })
+            # Generated names are suffixed around the names users type in
+            topic_names.register(names_table, user_id, provided_topic)
             name = provided_topic
+            name_topic = False
         else:
             raise ValueError("Invalid input: Expected 'pdf' (binary) or 'topic' (JSON)")
 
@@ -190,108 +197,71 @@ def lambda_handler(event, context):
             'created_at': datetime.utcnow().isoformat() + 'Z'
         })
 
-        send_sqs_message(sqs, sqs_queue_url, quiz_id, user_id, topic_id, source, s3_key if source == 'pdf' else None, name)
-        return success_response("Quiz generation queued")
+        quiz_requests.send_generation_message(
+            runtime.client('sqs'), sqs_queue_url, quiz_id, user_id, topic_id, source,
+            s3_key if source == 'pdf' else None, name, text_key if source == 'pdf' else None, name_topic
+        )
+        return responses.json_response(200, {'message': "Quiz generation queued", 'quiz_id': quiz_id}, ALLOWED_METHODS)
 
     except Exception as e:
         logger.error(f"Internal server error: {str(e)}", exc_info=True)
-        return error_response(500, f"Internal server error: {str(e)}")
+        if claimed_quiz_id:
+            try:
+                release_request(quizzes_table, claimed_quiz_id)
+            except Exception as release_error:
+                logger.error(f"Could not release idempotency claim for quiz_id {claimed_quiz_id}: "
+                             f"{str(release_error)}", exc_info=True)
+        return responses.error_response(500, f"Internal server error: {str(e)}", ALLOWED_METHODS)
 
-def extract_pdf_text(s3, s3_bucket, s3_key):
-    """Extract text from the first page of a PDF, ensuring UTF-8 compatibility."""
-    try:
-        obj = s3.get_object(Bucket=s3_bucket, Key=s3_key)
-        pdf_data = obj['Body'].read()
-        pdf_file = BytesIO(pdf_data)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages[:1]:  
-            page_text = page.extract_text() or ""
-            text += page_text.encode('utf-8', errors='ignore').decode('utf-8')
-        logger.info(f"Extracted text length: {len(text)}")
-        if not text.strip():
-            raise ValueError("No text extracted from PDF")
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting PDF text: {str(e)}", exc_info=True)
-        raise ValueError(f"Failed to extract PDF text: {str(e)}")
+def claim_request(quizzes_table, quiz_id, user_id):
+    """Reserve an idempotent request's quiz_id; False if an earlier request already holds it.
 
-def generate_topic_name(text):
-    """Generate a concise topic name using OpenAI."""
+    The claim has no created_at, so quiz lists (UserIdIndex) skip it until
+    the full quiz item replaces it.
+    """
     try:
-        prompt = f"Generate a concise topic name based on the following text:\n\n{text[:1000]}"
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=10,
-            temperature=0.5,
+        quizzes_table.put_item(
+            Item={'quiz_id': quiz_id, 'user_id': user_id, 'status': 'pending'},
+            ConditionExpression='attribute_not_exists(quiz_id)'
         )
-        name = response.choices[0].message['content'].strip()
-        if not name:
-            raise ValueError("OpenAI returned an empty topic name")
-        logger.info(f"Generated topic name: {name}")
-        return name
-    except Exception as e:
-        logger.error(f"Error generating topic name: {str(e)}", exc_info=True)
-        return "Untitled Topic"
+        return True
+    except quizzes_table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
 
-def ensure_unique_name(user_id, name, topics_table):
-    """Ensure topic name is unique for the user."""
-    try:
-        response = topics_table.query(
-            IndexName='UniqueSourceIndex',  
-            KeyConditionExpression='user_id = :uid AND begins_with(source_identifier, :sid)',
-            ExpressionAttributeValues={':uid': user_id, ':sid': f"topic_{name}"}
-        )
-        if response.get('Items'):
-            count = len(response['Items'])
-            return f"{name} ({count + 1})"
-        return name
-    except Exception as e:
-        logger.error(f"Error ensuring unique name: {str(e)}", exc_info=True)
-        return name
+def release_request(quizzes_table, quiz_id):
+    """Drop the claim of a request that was rejected, so a retry is processed afresh.
 
-def send_sqs_message(sqs, queue_url, quiz_id, user_id, topic_id, source, s3_key, topic_name):
-    """Send message to SQS for quiz generation."""
+    A claim left behind would make every retry replay a quiz that was never
+    queued, so failures other than the quiz already being written are raised.
+    """
+    if not quiz_id:
+        return
     try:
-        message_body = {
-            'quiz_id': quiz_id,  
-            'user_id': user_id,
-            'topic_id': topic_id,
-            'source': source,
-            'topic_name': topic_name
-        }
-        if s3_key:
-            message_body['s3_key'] = s3_key
-        sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(message_body))
-        logger.info(f"SQS message sent for quiz_id: {quiz_id}")
-    except Exception as e:
-        logger.error(f"Failed to send SQS message: {str(e)}", exc_info=True)
-        raise
-
-def success_response(message):
-    """Return a successful HTTP response."""
-    return {
-        'statusCode': 200,
-        'body': json.dumps({'message': message}),
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-        }
-    }
+        quizzes_table.delete_item(
+            Key={'quiz_id': quiz_id},
+            ConditionExpression='attribute_not_exists(created_at)'
+        )
+    except quizzes_table.meta.client.exceptions.ConditionalCheckFailedException:
+        logger.info(f"Quiz {quiz_id} was already written; keeping it")
 
-def error_response(status_code, message, additional_data=None):
-    """Return an error HTTP response."""
-    body = {'error': message}
-    if additional_data:
-        body.update(additional_data)
-    return {
-        'statusCode': status_code,
-        'body': json.dumps(body),
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-        }
-    }
\ No newline at end of file
+def upload_form(upload, user_id, quiz_id, s3_bucket, topics_table):
+    """Presigned POST the browser sends the PDF to directly, bypassing API Gateway."""
+    if not isinstance(upload, dict):
+        raise ValueError("Invalid upload request")
+    size = upload.get('size')
+    if size is not None and (not isinstance(size, int) or size > quiz_requests.MAX_UPLOAD_BYTES):
+        return responses.error_response(
+            413, f"PDF exceeds the {quiz_requests.MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit", ALLOWED_METHODS)
+    # A hash computed by the browser lets a known duplicate be refused before
+    # the upload; process_upload checks the hash of the stored object again
+    pdf_hash = upload.get('sha256')
+    if isinstance(pdf_hash, str) and pdf_hash:
+        existing = quiz_requests.find_topic(topics_table, user_id, f"pdf_{pdf_hash.lower()}")
+        if existing:
+            return responses.error_response(400, "This PDF has already been used", ALLOWED_METHODS,
+                                            {'topic_id': existing['topic_id']})
+    form = quiz_requests.presigned_upload(runtime.client('s3'), s3_bucket, user_id, quiz_id,
+                                          str(upload.get('filename') or ''))
+    logger.info(f"Issued upload form for quiz_id: {quiz_id}")
+    return responses.json_response(200, {'message': "Upload the PDF to start generation", 'quiz_id': quiz_id,
+                                         'upload': form}, ALLOWED_METHODS)
@@ -1,83 +1,95 @@
-import json
-import boto3
 import os
 import logging
-from decimal import Decimal
+from quizcraft import runtime, responses, dynamo, quiz_codec, answer_key
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = runtime.resource('dynamodb')
+
+ALLOWED_METHODS = 'GET,OPTIONS'
+
+MAX_BATCH_ATTEMPTS = 100
 
 def lambda_handler(event, context):
     try:
-        attempt_id = event['pathParameters']['attempt_id']
+        path_params = event.get('pathParameters') or {}
+        if 'attempt_id' not in path_params:
+            return get_attempts(event)
+
+        attempt_id = path_params['attempt_id']
         attempts_table = dynamodb.Table(os.environ['ATTEMPTS_TABLE'])
         quizzes_table = dynamodb.Table(os.environ['QUIZZES_TABLE'])
 
         attempt_response = attempts_table.get_item(Key={'attempt_id': attempt_id})
         attempt = attempt_response.get('Item')
         if not attempt:
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Attempt not found'}),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
+            return responses.error_response(404, 'Attempt not found', ALLOWED_METHODS)
 
         quiz_id = attempt['quiz_id']
         quiz_response = quizzes_table.get_item(Key={'quiz_id': quiz_id})
         quiz = quiz_response.get('Item')
         if not quiz:
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Quiz not found'}),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
-
-        quiz_content = quiz['quiz_content']
-        if isinstance(quiz_content, str):
-            quiz_content = json.loads(quiz_content)
-        if isinstance(quiz_content, dict) and 'quiz' in quiz_content:
-            quiz_content = quiz_content['quiz']
-
-        score = int(attempt['score']) if isinstance(attempt['score'], Decimal) else attempt['score']
-        total_questions = int(attempt['total_questions']) if isinstance(attempt['total_questions'], Decimal) else attempt['total_questions']
-
-        result = {
-            'attempt_id': attempt_id,
-            'quiz_id': quiz_id,
-            'score': score,
-            'total_questions': total_questions,
-            'user_answers': attempt['answers'],
-            'correct_answers': attempt['correct_answers'],
-            'questions': quiz_content
-        }
-
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
+            return responses.error_response(404, 'Quiz not found', ALLOWED_METHODS)
+
+        return responses.json_response(200, build_result(attempt, quiz_codec.decode(quiz['quiz_content'])), ALLOWED_METHODS)
     except Exception as e:
         logger.error(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': str(e)}),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
\ No newline at end of file
+        return responses.error_response(500, str(e), ALLOWED_METHODS)
+
+
+def get_attempts(event):
+    """GET /attempt?ids=a,b,c: the caller's attempts in the requested order, null where not found."""
+    user_id = (event.get('requestContext', {})
+              .get('authorizer', {})
+              .get('claims', {})
+              .get('sub'))
+    if not user_id:
+        return responses.error_response(401, 'Unauthorized', ALLOWED_METHODS)
+
+    query_params = event.get('queryStringParameters') or {}
+    attempt_ids = [a.strip() for a in (query_params.get('ids') or '').split(',') if a.strip()]
+    if not attempt_ids:
+        return responses.error_response(400, 'ids query parameter is required', ALLOWED_METHODS)
+    if len(set(attempt_ids)) > MAX_BATCH_ATTEMPTS:
+        return responses.error_response(400, f"At most {MAX_BATCH_ATTEMPTS} attempts per request", ALLOWED_METHODS)
+
+    attempts = dynamo.batch_get(dynamodb, os.environ['ATTEMPTS_TABLE'],
+                                [{'attempt_id': a} for a in attempt_ids])
+    attempts_by_id = {a['attempt_id']: a for a in attempts if a.get('user_id') == user_id}
+
+    quiz_ids = {a['quiz_id'] for a in attempts_by_id.values()}
+    quizzes = dynamo.batch_get(dynamodb, os.environ['QUIZZES_TABLE'],
+                               [{'quiz_id': q} for q in quiz_ids],
+                               projection='quiz_id, quiz_content')
+    questions_by_quiz = {q['quiz_id']: quiz_codec.decode(q['quiz_content'])
+                         for q in quizzes if 'quiz_content' in q}
+    logger.info(f"Fetched {len(attempts_by_id)} of {len(attempt_ids)} attempts across {len(quiz_ids)} quizzes")
+
+    results = []
+    for attempt_id in attempt_ids:
+        attempt = attempts_by_id.get(attempt_id)
+        if attempt is None or attempt['quiz_id'] not in questions_by_quiz:
+            results.append(None)
+        else:
+            results.append(build_result(attempt, questions_by_quiz[attempt['quiz_id']]))
+    return responses.json_response(200, {'attempts': results}, ALLOWED_METHODS)
+
+
+def build_result(attempt, quiz_content):
+    """Response body for one attempt, with the questions of its quiz."""
+    correct_answers = attempt.get('correct_answers')
+    if correct_answers is None:
+        # Newer attempts do not copy the answers; derive them from the quiz
+        correct_answers = {str(i): answer_key.correct_answer(q) for i, q in enumerate(quiz_content)}
+
+    return {
+        'attempt_id': attempt['attempt_id'],
+        'quiz_id': attempt['quiz_id'],
+        'score': attempt['score'],
+        'total_questions': attempt['total_questions'],
+        'max_score': attempt.get('max_score', attempt['total_questions']),
+        'user_answers': attempt['answers'],
+        'correct_answers': correct_answers,
+        'questions': quiz_content
+    }
@@ -1,27 +1,18 @@
-import json
-import boto3
 import logging
 import os
-from decimal import Decimal
+from quizcraft import runtime, responses, dynamo, listing, quiz_codec, request_log
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = runtime.resource('dynamodb')
 
-def convert_decimals(obj):
-    if isinstance(obj, list):
-        return [convert_decimals(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        return int(obj)
-    else:
-        return obj
+ALLOWED_METHODS = 'GET,OPTIONS'
 
 def lambda_handler(event, context):
     try:
-        logger.info(f"Full Event: {json.dumps(event)}")
+        request_log.begin(logger, context)
+        request_log.log_event(logger, event)
         
         user_id = (event.get('requestContext', {})
                   .get('authorizer', {})
@@ -29,99 +20,61 @@ def lambda_handler(event, context):
                   .get('sub'))
         if not user_id:
             logger.error("User ID not found in event")
-            return {
-                'statusCode': 401,
-                'body': json.dumps({'error': 'Unauthorized'}),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
+            return responses.error_response(401, 'Unauthorized', ALLOWED_METHODS)
 
         table_name = os.environ.get('QUIZZES_TABLE')
         if not table_name:
             logger.error("QUIZZES_TABLE environment variable not set")
-            return {
-                'statusCode': 500,
-                'body': json.dumps({'error': 'Server configuration error'}),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
+            return responses.error_response(500, 'Server configuration error', ALLOWED_METHODS)
 
         table = dynamodb.Table(table_name)
         
         path_params = event.get('pathParameters', {})
-        logger.info(f"Path Parameters: {path_params}")
+        logger.debug("Path Parameters: %s", path_params)
         quiz_id = path_params.get('quiz_id') if path_params else None
-        logger.info(f"Quiz ID: {quiz_id}")
+        logger.debug("Quiz ID: %s", quiz_id)
         if quiz_id:
             logger.info(f"Fetching quiz with ID: {quiz_id}")
             response = table.get_item(Key={'quiz_id': quiz_id})
             item = response.get('Item')
             if not item:
                 logger.warning(f"Quiz {quiz_id} not found")
-                return {
-                    'statusCode': 404,
-                    'body': json.dumps({'error': 'Quiz not found'}),
-                    'headers': {
-                        'Access-Control-Allow-Origin': '*',
-                        'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                        'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                    }
-                }
+                return responses.error_response(404, 'Quiz not found', ALLOWED_METHODS)
             if item.get('user_id') != user_id:
                 logger.warning(f"User {user_id} not authorized for quiz {quiz_id}")
-                return {
-                    'statusCode': 403,
-                    'body': json.dumps({'error': 'Forbidden'}),
-                    'headers': {
-                        'Access-Control-Allow-Origin': '*',
-                        'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                        'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                    }
-                }
-            item = convert_decimals(item)
+                return responses.error_response(403, 'Forbidden', ALLOWED_METHODS)
+            if 'quiz_content' in item:
+                item['quiz_content'] = quiz_codec.decode(item['quiz_content'])
+            # The salted answer digests are for submit_quiz only
+            item.pop('answer_key', None)
             logger.info(f"Successfully fetched quiz {quiz_id}")
-            return {
-                'statusCode': 200,
-                'body': json.dumps(item),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
+            return responses.json_response(200, item, ALLOWED_METHODS)
         else:
-            logger.info(f"Fetching all quizzes for user: {user_id}")
-            response = table.query(
+            query_params = event.get('queryStringParameters') or {}
+            try:
+                limit = listing.page_size(query_params)
+                cursor = query_params.get('cursor')
+                start_key = dynamo.decode_cursor(cursor)
+                if start_key and start_key.get('user_id') != user_id:
+                    raise dynamo.InvalidCursor("Invalid pagination cursor")
+            except ValueError as e:
+                return responses.error_response(400, str(e), ALLOWED_METHODS)
+
+            logger.info(f"Fetching quizzes for user: {user_id} (limit {limit})")
+            projection, names = listing.summary_projection()
+            quizzes, next_cursor = dynamo.query_page(
+                table,
+                limit,
+                cursor,
                 IndexName='UserIdIndex',
                 KeyConditionExpression='user_id = :uid',
-                ExpressionAttributeValues={':uid': user_id}
+                ExpressionAttributeValues={':uid': user_id},
+                ProjectionExpression=projection,
+                ExpressionAttributeNames=names,
+                ScanIndexForward=False
             )
-            quizzes = response.get('Items', [])
-            quizzes = convert_decimals(quizzes)
             logger.info(f"Found {len(quizzes)} quizzes for user {user_id}")
-            return {
-                'statusCode': 200,
-                'body': json.dumps({'quizzes': quizzes}),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
+            return responses.json_response(200, {'quizzes': quizzes, 'next_cursor': next_cursor}, ALLOWED_METHODS)
     except Exception as e:
         logger.error(f"Error in Lambda execution: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': f"Internal server error: {str(e)}"}),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
\ No newline at end of file
+        return responses.error_response(500, f"Internal server error: {str(e)}", ALLOWED_METHODS)
\ No newline at end of file
@@ -0,0 +1 @@
+"""Shared helpers for the QuizCraft Lambda functions, deployed as a Lambda layer."""
@@ -0,0 +1,64 @@
+import os
+import hashlib
+from decimal import Decimal
+
+# answer_key is written next to quiz_content when a quiz is generated, so
+# scoring can read a few hundred bytes instead of the whole quiz body:
+#
+#   {'version': 1, 'salt': <hex>, 'hashes': [<hex digest per question>],
+#    'weights': [<points per question>]}      # weights only if any != 1
+#
+# Each digest covers the salt, the question index and the canonical correct
+# answer, so the key does not reveal answers to anything that reads it.
+KEY_VERSION = 1
+DIGEST_BYTES = 8
+SALT_BYTES = 8
+
+
+def correct_answer(question):
+    """The correct answer for a question: a string, or a list for multi-answer questions."""
+    if 'correct_answers' in question:
+        return list(question['correct_answers'])
+    return question['correct_answer']
+
+
+def _canonical(answer):
+    if isinstance(answer, (list, tuple, set)):
+        return '\x1f'.join(sorted({str(a) for a in answer}))
+    return str(answer)
+
+
+def _digest(salt, index, answer):
+    material = f"{salt}\x1e{index}\x1e{_canonical(answer)}".encode('utf-8')
+    return hashlib.blake2b(material, digest_size=DIGEST_BYTES).hexdigest()
+
+
+def build(questions, salt=None):
+    """Build the answer_key attribute for a list of questions."""
+    salt = salt or os.urandom(SALT_BYTES).hex()
+    key = {
+        'version': KEY_VERSION,
+        'salt': salt,
+        'hashes': [_digest(salt, i, correct_answer(q)) for i, q in enumerate(questions)],
+    }
+    weights = [q.get('weight', 1) for q in questions]
+    if any(w != 1 for w in weights):
+        key['weights'] = [Decimal(str(w)) for w in weights]
+    return key
+
+
+def score(key, answers):
+    """Score submitted answers against an answer key.
+
+    ``answers`` maps question index (as a string) to the chosen option, or to
+    a list of options for multi-answer questions. A multi-answer question
+    only scores when the chosen set matches exactly. Returns
+    (score, max_score, total_questions).
+    """
+    salt = key['salt']
+    hashes = key['hashes']
+    weights = key.get('weights') or [1] * len(hashes)
+    submitted = [answers.get(str(i)) for i in range(len(hashes))]
+    digests = [_digest(salt, i, a) if a is not None else None for i, a in enumerate(submitted)]
+    earned = sum(w for h, d, w in zip(hashes, digests, weights) if h == d)
+    return earned, sum(weights), len(hashes)
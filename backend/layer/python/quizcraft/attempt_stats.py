@@ -0,0 +1,293 @@
+from datetime import datetime
+from decimal import Decimal
+from quizcraft import dynamo
+
+# One AttemptStats item per user and per quiz, keyed USER#<id> / QUIZ#<id>:
+#   attempts, score_sum, percent_sum   running totals (ADD)
+#   hist_0 .. hist_9                   attempts per 10-point percent band
+#   best_percent                       highest percent seen
+# Attempts are applied exactly once: the transaction that adds an attempt to
+# its rollups also sets stats_applied on it, conditional on it being unset.
+# remove() takes an attempt back out of its QUIZ# rollup in the transaction
+# that deletes it, so that happens once too.
+HISTOGRAM_BUCKETS = 10
+# TransactWriteItems allows 100 actions per call
+MAX_TRANSACTION_ACTIONS = 100
+
+
+def user_key(user_id):
+    return f"USER#{user_id}"
+
+
+def quiz_key(quiz_id):
+    return f"QUIZ#{quiz_id}"
+
+
+def percent(attempt):
+    """Score as a percentage of the attempt's max_score, to two decimal places."""
+    max_score = attempt.get('max_score') or attempt.get('total_questions') or 0
+    if not max_score:
+        return Decimal(0)
+    return (Decimal(attempt['score']) * 100 / Decimal(max_score)).quantize(Decimal('0.01'))
+
+
+def bucket(pct):
+    """Histogram band for a percentage; 100% falls in the top band."""
+    return min(int(pct // 10), HISTOGRAM_BUCKETS - 1)
+
+
+def rollups(attempts):
+    """Fold attempts into per-user and per-quiz deltas, keyed by stats_key."""
+    deltas = {}
+    for attempt in attempts:
+        pct = percent(attempt)
+        for scope, key, subject_id in (('user', user_key(attempt['user_id']), attempt['user_id']),
+                                       ('quiz', quiz_key(attempt['quiz_id']), attempt['quiz_id'])):
+            delta = deltas.setdefault(key, {
+                'scope': scope,
+                'subject_id': subject_id,
+                'attempts': 0,
+                'score_sum': Decimal(0),
+                'percent_sum': Decimal(0),
+                'best_percent': pct,
+                'histogram': [0] * HISTOGRAM_BUCKETS,
+            })
+            delta['attempts'] += 1
+            delta['score_sum'] += Decimal(attempt['score'])
+            delta['percent_sum'] += pct
+            delta['best_percent'] = max(delta['best_percent'], pct)
+            delta['histogram'][bucket(pct)] += 1
+    return deltas
+
+
+def summary(item):
+    """Public view of an AttemptStats item (or of no item yet)."""
+    item = item or {}
+    attempts = int(item.get('attempts', 0))
+    return {
+        'attempts': attempts,
+        'mean_score': float(item['score_sum'] / attempts) if attempts else None,
+        'mean_percent': float(item['percent_sum'] / attempts) if attempts else None,
+        'best_percent': float(item['best_percent']) if 'best_percent' in item else None,
+        'histogram': [int(item.get(f'hist_{i}', 0)) for i in range(HISTOGRAM_BUCKETS)],
+    }
+
+
+def _actions_needed(attempts):
+    users = {a['user_id'] for a in attempts}
+    quizzes = {a['quiz_id'] for a in attempts}
+    counted = {a['quiz_id'] for a in attempts if 'count_pending' in a}
+    return len(attempts) + len(users) + len(quizzes) + len(counted)
+
+
+def _removal_actions_needed(attempts):
+    quizzes = {a['quiz_id'] for a in attempts}
+    return len(attempts) + 2 * len(quizzes)
+
+
+def _chunks(attempts, actions_needed=_actions_needed):
+    """Split attempts so each chunk's markers, rollups and counters fit in one transaction."""
+    chunk = []
+    for attempt in attempts:
+        if chunk and actions_needed(chunk + [attempt]) > MAX_TRANSACTION_ACTIONS:
+            yield chunk
+            chunk = []
+        chunk.append(attempt)
+    if chunk:
+        yield chunk
+
+
+def apply(resource, attempts_table, quizzes_table, stats_table, attempts):
+    """Add attempts to their user and quiz rollups exactly once. Returns how many were applied.
+
+    Attempts that submit_quiz marked count_pending also have their quiz's
+    attempt_count incremented in the same transaction.
+    """
+    client = resource.meta.client
+    applied = 0
+    deleted_quizzes = set()
+    for chunk in _chunks(attempts):
+        # best_percent is a max, so raising it first is safe even if the chunk is retried.
+        # Items that do not exist yet get it from the transaction instead
+        new_keys = _raise_best(resource.Table(stats_table), rollups(chunk))
+        while chunk:
+            actions, targets = _transaction(attempts_table, quizzes_table, stats_table, chunk, deleted_quizzes)
+            try:
+                dynamo.transact_write(client, actions)
+            except client.exceptions.TransactionCanceledException as e:
+                failed = [t for t, code in zip(targets, dynamo.cancellation_codes(e)) if code == 'ConditionalCheckFailed']
+                if not failed:
+                    raise
+                # Attempts already marked were applied by an earlier delivery and
+                # deleted ones are skipped; counters whose quiz is gone are dropped
+                done = {attempt_id for kind, attempt_id in failed if kind == 'attempt'}
+                deleted_quizzes.update(quiz_id for kind, quiz_id in failed if kind == 'counter')
+                chunk = [a for a in chunk if a['attempt_id'] not in done]
+                continue
+            applied += len(chunk)
+            if chunk and new_keys:
+                # Another chunk may have created one of those items first
+                deltas = rollups(chunk)
+                _raise_best(resource.Table(stats_table), {k: deltas[k] for k in new_keys if k in deltas})
+            break
+    return applied
+
+
+def _transaction(attempts_table, quizzes_table, stats_table, chunk, deleted_quizzes):
+    now = datetime.utcnow().isoformat() + 'Z'
+    actions, targets = [], []
+    for attempt in chunk:
+        actions.append({'Update': {
+            'TableName': attempts_table,
+            'Key': {'attempt_id': attempt['attempt_id']},
+            'UpdateExpression': 'SET stats_applied = :one REMOVE count_pending',
+            # An attempt deleted with its quiz must not be recreated by the update
+            'ConditionExpression': 'attribute_exists(attempt_id) AND attribute_not_exists(stats_applied)',
+            'ExpressionAttributeValues': {':one': 1}
+        }})
+        targets.append(('attempt', attempt['attempt_id']))
+
+    for key, delta in rollups(chunk).items():
+        adds = ['attempts :n', 'score_sum :s', 'percent_sum :p']
+        values = {':n': delta['attempts'], ':s': delta['score_sum'], ':p': delta['percent_sum'],
+                  ':scope': delta['scope'], ':id': delta['subject_id'], ':now': now}
+        for i, count in enumerate(delta['histogram']):
+            if count:
+                adds.append(f'hist_{i} :h{i}')
+                values[f':h{i}'] = count
+        values[':best'] = delta['best_percent']
+        actions.append({'Update': {
+            'TableName': stats_table,
+            'Key': {'stats_key': key},
+            'UpdateExpression': ('SET #scope = :scope, subject_id = :id, updated_at = :now, '
+                                 'best_percent = if_not_exists(best_percent, :best) ADD ' + ', '.join(adds)),
+            'ExpressionAttributeNames': {'#scope': 'scope'},
+            'ExpressionAttributeValues': values
+        }})
+        targets.append(('stats', key))
+
+    pending = {}
+    for attempt in chunk:
+        if 'count_pending' in attempt and attempt['quiz_id'] not in deleted_quizzes:
+            pending[attempt['quiz_id']] = pending.get(attempt['quiz_id'], 0) + 1
+    for quiz_id, count in pending.items():
+        actions.append({'Update': {
+            'TableName': quizzes_table,
+            'Key': {'quiz_id': quiz_id},
+            'UpdateExpression': 'ADD attempt_count :n',
+            'ConditionExpression': 'attribute_exists(quiz_id)',
+            'ExpressionAttributeValues': {':n': count}
+        }})
+        targets.append(('counter', quiz_id))
+    return actions, targets
+
+
+def _raise_best(table, deltas):
+    """Raise best_percent where these deltas beat it; a max needs a condition, so it is not in the transaction.
+
+    Only existing items are updated, so a late attempt cannot recreate the
+    stats of a deleted quiz. Returns the keys that had no item.
+    """
+    missing = set()
+    for key, delta in deltas.items():
+        try:
+            table.update_item(
+                Key={'stats_key': key},
+                UpdateExpression='SET best_percent = :b',
+                # The comparison is false on a missing item, so only the first branch needs the guard
+                ConditionExpression='attribute_exists(stats_key) AND attribute_not_exists(best_percent) '
+                                    'OR best_percent < :b',
+                ExpressionAttributeValues={':b': delta['best_percent']},
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException as e:
+            if not e.response.get('Item'):
+                missing.add(key)
+    return missing
+
+
+def counted(attempt):
+    """Whether the attempt is in its quiz's attempt_count: counted at submit, or applied after a deferral."""
+    return 'stats_applied' in attempt or 'count_pending' not in attempt
+
+
+def remove(resource, attempts_table, quizzes_table, stats_table, attempts):
+    """Delete attempts and take them back out of their quizzes' rollups and attempt_count.
+
+    ``attempts`` are the full rows as read. Only QUIZ# rollups are reduced:
+    the caller is deleting the attempts' user, USER# item and all, and
+    best_percent stays as it is, since a max cannot be taken apart.
+    Rollups and counters whose quiz is gone are skipped. An attempt the
+    aggregator applied after it was read is read again and retried.
+    Returns how many attempts were deleted.
+    """
+    client = resource.meta.client
+    removed = 0
+    gone = set()
+    for chunk in _chunks(attempts, _removal_actions_needed):
+        while chunk:
+            actions, targets = _removal(attempts_table, quizzes_table, stats_table, chunk, gone)
+            try:
+                dynamo.transact_write(client, actions)
+            except client.exceptions.TransactionCanceledException as e:
+                failed = [t for t, code in zip(targets, dynamo.cancellation_codes(e)) if code == 'ConditionalCheckFailed']
+                if not failed:
+                    raise
+                gone.update(t for t in failed if t[0] != 'attempt')
+                stale = {attempt_id for kind, attempt_id in failed if kind == 'attempt'}
+                if stale:
+                    # Attempts deleted meanwhile are simply not found again
+                    chunk = [a for a in chunk if a['attempt_id'] not in stale] + dynamo.batch_get(
+                        resource, attempts_table, [{'attempt_id': attempt_id} for attempt_id in stale])
+                continue
+            removed += len(chunk)
+            break
+    return removed
+
+
+def _removal(attempts_table, quizzes_table, stats_table, chunk, gone):
+    now = datetime.utcnow().isoformat() + 'Z'
+    actions, targets = [], []
+    for attempt in chunk:
+        actions.append({'Delete': {
+            'TableName': attempts_table,
+            'Key': {'attempt_id': attempt['attempt_id']},
+            # The attempt must still be in the state its rollup is undone for
+            'ConditionExpression': ('attribute_exists(stats_applied)' if 'stats_applied' in attempt else
+                                    'attribute_exists(attempt_id) AND attribute_not_exists(stats_applied)')
+        }})
+        targets.append(('attempt', attempt['attempt_id']))
+
+    applied = [a for a in chunk if 'stats_applied' in a]
+    for key, delta in rollups(applied).items():
+        if delta['scope'] != 'quiz' or ('stats', key) in gone:
+            continue
+        adds = ['attempts :n', 'score_sum :s', 'percent_sum :p']
+        values = {':n': -delta['attempts'], ':s': -delta['score_sum'], ':p': -delta['percent_sum'], ':now': now}
+        for i, count in enumerate(delta['histogram']):
+            if count:
+                adds.append(f'hist_{i} :h{i}')
+                values[f':h{i}'] = -count
+        actions.append({'Update': {
+            'TableName': stats_table,
+            'Key': {'stats_key': key},
+            'UpdateExpression': 'SET updated_at = :now ADD ' + ', '.join(adds),
+            'ConditionExpression': 'attribute_exists(stats_key)',
+            'ExpressionAttributeValues': values
+        }})
+        targets.append(('stats', key))
+
+    counts = {}
+    for attempt in chunk:
+        if counted(attempt) and ('counter', attempt['quiz_id']) not in gone:
+            counts[attempt['quiz_id']] = counts.get(attempt['quiz_id'], 0) + 1
+    for quiz_id, count in counts.items():
+        actions.append({'Update': {
+            'TableName': quizzes_table,
+            'Key': {'quiz_id': quiz_id},
+            'UpdateExpression': 'ADD attempt_count :n',
+            'ConditionExpression': 'attribute_exists(quiz_id)',
+            'ExpressionAttributeValues': {':n': -count}
+        }})
+        targets.append(('counter', quiz_id))
+    return actions, targets
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import logging
+from quizcraft import dynamo, attempt_stats, pdf_text, topic_names
+
+logger = logging.getLogger()
+
+# DeleteObjects takes up to 1000 keys per request
+S3_DELETE_MAX_KEYS = 1000
+# Items read per Query page while collecting keys to delete
+QUERY_PAGE_SIZE = 500
+
+
+def delete_objects(s3, bucket, keys):
+    """Delete S3 objects with DeleteObjects, 1000 keys per request.
+
+    Missing keys count as deleted, as they do for S3. Raises RuntimeError
+    if S3 reports errors for any key. Returns the number of keys sent.
+    """
+    unique = sorted({key for key in keys if key})
+    for start in range(0, len(unique), S3_DELETE_MAX_KEYS):
+        response = s3.delete_objects(Bucket=bucket, Delete={
+            'Objects': [{'Key': key} for key in unique[start:start + S3_DELETE_MAX_KEYS]],
+            'Quiet': True
+        })
+        errors = response.get('Errors') or []
+        if errors:
+            raise RuntimeError(f"DeleteObjects failed for {len(errors)} keys, "
+                               f"first {errors[0].get('Key')}: {errors[0].get('Code')}")
+    return len(unique)
+
+
+class Cascade:
+    """Deletes quizzes together with the records and files that hang off them.
+
+    For one quiz that is its attempts (Attempts QuizIdIndex), its QUIZ#
+    AttemptStats item and, once no other quiz of the user uses it, its
+    topic with the topic's PDF and TopicNames item. The text sidecar is
+    keyed by the PDF's hash and shared by every user who uploaded that PDF,
+    so it only goes with the last topic made from it. Attempters' USER#
+    rollups are kept: best scores and the histogram cannot be taken apart
+    again. Every step can be repeated, so a cascade that fails part way is
+    simply run again.
+    """
+
+    def __init__(self, dynamodb, s3, bucket, quizzes_table, attempts_table, topics_table,
+                 topic_names_table, stats_table, sleep=time.sleep):
+        self.dynamodb = dynamodb
+        self.s3 = s3
+        self.bucket = bucket
+        self.quizzes_table = quizzes_table
+        self.attempts_table = attempts_table
+        self.topics_table = topics_table
+        self.topic_names_table = topic_names_table
+        self.stats_table = stats_table
+        self.sleep = sleep
+
+    @classmethod
+    def from_environment(cls, dynamodb, s3):
+        return cls(dynamodb, s3, os.environ['S3_BUCKET'], os.environ['QUIZZES_TABLE'],
+                   os.environ['ATTEMPTS_TABLE'], os.environ['TOPICS_TABLE'],
+                   os.environ['TOPIC_NAMES_TABLE'], os.environ['STATS_TABLE'])
+
+    def _table(self, name):
+        return self.dynamodb.Table(name)
+
+    def _batch_delete(self, table_name, keys):
+        return dynamo.batch_delete(self.dynamodb, table_name, keys, sleep=self.sleep)
+
+    def attempt_keys(self, quiz_id, max_items=None):
+        """Keys of a quiz's attempts, at most max_items of them."""
+        items = dynamo.query_all(
+            self._table(self.attempts_table),
+            max_items=max_items,
+            IndexName='QuizIdIndex',
+            KeyConditionExpression='quiz_id = :qid',
+            ExpressionAttributeValues={':qid': quiz_id},
+            ProjectionExpression='attempt_id',
+            Limit=QUERY_PAGE_SIZE
+        )
+        return [{'attempt_id': item['attempt_id']} for item in items]
+
+    def topic_in_use(self, user_id, topic_id, quiz_id):
+        """Whether a quiz of the user other than quiz_id still uses the topic."""
+        for page in dynamo.query_pages(
+                self._table(self.quizzes_table),
+                IndexName='UserIdIndex',
+                KeyConditionExpression='user_id = :uid',
+                FilterExpression='topic_id = :tid AND quiz_id <> :qid',
+                ExpressionAttributeValues={':uid': user_id, ':tid': topic_id, ':qid': quiz_id},
+                ProjectionExpression='quiz_id'):
+            if page.get('Items'):
+                return True
+        return False
+
+    def sidecar_in_use(self, user_id, pdf_hash):
+        """Whether another user has a topic made from the same PDF, and so reads its text sidecar.
+
+        A user has one topic per PDF (UniqueSourceIndex), so only other users count.
+        """
+        for page in dynamo.query_pages(
+                self._table(self.topics_table),
+                IndexName='PdfHashIndex',
+                KeyConditionExpression='pdf_hash = :h',
+                FilterExpression='user_id <> :uid',
+                ExpressionAttributeValues={':h': pdf_hash, ':uid': user_id}):
+            if page.get('Items'):
+                return True
+        return False
+
+    def topic_object_keys(self, user_id, topic):
+        """S3 keys to delete with a topic: its PDF, and the text sidecar unless another user's topic shares it."""
+        keys = [topic.get('s3_key')]
+        if topic.get('pdf_hash') and not self.sidecar_in_use(user_id, topic['pdf_hash']):
+            keys.append(pdf_text.sidecar_key(topic['pdf_hash']))
+        return [key for key in keys if key]
+
+    def delete_quiz(self, quiz, attempt_keys=None):
+        """Delete one quiz and everything that depends on it; returns counts per kind.
+
+        ``quiz`` needs quiz_id, user_id and topic_id. attempt_keys may be
+        passed when the caller has already collected all of them. The quiz
+        item goes last, so a retry still finds what the quiz pointed to.
+        """
+        quiz_id, user_id = quiz['quiz_id'], quiz['user_id']
+        if attempt_keys is None:
+            attempt_keys = self.attempt_keys(quiz_id)
+        counts = {'attempts': self._batch_delete(self.attempts_table, attempt_keys),
+                  'topics': 0, 'objects': 0}
+        self._table(self.stats_table).delete_item(Key={'stats_key': attempt_stats.quiz_key(quiz_id)})
+
+        topic_id = quiz.get('topic_id')
+        if topic_id and not self.topic_in_use(user_id, topic_id, quiz_id):
+            topic = self._table(self.topics_table).get_item(
+                Key={'user_id': user_id, 'topic_id': topic_id}).get('Item')
+            if topic:
+                counts['objects'] = delete_objects(self.s3, self.bucket, self.topic_object_keys(user_id, topic))
+                if topic.get('name'):
+                    self._table(self.topic_names_table).delete_item(
+                        Key={'user_id': user_id, 'name_key': topic_names.name_key(topic['name'])})
+                self._table(self.topics_table).delete_item(Key={'user_id': user_id, 'topic_id': topic_id})
+                counts['topics'] = 1
+
+        self._table(self.quizzes_table).delete_item(Key={'quiz_id': quiz_id})
+        logger.info(f"Deleted quiz {quiz_id}: {counts}")
+        return counts
+
+    def _user_pages(self, table_name, user_id, projection, index_name=None):
+        """Items of one user in a table or index, a Query page at a time; all attributes without a projection."""
+        kwargs = {
+            'KeyConditionExpression': 'user_id = :uid',
+            'ExpressionAttributeValues': {':uid': user_id},
+            'Limit': QUERY_PAGE_SIZE
+        }
+        if projection:
+            kwargs['ProjectionExpression'] = projection
+        if index_name:
+            kwargs['IndexName'] = index_name
+        for page in dynamo.query_pages(self._table(table_name), **kwargs):
+            yield page.get('Items', [])
+
+    def delete_user_quizzes(self, user_id, deadline=None):
+        """Delete all of a user's quizzes, attempts, statistics, topics and files.
+
+        Each of the user's quizzes goes through delete_quiz, which takes
+        every attempt on it (other users' too) and its QUIZ# stats. The
+        user's attempts on other users' quizzes are then deleted with
+        attempt_stats.remove, which takes them back out of those quizzes'
+        stats and attempt_count. Works a quiz or a page at a time and, once
+        time.monotonic() passes ``deadline``, stops after the next one that
+        deleted something, so every call makes progress. Returns (done,
+        counts); when done is False, call again to carry on from what is
+        left.
+        """
+        counts = {'quizzes': 0, 'attempts': 0, 'stats': 0, 'topics': 0, 'topic_names': 0, 'objects': 0}
+
+        def out_of_time():
+            return deadline is not None and time.monotonic() > deadline
+
+        for items in self._user_pages(self.quizzes_table, user_id, 'quiz_id', 'UserIdIndex'):
+            for item in items:
+                # No topic_id: every topic of the user is deleted below, without
+                # asking per quiz whether another quiz still uses it
+                deleted = self.delete_quiz({'quiz_id': item['quiz_id'], 'user_id': user_id})
+                counts['quizzes'] += 1
+                counts['attempts'] += deleted['attempts']
+                counts['stats'] += 1
+                if out_of_time():
+                    return False, counts
+
+        # What is left are attempts on other users' quizzes, which stay
+        for items in self._user_pages(self.attempts_table, user_id, None, 'UserCreatedAtIndex'):
+            counts['attempts'] += attempt_stats.remove(
+                self.dynamodb, self.attempts_table, self.quizzes_table, self.stats_table, items)
+            if items and out_of_time():
+                return False, counts
+        self._table(self.stats_table).delete_item(Key={'stats_key': attempt_stats.user_key(user_id)})
+
+        for items in self._user_pages(self.topics_table, user_id, 'topic_id, s3_key, pdf_hash'):
+            counts['objects'] += delete_objects(
+                self.s3, self.bucket, [key for item in items for key in self.topic_object_keys(user_id, item)])
+            counts['topics'] += self._batch_delete(
+                self.topics_table, [{'user_id': user_id, 'topic_id': item['topic_id']} for item in items])
+            if items and out_of_time():
+                return False, counts
+
+        for items in self._user_pages(self.topic_names_table, user_id, 'name_key'):
+            counts['topic_names'] += self._batch_delete(
+                self.topic_names_table, [{'user_id': user_id, 'name_key': item['name_key']} for item in items])
+            if items and out_of_time():
+                return False, counts
+
+        logger.info(f"Deleted all quizzes of user {user_id}: {counts}")
+        return True, counts
+
+
+def send_cleanup_message(sqs, queue_url, message):
+    """Queue a cascade for the cleanup worker: delete_quiz or delete_user_quizzes."""
+    sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(message))
+    logger.info(f"Queued {message['action']} for user {message['user_id']}")
@@ -0,0 +1,162 @@
+import json
+import time
+import base64
+import random
+import logging
+
+logger = logging.getLogger()
+
+
+def query_pages(table, **kwargs):
+    """Yield each page of a Query, following LastEvaluatedKey until exhausted."""
+    while True:
+        response = table.query(**kwargs)
+        yield response
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def query_all(table, max_items=None, **kwargs):
+    """Return every item matched by a Query (up to max_items), across all pages."""
+    items = []
+    for page in query_pages(table, **kwargs):
+        items.extend(page.get('Items', []))
+        if max_items is not None and len(items) >= max_items:
+            return items[:max_items]
+    return items
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(last_evaluated_key):
+    """Wrap a LastEvaluatedKey in an opaque, URL-safe cursor string."""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(',', ':'), sort_keys=True, default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Turn a cursor from encode_cursor back into an ExclusiveStartKey."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid pagination cursor")
+    if not isinstance(key, dict) or not all(isinstance(v, str) for v in key.values()):
+        raise InvalidCursor("Invalid pagination cursor")
+    return key
+
+
+def query_page(table, limit, cursor=None, **kwargs):
+    """Run one page of a Query. Returns (items, next_cursor); next_cursor is None on the last page."""
+    start_key = decode_cursor(cursor)
+    if start_key:
+        kwargs['ExclusiveStartKey'] = start_key
+    response = table.query(Limit=limit, **kwargs)
+    return response.get('Items', []), encode_cursor(response.get('LastEvaluatedKey'))
+
+
+TRANSACT_MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = 0.02
+RETRY_MAX_DELAY = 1.0
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given 1-based attempt number."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def cancellation_codes(error):
+    """The per-action reason codes of a TransactionCanceledException."""
+    return [reason.get('Code') for reason in error.response.get('CancellationReasons', [])]
+
+
+def transact_write(client, items, max_attempts=TRANSACT_MAX_ATTEMPTS, sleep=time.sleep):
+    """Run TransactWriteItems, retrying with full-jitter backoff while it is cancelled by conflicts.
+
+    Concurrent transactions on the same item (a hot quiz's counter, say)
+    cancel each other with a TransactionConflict reason; those are retried.
+    Any other cancellation, such as a failed condition, is raised for the
+    caller to inspect with cancellation_codes. Returns the number of
+    attempts made.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            client.transact_write_items(TransactItems=items)
+            return attempt
+        except client.exceptions.TransactionCanceledException as e:
+            codes = cancellation_codes(e)
+            if 'TransactionConflict' not in codes or any(c not in ('None', 'TransactionConflict') for c in codes):
+                raise
+            if attempt == max_attempts:
+                logger.warning(f"Transaction still conflicting after {attempt} attempts")
+                raise
+            sleep(backoff_delay(attempt))
+
+
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 8
+
+
+def batch_get(resource, table_name, keys, projection=None, names=None,
+              max_attempts=BATCH_GET_MAX_ATTEMPTS, sleep=time.sleep):
+    """Fetch items by key with BatchGetItem, 100 keys per call.
+
+    Duplicate keys are requested once. UnprocessedKeys are retried with
+    full-jitter backoff, and a RuntimeError is raised if some are still
+    unprocessed after max_attempts calls for a chunk. Items come back in no
+    particular order and missing keys are simply absent.
+    """
+    unique = list({json.dumps(key, sort_keys=True, default=str): key for key in keys}.values())
+    items = []
+    for start in range(0, len(unique), BATCH_GET_MAX_KEYS):
+        request = {'Keys': unique[start:start + BATCH_GET_MAX_KEYS]}
+        if projection:
+            request['ProjectionExpression'] = projection
+        if names:
+            request['ExpressionAttributeNames'] = names
+        pending = {table_name: request}
+        for attempt in range(1, max_attempts + 1):
+            response = resource.batch_get_item(RequestItems=pending)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            pending = response.get('UnprocessedKeys') or {}
+            if not pending:
+                break
+            if attempt == max_attempts:
+                raise RuntimeError(f"BatchGetItem left {len(pending[table_name]['Keys'])} keys unprocessed")
+            sleep(backoff_delay(attempt))
+    return items
+
+
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_WRITE_MAX_ATTEMPTS = 8
+
+
+def batch_delete(resource, table_name, keys, max_attempts=BATCH_WRITE_MAX_ATTEMPTS, sleep=time.sleep):
+    """Delete items by key with BatchWriteItem, 25 per call.
+
+    Duplicate keys are deleted once, and deleting a missing key is a no-op.
+    UnprocessedItems are retried with full-jitter backoff, and a
+    RuntimeError is raised if some are still unprocessed after max_attempts
+    calls for a chunk. Returns the number of keys deleted.
+    """
+    unique = list({json.dumps(key, sort_keys=True, default=str): key for key in keys}.values())
+    for start in range(0, len(unique), BATCH_WRITE_MAX_ITEMS):
+        pending = {table_name: [{'DeleteRequest': {'Key': key}}
+                                for key in unique[start:start + BATCH_WRITE_MAX_ITEMS]]}
+        for attempt in range(1, max_attempts + 1):
+            response = resource.batch_write_item(RequestItems=pending)
+            pending = response.get('UnprocessedItems') or {}
+            if not pending:
+                break
+            if attempt == max_attempts:
+                raise RuntimeError(f"BatchWriteItem left {len(pending[table_name])} deletes unprocessed")
+            sleep(backoff_delay(attempt))
+    return len(unique)
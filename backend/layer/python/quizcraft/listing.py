@@ -0,0 +1,31 @@
+import os
+
+# Attributes the quiz list views need; quiz_content is only served by /quiz/{quiz_id}.
+# Must stay in sync with the non_key_attributes of the UserIdIndex projection.
+QUIZ_SUMMARY_ATTRIBUTES = (
+    'quiz_id', 'user_id', 'created_at', 'topic_id', 'topic_name',
+    'status', 'attempt_count', 'error_message',
+)
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('QUIZ_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = 100
+
+
+def summary_projection():
+    """ProjectionExpression and ExpressionAttributeNames for quiz summaries."""
+    names = {f"#{attr}": attr for attr in QUIZ_SUMMARY_ATTRIBUTES}
+    return ', '.join(names), names
+
+
+def page_size(query_params):
+    """Read ?limit= from the query string, clamped to MAX_PAGE_SIZE."""
+    raw = (query_params or {}).get('limit')
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
@@ -0,0 +1,357 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from quizcraft import runtime, sections
+
+logger = logging.getLogger()
+
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai')
+MODEL = os.environ.get('LLM_MODEL', 'gpt-3.5-turbo')
+MAX_ATTEMPTS = int(os.environ.get('LLM_MAX_ATTEMPTS', '4'))
+RETRY_BASE_DELAY = float(os.environ.get('LLM_RETRY_BASE_DELAY', '0.5'))
+RETRY_MAX_DELAY = float(os.environ.get('LLM_RETRY_MAX_DELAY', '8'))
+CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', '3'))
+# Upper bound on one call when the invocation has more time than this left
+CALL_TIMEOUT = float(os.environ.get('LLM_CALL_TIMEOUT', '45'))
+# Calls are not started with less time than this before the deadline
+MIN_CALL_SECONDS = float(os.environ.get('LLM_MIN_CALL_SECONDS', '1'))
+# Invocation time kept back from LLM calls for the writes and notifications after them
+DEADLINE_RESERVE_SECONDS = float(os.environ.get('LLM_DEADLINE_RESERVE_SECONDS', '3'))
+POOL_CONNECTIONS = int(os.environ.get('LLM_POOL_CONNECTIONS', '20'))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """A completion failed after retries, or could not be retried."""
+
+    def __init__(self, message, status=None, retryable=False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class DeadlineExceeded(LLMError):
+    """Not enough invocation time is left to start or retry a call."""
+
+
+def deadline_from_context(context, reserve_seconds=DEADLINE_RESERVE_SECONDS):
+    """time.monotonic() value LLM calls must finish by, or None without a Lambda context."""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    return time.monotonic() + context.get_remaining_time_in_millis() / 1000 - reserve_seconds
+
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Full-jitter exponential backoff before retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class Completion:
+    """One finished completion: the text, why it stopped and what it cost."""
+
+    def __init__(self, content, finish_reason, prompt_tokens, completion_tokens, latency_seconds, attempts):
+        self.content = content
+        self.finish_reason = finish_reason
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.latency_seconds = latency_seconds
+        self.attempts = attempts
+
+
+class LLMClient:
+    """Chat completions with deadlines, jittered retries and usage metrics.
+
+    Subclasses implement ``_call``; ``complete`` wraps it with the retry
+    policy. When ``on_delta`` is given the reply is streamed to it piece by
+    piece, and a call is only retried if nothing was delivered yet. A stream
+    that reaches the deadline stops early with finish_reason 'deadline' so
+    the caller keeps what arrived.
+    """
+
+    name = 'base'
+
+    def __init__(self, model=MODEL, max_attempts=MAX_ATTEMPTS, retry_base_delay=RETRY_BASE_DELAY,
+                 retry_max_delay=RETRY_MAX_DELAY, sleep=time.sleep):
+        self.model = model
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.latency_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._emitted = (0, 0, 0, 0.0, 0, 0)
+
+    def complete(self, messages, max_tokens, temperature=0.7, deadline=None, on_delta=None):
+        start = time.monotonic()
+        delivered = []
+
+        def forward(text):
+            delivered.append(text)
+            on_delta(text)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self._timeout(deadline)
+            try:
+                content, finish_reason, usage = self._call(
+                    messages, max_tokens, temperature, timeout, deadline, forward if on_delta else None)
+                break
+            except LLMError as e:
+                retry = e.retryable and not delivered and attempt < self.max_attempts
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay) if retry else 0
+                if retry and (deadline is None or time.monotonic() + delay < deadline):
+                    logger.warning("LLM call failed (%s), retrying in %.2fs", str(e), delay)
+                    with self._lock:
+                        self.retries += 1
+                    self._sleep(delay)
+                    continue
+                with self._lock:
+                    self.failures += 1
+                raise
+
+        latency = time.monotonic() - start
+        prompt_tokens = usage.get('prompt_tokens') if usage else None
+        completion_tokens = usage.get('completion_tokens') if usage else None
+        if prompt_tokens is None:
+            # Streamed replies carry no usage; count locally
+            prompt_tokens = sum(sections.count_tokens(m['content']) for m in messages)
+        if completion_tokens is None:
+            completion_tokens = sections.count_tokens(content)
+        with self._lock:
+            self.calls += 1
+            self.latency_seconds += latency
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        logger.info("LLM call: %.0f ms, %d attempts, %d prompt + %d completion tokens, finish %s",
+                    latency * 1000, attempt, prompt_tokens, completion_tokens, finish_reason)
+        return Completion(content, finish_reason, prompt_tokens, completion_tokens, latency, attempt)
+
+    def _timeout(self, deadline):
+        if deadline is None:
+            return CALL_TIMEOUT
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_CALL_SECONDS:
+            with self._lock:
+                self.failures += 1
+            raise DeadlineExceeded(f"{remaining:.1f}s left before the invocation deadline")
+        return min(CALL_TIMEOUT, remaining)
+
+    def _call(self, messages, max_tokens, temperature, timeout, deadline, on_delta):
+        """Return (content, finish_reason, usage dict or None), raising LLMError on failure."""
+        raise NotImplementedError
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'mean_latency_seconds': self.latency_seconds / self.calls if self.calls else 0.0,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+
+    def emit_metrics(self):
+        """Log calls, retries, latency and tokens since the last call in CloudWatch Embedded Metric Format."""
+        with self._lock:
+            current = (self.calls, self.retries, self.failures, self.latency_seconds,
+                       self.prompt_tokens, self.completion_tokens)
+            last = self._emitted
+            self._emitted = current
+        calls, retries, failures, latency, prompt_tokens, completion_tokens = (
+            now - before for now, before in zip(current, last))
+        if not calls and not failures:
+            return
+        print(json.dumps({
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': 'QuizCraft',
+                    'Dimensions': [['LLMBackend']],
+                    'Metrics': [
+                        {'Name': 'LLMCalls', 'Unit': 'Count'},
+                        {'Name': 'LLMRetries', 'Unit': 'Count'},
+                        {'Name': 'LLMFailures', 'Unit': 'Count'},
+                        {'Name': 'LLMMeanLatency', 'Unit': 'Milliseconds'},
+                        {'Name': 'LLMPromptTokens', 'Unit': 'Count'},
+                        {'Name': 'LLMCompletionTokens', 'Unit': 'Count'},
+                    ],
+                }],
+            },
+            'LLMBackend': self.name,
+            'LLMCalls': calls,
+            'LLMRetries': retries,
+            'LLMFailures': failures,
+            'LLMMeanLatency': round(latency * 1000 / calls, 1) if calls else 0.0,
+            'LLMPromptTokens': prompt_tokens,
+            'LLMCompletionTokens': completion_tokens,
+        }))
+
+
+class OpenAIClient(LLMClient):
+    """OpenAI chat completions over one pooled, keep-alive requests session.
+
+    The API key comes from runtime.get_openai_api_key() on each call and is
+    passed per request, so the openai module's global key is never set.
+    """
+
+    name = 'openai'
+
+    def __init__(self, api_base=None, pool_connections=POOL_CONNECTIONS, **kwargs):
+        super().__init__(**kwargs)
+        import openai
+        import requests
+        self._openai = openai
+        self.api_base = api_base or os.environ.get('OPENAI_API_BASE')
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_connections)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        # openai 0.28 uses this session from every thread instead of one per thread
+        openai.requestssession = session
+        self.session = session
+
+    def _call(self, messages, max_tokens, temperature, timeout, deadline, on_delta):
+        openai = self._openai
+        try:
+            response = openai.ChatCompletion.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=on_delta is not None,
+                api_key=runtime.get_openai_api_key(),
+                api_base=self.api_base,
+                request_timeout=(CONNECT_TIMEOUT, timeout),
+            )
+            if on_delta is None:
+                choice = response['choices'][0]
+                return choice['message']['content'], choice.get('finish_reason'), response.get('usage')
+
+            pieces, finish_reason = [], None
+            for chunk in response:
+                choice = chunk['choices'][0]
+                text = choice['delta'].get('content')
+                if text:
+                    pieces.append(text)
+                    on_delta(text)
+                finish_reason = choice.get('finish_reason') or finish_reason
+                if deadline is not None and time.monotonic() >= deadline:
+                    response.close()
+                    finish_reason = 'deadline'
+                    break
+            return ''.join(pieces), finish_reason, None
+        except openai.error.AuthenticationError as e:
+            # The key was probably rotated; refetch it on the next call
+            runtime.invalidate_openai_api_key()
+            raise LLMError(str(e), status=401)
+        except (openai.error.Timeout, openai.error.APIConnectionError) as e:
+            raise LLMError(str(e), retryable=True)
+        except openai.error.OpenAIError as e:
+            status = e.http_status
+            raise LLMError(str(e), status=status, retryable=status in RETRYABLE_STATUS)
+
+
+def stub_reply(prompt):
+    """Deterministic reply for a prompt: a question array when it asks for questions, else a title.
+
+    Prompts that ask for a "topic_name" get {"topic_name", "questions"} instead of a bare array.
+    """
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    match = re.search(r'Generate (?:a quiz with )?(\d+)', prompt)
+    if not match:
+        return f"Topic {digest[:8]}"
+    questions = []
+    for i in range(int(match.group(1))):
+        tag = hashlib.sha256(f"{digest}:{i}".encode('utf-8')).hexdigest()[:10]
+        options = [f"Option {tag}-{c}" for c in 'ABCD']
+        questions.append({
+            'question': f"Question {i + 1} ({tag})?",
+            'options': options,
+            'correct_answer': options[int(tag, 16) % 4],
+        })
+    if '"topic_name"' in prompt:
+        return json.dumps({'topic_name': f"Topic {digest[:8]}", 'questions': questions}, indent=4)
+    return json.dumps(questions, indent=4)
+
+
+class StubClient(LLMClient):
+    """Offline backend with deterministic replies and a token-based latency model.
+
+    Latency is a fixed overhead before the first token plus a cost per
+    prompt and per completion token, multiplied by ``time_scale``.
+    ``failure_rate`` of calls fail with a retryable 429, drawn from ``seed``.
+    """
+
+    name = 'stub'
+    # Characters per streamed delta; roughly one token
+    DELTA_CHARS = sections.CHARS_PER_TOKEN
+
+    def __init__(self, reply=stub_reply, time_scale=None, overhead_ms=400.0, prompt_ms_per_token=0.05,
+                 completion_ms_per_token=15.0, failure_rate=0.0, seed=0, **kwargs):
+        super().__init__(**kwargs)
+        self.reply = reply
+        self.time_scale = float(os.environ.get('LLM_STUB_TIME_SCALE', '1')) if time_scale is None else time_scale
+        self.overhead_ms = overhead_ms
+        self.prompt_ms_per_token = prompt_ms_per_token
+        self.completion_ms_per_token = completion_ms_per_token
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+
+    def _call(self, messages, max_tokens, temperature, timeout, deadline, on_delta):
+        prompt = messages[-1]['content']
+        prompt_tokens = sum(sections.count_tokens(m['content']) for m in messages)
+        first_token_ms = self.overhead_ms + prompt_tokens * self.prompt_ms_per_token
+        with self._lock:
+            failed = self._rng.random() < self.failure_rate
+        if failed:
+            self._wait(time.monotonic(), self.overhead_ms)
+            raise LLMError("Rate limit reached (stub)", status=429, retryable=True)
+
+        content, finish_reason = self.reply(prompt), 'stop'
+        if sections.count_tokens(content) > max_tokens:
+            content, finish_reason = content[:max_tokens * sections.CHARS_PER_TOKEN], 'length'
+        start = time.monotonic()
+        if on_delta is None:
+            self._wait(start, first_token_ms + sections.count_tokens(content) * self.completion_ms_per_token)
+        else:
+            # Sleep to a schedule so per-delta sleep overhead does not accumulate
+            for n, i in enumerate(range(0, len(content), self.DELTA_CHARS)):
+                self._wait(start, first_token_ms + (n + 1) * self.completion_ms_per_token)
+                if deadline is not None and time.monotonic() >= deadline:
+                    return content[:i], 'deadline', None
+                on_delta(content[i:i + self.DELTA_CHARS])
+        return content, finish_reason, {'prompt_tokens': prompt_tokens,
+                                        'completion_tokens': sections.count_tokens(content)}
+
+    def _wait(self, start, ms):
+        time.sleep(max(0.0, start + ms * self.time_scale / 1000 - time.monotonic()))
+
+
+_default_client = None
+
+
+def default_client():
+    """The process-wide client for LLM_BACKEND ('openai' or 'stub')."""
+    global _default_client
+    if _default_client is None:
+        if LLM_BACKEND == 'stub':
+            _default_client = StubClient()
+        elif LLM_BACKEND == 'openai':
+            _default_client = OpenAIClient()
+        else:
+            raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
+    return _default_client
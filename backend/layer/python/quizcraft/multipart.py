@@ -0,0 +1,248 @@
+import io
+import hashlib
+import binascii
+
+# Base64 input is decoded in slices of this many characters (a multiple of 4).
+DEFAULT_CHUNK_SIZE = 256 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class MultipartError(ValueError):
+    """Raised when a multipart/form-data body is malformed."""
+
+
+class Part:
+    """A single form field. Fields listed in ``hash_fields`` get a SHA-256 digest."""
+
+    def __init__(self, name, filename=None, content_type=None, hash_data=False):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self._buffer = bytearray()
+        self._hasher = hashlib.sha256() if hash_data else None
+        self.sha256 = None
+
+    def _write(self, chunk):
+        self._buffer += chunk
+        if self._hasher is not None:
+            self._hasher.update(chunk)
+
+    def _finish(self):
+        if self._hasher is not None:
+            self.sha256 = self._hasher.hexdigest()
+            self._hasher = None
+
+    @property
+    def data(self):
+        """Zero-copy view of the field contents."""
+        return memoryview(self._buffer)
+
+    @property
+    def size(self):
+        return len(self._buffer)
+
+    def stream(self):
+        """Seekable, read-only file object over the contents (no copy)."""
+        return MemoryViewStream(self.data)
+
+    def text(self, encoding='utf-8'):
+        return self._buffer.decode(encoding, errors='replace')
+
+
+class MemoryViewStream(io.RawIOBase):
+    """Read-only, seekable stream over a memoryview, usable by boto3 and PyPDF2."""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        remaining = len(self._view) - self._pos
+        n = min(len(b), remaining)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._pos + size)
+        data = self._view[self._pos:end].tobytes()
+        self._pos = end
+        return data
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+        return pos
+
+    def tell(self):
+        return self._pos
+
+    def __len__(self):
+        return len(self._view)
+
+
+class MultipartParser:
+    """Incremental multipart/form-data parser.
+
+    Bytes are pushed with ``feed`` in arbitrarily sized chunks. Part bodies are
+    appended straight into their own buffer (and hashed, if requested) as the
+    chunks arrive, so the body is never materialized twice.
+    """
+
+    def __init__(self, boundary, hash_fields=()):
+        if isinstance(boundary, str):
+            boundary = boundary.encode('latin-1')
+        if not boundary:
+            raise MultipartError("Empty multipart boundary")
+        self._delimiter = b'\r\n--' + boundary
+        self._hash_fields = set(hash_fields)
+        # A leading CRLF lets the first boundary match the same delimiter as the rest.
+        self._buffer = bytearray(b'\r\n')
+        self._state = 'preamble'
+        self._part = None
+        self.parts = {}
+
+    def feed(self, data):
+        if self._state == 'done':
+            return
+        self._buffer += data
+        self._process()
+
+    def close(self):
+        if self._state != 'done':
+            raise MultipartError("Multipart body ended before the closing boundary")
+        return self.parts
+
+    def _process(self):
+        buf = self._buffer
+        keep = len(self._delimiter) - 1
+        while True:
+            if self._state in ('preamble', 'body'):
+                idx = buf.find(self._delimiter)
+                if idx < 0:
+                    # Keep a tail in case the delimiter straddles two chunks
+                    flush = len(buf) - keep
+                    if flush > 0:
+                        if self._state == 'body':
+                            self._part._write(memoryview(buf)[:flush])
+                        del buf[:flush]
+                    return
+                if self._state == 'body':
+                    self._part._write(memoryview(buf)[:idx])
+                    self._part._finish()
+                    self.parts[self._part.name] = self._part
+                    self._part = None
+                del buf[:idx + len(self._delimiter)]
+                self._state = 'delimiter'
+            elif self._state == 'delimiter':
+                if len(buf) < 2:
+                    return
+                if buf[:2] == b'--':
+                    self._state = 'done'
+                    buf.clear()
+                    return
+                eol = buf.find(b'\r\n')
+                if eol < 0:
+                    return
+                del buf[:eol + 2]
+                self._state = 'headers'
+            elif self._state == 'headers':
+                end = buf.find(b'\r\n\r\n')
+                if end < 0:
+                    if len(buf) > MAX_HEADER_BYTES:
+                        raise MultipartError("Multipart part headers too large")
+                    return
+                headers = _parse_headers(bytes(buf[:end]))
+                del buf[:end + 4]
+                disposition, params = _parse_header_value(headers.get('content-disposition', ''))
+                name = params.get('name')
+                if disposition != 'form-data' or name is None:
+                    raise MultipartError("Part is missing a form-data Content-Disposition")
+                self._part = Part(
+                    name,
+                    filename=params.get('filename'),
+                    content_type=headers.get('content-type'),
+                    hash_data=name in self._hash_fields,
+                )
+                self._state = 'body'
+            else:
+                return
+
+
+def _parse_headers(raw):
+    headers = {}
+    for line in raw.decode('latin-1').split('\r\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+def _parse_header_value(value):
+    """Split 'form-data; name="pdf"; filename="a.pdf"' into ('form-data', params)."""
+    pieces = value.split(';')
+    params = {}
+    for piece in pieces[1:]:
+        if '=' not in piece:
+            continue
+        key, val = piece.split('=', 1)
+        val = val.strip()
+        if len(val) >= 2 and val[0] == val[-1] == '"':
+            val = val[1:-1]
+        params[key.strip().lower()] = val
+    return pieces[0].strip().lower(), params
+
+
+def get_boundary(content_type):
+    """Return the boundary parameter of a multipart Content-Type header."""
+    _, params = _parse_header_value(content_type)
+    boundary = params.get('boundary')
+    if not boundary:
+        raise MultipartError("Boundary not found in Content-Type header")
+    return boundary
+
+
+def iter_body_chunks(body, is_base64, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the raw request body as bytes, decoding base64 slice by slice."""
+    if isinstance(body, (bytes, bytearray)):
+        if is_base64:
+            body = body.decode('ascii')
+        else:
+            for start in range(0, len(body), chunk_size):
+                yield body[start:start + chunk_size]
+            return
+    if is_base64:
+        chunk_size -= chunk_size % 4
+        for start in range(0, len(body), chunk_size):
+            try:
+                yield binascii.a2b_base64(body[start:start + chunk_size])
+            except binascii.Error as e:
+                raise MultipartError(f"Invalid base64 body: {str(e)}")
+    else:
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size].encode('utf-8')
+
+
+def parse_form(body, content_type, is_base64=False, hash_fields=(), chunk_size=DEFAULT_CHUNK_SIZE):
+    """Parse an API Gateway multipart body into a dict of field name -> Part."""
+    parser = MultipartParser(get_boundary(content_type), hash_fields=hash_fields)
+    for chunk in iter_body_chunks(body, is_base64, chunk_size):
+        parser.feed(chunk)
+    return parser.close()
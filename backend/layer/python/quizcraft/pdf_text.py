@@ -0,0 +1,144 @@
+import io
+import os
+import gzip
+import logging
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+# Characters of PDF text kept for generation; nothing past this is extracted.
+# This bounds extraction, not the prompt: quiz_generator sends at most
+# MAX_SECTIONS sections of SECTION_TOKENS (16 x 2500, about 40k input tokens
+# per quiz), sampled across this text so long documents are covered evenly.
+MAX_TEXT_CHARS = int(os.environ.get('PDF_MAX_TEXT_CHARS', '400000'))
+SIDECAR_PREFIX = 'text/'
+# Error codes of a GET for a key that does not exist. Without s3:ListBucket
+# on the bucket, S3 answers 403 AccessDenied rather than 404 NoSuchKey.
+MISSING_KEY_CODES = ('NoSuchKey', '404', 'AccessDenied', '403')
+
+# Process-pool extraction is opt-in: it only pays off for long documents on
+# multi-vCPU functions (>= 1769 MB). Workers get the PDF bytes once at startup.
+EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', '0'))
+PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', '40'))
+
+_worker_reader = None
+
+
+def extract_text(pdf, max_chars=MAX_TEXT_CHARS, workers=EXTRACT_WORKERS):
+    """Extract text from a PDF given as bytes, a memoryview or a seekable stream.
+
+    Pages are read in order and extraction stops as soon as ``max_chars``
+    characters have been collected, so long documents are not parsed past
+    the part the prompt will use. With ``workers`` > 1, documents of at least
+    PARALLEL_MIN_PAGES pages are extracted in a process pool, a window of
+    pages at a time; if the platform cannot start worker processes the
+    serial path is used instead.
+    """
+    # Imported here so handlers that only use the sidecar helpers (the
+    # upload API, topic generations) never pay for loading the parser
+    import PyPDF2
+    stream = io.BytesIO(pdf) if isinstance(pdf, (bytes, bytearray, memoryview)) else pdf
+    pdf_reader = PyPDF2.PdfReader(stream)
+    page_count = len(pdf_reader.pages)
+
+    text = None
+    if workers and workers > 1 and page_count >= PARALLEL_MIN_PAGES:
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            text, pages_read = _collect(_iter_pages_parallel(_as_bytes(pdf), page_count, workers), max_chars)
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning("Parallel PDF extraction unavailable, using serial path: %s", str(e))
+    if text is None:
+        text, pages_read = _collect(_iter_pages(pdf_reader), max_chars)
+
+    logger.info("Extracted text length: %d characters from %d of %d pages", len(text), pages_read, page_count)
+    if not text.strip():
+        raise ValueError("No text extracted from PDF")
+    text = text.encode('utf-8', errors='ignore').decode('utf-8')
+    return text[:max_chars] if max_chars else text
+
+
+def _collect(pages, max_chars):
+    """Join page texts into one string, stopping once the character budget is met."""
+    parts = []
+    total = 0
+    pages_read = 0
+    try:
+        for page_text in pages:
+            pages_read += 1
+            if not page_text:
+                continue
+            parts.append(page_text)
+            total += len(page_text)
+            if max_chars and total >= max_chars:
+                break
+    finally:
+        pages.close()
+    return ''.join(parts), pages_read
+
+
+def _iter_pages(pdf_reader):
+    for page in pdf_reader.pages:
+        yield page.extract_text()
+
+
+def _iter_pages_parallel(pdf_bytes, page_count, workers):
+    """Yield page texts in order, extracting a window of pages concurrently."""
+    from concurrent.futures import ProcessPoolExecutor
+    window = workers * 2
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pdf_bytes,))
+    try:
+        for start in range(0, page_count, window):
+            futures = [executor.submit(_extract_page, i) for i in range(start, min(start + window, page_count))]
+            for future in futures:
+                yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_worker(pdf_bytes):
+    global _worker_reader
+    import PyPDF2
+    _worker_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+
+
+def _extract_page(index):
+    return _worker_reader.pages[index].extract_text()
+
+
+def _as_bytes(pdf):
+    if isinstance(pdf, bytes):
+        return pdf
+    if isinstance(pdf, (bytearray, memoryview)):
+        return bytes(pdf)
+    pdf.seek(0)
+    return pdf.read()
+
+
+def sidecar_key(pdf_hash):
+    """S3 key of the compressed extracted-text sidecar for a PDF."""
+    return f"{SIDECAR_PREFIX}{pdf_hash}.txt.gz"
+
+
+def put_text_sidecar(s3, bucket, key, text):
+    """Store extracted text gzip-compressed next to the PDFs."""
+    body = gzip.compress(text.encode('utf-8'), compresslevel=6)
+    s3.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=body,
+        ContentType='text/plain; charset=utf-8',
+        ContentEncoding='gzip',
+    )
+    logger.info("Stored text sidecar %s (%d bytes compressed)", key, len(body))
+
+
+def get_text_sidecar(s3, bucket, key):
+    """Return sidecar text, or None if it has not been written (or cannot be read)."""
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in MISSING_KEY_CODES:
+            raise
+        return None
+    return gzip.decompress(obj['Body'].read()).decode('utf-8')
@@ -0,0 +1,106 @@
+import re
+import json
+import logging
+
+logger = logging.getLogger()
+
+# Characters kept before the array while looking for its key
+KEY_WINDOW_CHARS = 64
+
+
+def is_question(item):
+    """True for a question object the quiz pages can render."""
+    return (isinstance(item, dict) and isinstance(item.get('question'), str)
+            and isinstance(item.get('options'), list) and 'correct_answer' in item)
+
+
+class QuestionParser:
+    """Pulls question objects out of a JSON array as its text arrives in pieces.
+
+    ``feed`` returns the questions completed by each piece. Text before the
+    opening ``[`` (prose, a code fence) is skipped, objects that fail to
+    parse or validate are dropped, and anything after the closing ``]`` is
+    ignored. A response cut off mid-object keeps every question completed
+    before the cut.
+
+    With ``array_key`` the array is the value of that key in an object
+    reply, such as {"topic_name": ..., "questions": [...]}; a ``[`` before
+    it, say in the topic name, is not taken for its start. A JSON string
+    cannot hold the key's unescaped quotes, so matching the text is enough.
+    """
+
+    def __init__(self, array_key=None):
+        self._array_start = re.compile(r'"%s"\s*:\s*\[$' % re.escape(array_key)) if array_key else None
+        self._prefix = ''
+        self.questions = []
+        self.dropped = 0
+        self._buffer = []
+        self._in_array = False
+        self._closed = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text):
+        completed = []
+        for ch in text:
+            if self._closed:
+                break
+            if not self._in_array:
+                if self._array_start is None:
+                    self._in_array = ch == '['
+                else:
+                    self._prefix = (self._prefix + ch)[-KEY_WINDOW_CHARS:]
+                    self._in_array = ch == '[' and bool(self._array_start.search(self._prefix))
+                continue
+            if self._depth:
+                self._buffer.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if not self._depth:
+                    self._buffer = [ch]
+                self._depth += 1
+            elif ch in '}]':
+                if not self._depth:
+                    self._closed = ch == ']'
+                    continue
+                self._depth -= 1
+                if not self._depth:
+                    question = self._finish(''.join(self._buffer))
+                    if question is not None:
+                        completed.append(question)
+        self.questions.extend(completed)
+        return completed
+
+    def _finish(self, text):
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            item = None
+        if not is_question(item):
+            self.dropped += 1
+            logger.warning("Dropped malformed question: %s", text[:200])
+            return None
+        return item
+
+
+_STRING_FIELD = r'"%s"\s*:\s*("(?:[^"\\]|\\.)*")'
+
+
+def string_field(text, name):
+    """Value of a top-level string field such as "topic_name" in a (possibly truncated) reply, or None."""
+    match = re.search(_STRING_FIELD % re.escape(name), text or '')
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
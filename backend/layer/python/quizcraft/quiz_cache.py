@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger()
+
+CACHE_BACKEND = os.environ.get('QUIZ_CACHE_BACKEND', 'memory')
+CACHE_TTL_SECONDS = int(os.environ.get('QUIZ_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+CACHE_VARIANTS = int(os.environ.get('QUIZ_CACHE_VARIANTS', '3'))
+CACHE_MAX_ENTRIES = int(os.environ.get('QUIZ_CACHE_MAX_ENTRIES', '256'))
+CACHE_MAX_BYTES = int(os.environ.get('QUIZ_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_DIR = os.environ.get('QUIZ_CACHE_DIR', '/tmp/quiz-cache')
+CACHE_TABLE = os.environ.get('QUIZ_CACHE_TABLE')
+
+
+def normalize_topic(topic):
+    """Case- and whitespace-insensitive form of a topic string."""
+    return ' '.join(topic.casefold().split())
+
+
+def cache_key(model, prompt_template, topic=None, text=None):
+    """Content address for a generation request.
+
+    The key covers the model, the prompt template and either the normalized
+    topic or a digest of the source text, so changing any of them misses.
+    """
+    if text is not None:
+        source = 'text:' + hashlib.sha256(text.encode('utf-8')).hexdigest()
+    else:
+        source = 'topic:' + normalize_topic(topic or '')
+    template_digest = hashlib.sha256(prompt_template.encode('utf-8')).hexdigest()
+    material = json.dumps([model, template_digest, source])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class Uncached:
+    """A generate() result to hand back for this request only, such as a truncated quiz."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class MemoryBackend:
+    """In-process LRU, bounded by entry count. Survives only for the warm container."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, clock=time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires_at'] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry['variants']
+
+    def put(self, key, variants, ttl_seconds):
+        with self._lock:
+            self._entries[key] = {'variants': variants, 'expires_at': self._clock() + ttl_seconds}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class FileBackend:
+    """One JSON file per key under a directory, evicting least recently used files past max_bytes."""
+
+    name = 'file'
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, clock=time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['expires_at'] <= self._clock():
+            self._remove(path)
+            return None
+        os.utime(path)
+        return entry['variants']
+
+    def put(self, key, variants, ttl_seconds):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'variants': variants, 'expires_at': self._clock() + ttl_seconds}, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            files = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class DynamoDBBackend:
+    """Shared across containers; expiry is enforced by the table's TTL on expires_at."""
+
+    name = 'dynamodb'
+
+    def __init__(self, table, clock=time.time):
+        self.table = table
+        self._clock = clock
+
+    def get(self, key):
+        item = self.table.get_item(Key={'cache_key': key}).get('Item')
+        if not item or int(item['expires_at']) <= self._clock():
+            return None
+        return json.loads(item['variants'])
+
+    def put(self, key, variants, ttl_seconds):
+        self.table.put_item(Item={
+            'cache_key': key,
+            'variants': json.dumps(variants),
+            'expires_at': int(self._clock() + ttl_seconds),
+        })
+
+
+class QuizCache:
+    """Caches generated quizzes by content address, keeping up to ``variants`` per key.
+
+    A key with fewer than ``variants`` stored quizzes is treated as a miss so
+    regenerating a popular topic still produces fresh quizzes until the pool
+    is full; after that a stored variant is picked at random.
+    """
+
+    def __init__(self, backend, variants=CACHE_VARIANTS, ttl_seconds=CACHE_TTL_SECONDS, rng=None):
+        self.backend = backend
+        self.variants = max(1, variants)
+        self.ttl_seconds = ttl_seconds
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.generation_seconds = 0.0
+        self._emitted = (0, 0, 0.0)
+
+    def get_or_generate(self, key, generate):
+        """Return a cached quiz for key, or call generate() and store its result.
+
+        ``generate`` may return None to signal an unusable result, which is
+        passed through without being cached, or wrap a usable but incomplete
+        result in Uncached, which is returned unwrapped and not cached either.
+        """
+        try:
+            cached = self.backend.get(key) or []
+        except Exception as e:
+            logger.warning(f"Quiz cache read failed: {str(e)}")
+            cached = []
+            with self._lock:
+                self.errors += 1
+
+        if len(cached) >= self.variants:
+            with self._lock:
+                self.hits += 1
+            return self._rng.choice(cached)
+
+        start = time.perf_counter()
+        quiz = generate()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.misses += 1
+            self.generation_seconds += elapsed
+        if quiz is None:
+            return None
+        if isinstance(quiz, Uncached):
+            return quiz.value
+        try:
+            self.backend.put(key, (cached + [quiz])[-self.variants:], self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Quiz cache write failed: {str(e)}")
+            with self._lock:
+                self.errors += 1
+        return quiz
+
+    def stats(self):
+        """Lifetime counters for this container, with the generation time hits avoided."""
+        with self._lock:
+            mean_generation = self.generation_seconds / self.misses if self.misses else 0.0
+            return {
+                'backend': self.backend.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                'mean_generation_seconds': mean_generation,
+                'estimated_seconds_saved': self.hits * mean_generation,
+            }
+
+    def emit_metrics(self):
+        """Log hits/misses since the last call in CloudWatch Embedded Metric Format."""
+        with self._lock:
+            hits, misses, seconds = self.hits, self.misses, self.generation_seconds
+            last_hits, last_misses, last_seconds = self._emitted
+            self._emitted = (hits, misses, seconds)
+        delta_hits, delta_misses = hits - last_hits, misses - last_misses
+        if not delta_hits and not delta_misses:
+            return
+        mean_generation = seconds / misses if misses else 0.0
+        print(json.dumps({
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': 'QuizCraft',
+                    'Dimensions': [['CacheBackend']],
+                    'Metrics': [
+                        {'Name': 'QuizCacheHits', 'Unit': 'Count'},
+                        {'Name': 'QuizCacheMisses', 'Unit': 'Count'},
+                        {'Name': 'QuizCacheSecondsSaved', 'Unit': 'Seconds'},
+                    ],
+                }],
+            },
+            'CacheBackend': self.backend.name,
+            'QuizCacheHits': delta_hits,
+            'QuizCacheMisses': delta_misses,
+            'QuizCacheSecondsSaved': round(delta_hits * mean_generation, 3),
+        }))
+
+
+class NullBackend:
+    """Disables caching while keeping the counters."""
+
+    name = 'none'
+
+    def get(self, key):
+        return None
+
+    def put(self, key, variants, ttl_seconds):
+        pass
+
+
+_default_cache = None
+
+
+def default_cache():
+    """The process-wide cache configured from QUIZ_CACHE_* environment variables."""
+    global _default_cache
+    if _default_cache is None:
+        if CACHE_BACKEND == 'dynamodb':
+            if not CACHE_TABLE:
+                raise ValueError("QUIZ_CACHE_TABLE must be set for the dynamodb quiz cache")
+            from quizcraft import runtime
+            backend = DynamoDBBackend(runtime.table(CACHE_TABLE))
+        elif CACHE_BACKEND == 'file':
+            backend = FileBackend()
+        elif CACHE_BACKEND == 'none':
+            backend = NullBackend()
+        else:
+            backend = MemoryBackend()
+        _default_cache = QuizCache(backend)
+    return _default_cache
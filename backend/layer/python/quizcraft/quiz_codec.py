@@ -0,0 +1,72 @@
+import json
+import zlib
+from decimal import Decimal
+
+# quiz_content is stored as a Binary attribute: one version byte followed by
+# the payload. Anything that is not Binary is one of the legacy shapes below.
+#
+#   version 1: zlib-compressed compact JSON list of questions
+#
+# Legacy shapes still present in the Quizzes table:
+#   - a native DynamoDB list of maps
+#   - a JSON string of that list
+#   - either of the above wrapped as {'quiz': [...]}
+FORMAT_ZLIB_JSON = 1
+CURRENT_FORMAT = FORMAT_ZLIB_JSON
+ZLIB_LEVEL = 6
+
+
+class QuizContentError(ValueError):
+    """Raised when a stored quiz_content value cannot be decoded."""
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode(questions):
+    """Encode a list of questions as a versioned, compressed blob for a Binary attribute."""
+    if not isinstance(questions, list):
+        raise QuizContentError("Quiz content must be a list of questions")
+    payload = json.dumps(questions, default=_default, separators=(',', ':'), ensure_ascii=False)
+    return bytes([CURRENT_FORMAT]) + zlib.compress(payload.encode('utf-8'), ZLIB_LEVEL)
+
+
+def decode(stored):
+    """Return the list of questions for any stored form of quiz_content."""
+    # boto3's resource layer wraps Binary attributes in boto3.dynamodb.types.Binary
+    stored = getattr(stored, 'value', stored)
+    if isinstance(stored, (bytes, bytearray, memoryview)):
+        questions = _decode_blob(bytes(stored))
+    elif isinstance(stored, str):
+        try:
+            questions = json.loads(stored)
+        except ValueError:
+            raise QuizContentError("Quiz content is not valid JSON")
+    else:
+        questions = stored
+    if isinstance(questions, dict) and 'quiz' in questions:
+        questions = questions['quiz']
+    if not isinstance(questions, list):
+        raise QuizContentError("Quiz content is not a list of questions")
+    return questions
+
+
+def _decode_blob(blob):
+    if not blob:
+        raise QuizContentError("Quiz content is empty")
+    version = blob[0]
+    if version == FORMAT_ZLIB_JSON:
+        try:
+            return json.loads(zlib.decompress(blob[1:]).decode('utf-8'))
+        except (zlib.error, ValueError):
+            raise QuizContentError("Quiz content blob is corrupt")
+    raise QuizContentError(f"Unknown quiz content format version {version}")
+
+
+def is_current(stored):
+    """True if quiz_content is already stored in CURRENT_FORMAT."""
+    stored = getattr(stored, 'value', stored)
+    return isinstance(stored, (bytes, bytearray)) and len(stored) > 0 and stored[0] == CURRENT_FORMAT
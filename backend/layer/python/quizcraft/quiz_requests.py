@@ -0,0 +1,97 @@
+import os
+import json
+import logging
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger()
+
+# Shown until the generator names the topic from the PDF
+PLACEHOLDER_NAME = 'Untitled PDF'
+
+# Presigned uploads land at uploads/<user_id>/<quiz_id>.pdf; the ObjectCreated
+# handler trusts the key because the signed policy fixes it
+UPLOAD_PREFIX = 'uploads/'
+UPLOAD_CONTENT_TYPE = 'application/pdf'
+FILENAME_METADATA = 'filename'
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(50 * 1024 * 1024)))
+UPLOAD_URL_TTL_SECONDS = int(os.environ.get('UPLOAD_URL_TTL_SECONDS', '900'))
+
+
+def placeholder_name(filename):
+    """Name a new PDF topic after its file until the generator names it."""
+    stem = os.path.splitext(os.path.basename(filename or ''))[0].strip()
+    return stem[:80] or PLACEHOLDER_NAME
+
+
+def find_topic(topics_table, user_id, source_identifier):
+    """The user's topic with this source identifier (pdf_<sha256> or topic_<name>), or None."""
+    response = topics_table.query(
+        IndexName='UniqueSourceIndex',
+        KeyConditionExpression='user_id = :uid AND source_identifier = :sid',
+        ExpressionAttributeValues={':uid': user_id, ':sid': source_identifier}
+    )
+    items = response.get('Items')
+    return items[0] if items else None
+
+
+def upload_key(user_id, quiz_id):
+    return f"{UPLOAD_PREFIX}{user_id}/{quiz_id}.pdf"
+
+
+def parse_upload_key(key):
+    """(user_id, quiz_id) from an upload key, or None for any other key."""
+    if not key.startswith(UPLOAD_PREFIX) or not key.endswith('.pdf'):
+        return None
+    parts = key[len(UPLOAD_PREFIX):-len('.pdf')].split('/')
+    if len(parts) != 2 or not all(parts):
+        return None
+    return parts[0], parts[1]
+
+
+def presigned_upload(s3, bucket, user_id, quiz_id, filename, max_bytes=MAX_UPLOAD_BYTES):
+    """Presigned POST for one PDF: fixed key and content type, bounded size.
+
+    The filename travels as object metadata, percent-encoded since S3
+    metadata is ASCII only.
+    """
+    fields = {
+        'Content-Type': UPLOAD_CONTENT_TYPE,
+        f'x-amz-meta-{FILENAME_METADATA}': quote(filename or '', safe=''),
+    }
+    conditions = [{name: value} for name, value in fields.items()]
+    conditions.append(['content-length-range', 1, max_bytes])
+    return s3.generate_presigned_post(
+        Bucket=bucket,
+        Key=upload_key(user_id, quiz_id),
+        Fields=fields,
+        Conditions=conditions,
+        ExpiresIn=UPLOAD_URL_TTL_SECONDS
+    )
+
+
+def upload_filename(metadata):
+    return unquote(metadata.get(FILENAME_METADATA, ''))
+
+
+def send_generation_message(sqs, queue_url, quiz_id, user_id, topic_id, source, s3_key, topic_name,
+                            text_key=None, name_topic=False):
+    """Send message to SQS for quiz generation."""
+    try:
+        message_body = {
+            'quiz_id': quiz_id,
+            'user_id': user_id,
+            'topic_id': topic_id,
+            'source': source,
+            'topic_name': topic_name
+        }
+        if s3_key:
+            message_body['s3_key'] = s3_key
+        if text_key:
+            message_body['text_key'] = text_key
+        if name_topic:
+            message_body['name_topic'] = True
+        sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(message_body))
+        logger.info(f"SQS message sent for quiz_id: {quiz_id}")
+    except Exception as e:
+        logger.error(f"Failed to send SQS message: {str(e)}", exc_info=True)
+        raise
@@ -0,0 +1,92 @@
+import os
+import json
+import zlib
+import random
+import logging
+
+# Base level for every invocation; LOG_DEBUG_SAMPLE_RATE of them log at DEBUG
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0'))
+# Characters of a request or message body kept in the logged event
+MAX_BODY_CHARS = int(os.environ.get('LOG_MAX_BODY_CHARS', '512'))
+
+REDACTED = '[redacted]'
+SENSITIVE_HEADERS = frozenset({'authorization', 'cookie', 'x-amz-security-token', 'x-api-key'})
+# Authorizer claims kept in logs; the others (email, phone, ...) are personal data
+LOGGED_CLAIMS = ('sub',)
+
+
+def begin(logger, context):
+    """Set the log level for this invocation, sampling DEBUG per request id."""
+    level = LOG_LEVEL
+    if DEBUG_SAMPLE_RATE > 0 and _sampled(getattr(context, 'aws_request_id', None), DEBUG_SAMPLE_RATE):
+        level = 'DEBUG'
+    logger.setLevel(level)
+
+
+def _sampled(request_id, rate):
+    # Hashing the request id keeps the decision stable for the whole invocation
+    # and lets a sampled request be found again from its id
+    if request_id:
+        return zlib.crc32(request_id.encode('utf-8')) < rate * 2 ** 32
+    return random.random() < rate
+
+
+def log_event(logger, event, message="Event: %s", level=logging.INFO):
+    """Log a redacted, truncated copy of a Lambda event, built only if the level is enabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, EventSummary(event))
+
+
+class EventSummary:
+    """Formats the event summary as JSON when a handler emits the record, not before."""
+
+    __slots__ = ('event',)
+
+    def __init__(self, event):
+        self.event = event
+
+    def __str__(self):
+        return json.dumps(summarize(self.event), default=str, separators=(',', ':'))
+
+
+def summarize(event):
+    """Copy of an API Gateway or SQS event with secrets redacted and bodies truncated.
+
+    Only the changed parts are copied; a body is sliced, never decoded, so
+    the cost does not grow with the size of an upload.
+    """
+    if not isinstance(event, dict):
+        return event
+    summary = {}
+    for key, value in event.items():
+        if key in ('headers', 'multiValueHeaders') and isinstance(value, dict):
+            value = {name: REDACTED if name.lower() in SENSITIVE_HEADERS else v for name, v in value.items()}
+        elif key == 'body':
+            value = truncate(value, event.get('isBase64Encoded', False))
+        elif key == 'requestContext' and isinstance(value, dict):
+            value = _redact_claims(value)
+        elif key == 'Records' and isinstance(value, list):
+            value = [summarize(record) for record in value]
+        summary[key] = value
+    return summary
+
+
+def truncate(body, is_base64=False, max_chars=MAX_BODY_CHARS):
+    """A body as logged: base64 payloads by size only, text cut to max_chars."""
+    if not isinstance(body, str):
+        return body
+    if is_base64:
+        return f"<{len(body)} base64 chars>"
+    if len(body) <= max_chars:
+        return body
+    return f"{body[:max_chars]}...<{len(body) - max_chars} more chars>"
+
+
+def _redact_claims(request_context):
+    authorizer = request_context.get('authorizer')
+    claims = authorizer.get('claims') if isinstance(authorizer, dict) else None
+    if not isinstance(claims, dict):
+        return request_context
+    kept = {name: claims[name] for name in LOGGED_CLAIMS if name in claims}
+    return dict(request_context, authorizer=dict(authorizer, claims=kept))
@@ -0,0 +1,58 @@
+import json
+import base64
+from decimal import Decimal
+from boto3.dynamodb.types import Binary
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder gives identical output
+    orjson = None
+
+ALLOWED_HEADERS = 'Content-Type,Authorization,Idempotency-Key'
+
+
+def _default(obj):
+    """Encode the non-JSON types boto3 returns for DynamoDB items."""
+    if isinstance(obj, Decimal):
+        # Keep fractional values instead of truncating them to int
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj) if all(isinstance(v, str) for v in obj) else list(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode('utf-8', errors='replace')
+    if isinstance(obj, Binary):
+        # DynamoDB B attributes: arbitrary bytes, so base64 as in DynamoDB JSON
+        return base64.b64encode(obj.value).decode('ascii')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Serialize a DynamoDB item (or anything containing one) to a JSON string in one pass."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default).decode('utf-8')
+    return json.dumps(obj, default=_default, separators=(',', ':'))
+
+
+def cors_headers(methods):
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': methods,
+        'Access-Control-Allow-Headers': ALLOWED_HEADERS
+    }
+
+
+def json_response(status_code, body, methods):
+    """API Gateway proxy response with a JSON body and the CORS headers for this route."""
+    return {
+        'statusCode': status_code,
+        'body': dumps(body),
+        'headers': cors_headers(methods)
+    }
+
+
+def error_response(status_code, message, methods, additional_data=None):
+    """JSON {'error': message} response, merged with any additional fields."""
+    body = {'error': message}
+    if additional_data:
+        body.update(additional_data)
+    return json_response(status_code, body, methods)
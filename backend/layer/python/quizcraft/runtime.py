@@ -0,0 +1,132 @@
+import os
+import time
+import logging
+import threading
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger()
+
+# Clients live at module scope so warm invocations reuse them together with
+# their pooled, keep-alive HTTPS connections.
+CLIENT_CONFIG = Config(
+    max_pool_connections=int(os.environ.get('BOTO_MAX_POOL_CONNECTIONS', '25')),
+    connect_timeout=float(os.environ.get('BOTO_CONNECT_TIMEOUT', '2')),
+    read_timeout=float(os.environ.get('BOTO_READ_TIMEOUT', '10')),
+    retries={'max_attempts': 3, 'mode': 'standard'},
+    tcp_keepalive=True,
+)
+
+SECRET_TTL_SECONDS = float(os.environ.get('SECRET_TTL_SECONDS', '300'))
+
+_clients = {}
+_resources = {}
+_tables = {}
+_lock = threading.Lock()
+
+
+def client(service_name):
+    """Return the shared boto3 client for a service, creating it on first use."""
+    cached = _clients.get(service_name)
+    if cached is None:
+        with _lock:
+            cached = _clients.get(service_name)
+            if cached is None:
+                cached = boto3.client(service_name, config=CLIENT_CONFIG)
+                _clients[service_name] = cached
+    return cached
+
+
+def resource(service_name):
+    """Return the shared boto3 resource for a service, creating it on first use."""
+    cached = _resources.get(service_name)
+    if cached is None:
+        with _lock:
+            cached = _resources.get(service_name)
+            if cached is None:
+                cached = boto3.resource(service_name, config=CLIENT_CONFIG)
+                _resources[service_name] = cached
+    return cached
+
+
+def table(table_name):
+    """Return a cached DynamoDB Table handle."""
+    cached = _tables.get(table_name)
+    if cached is None:
+        cached = resource('dynamodb').Table(table_name)
+        _tables[table_name] = cached
+    return cached
+
+
+class SecretCache:
+    """TTL cache for Secrets Manager values.
+
+    Entries are refetched once they are older than ``ttl_seconds`` so a rotated
+    secret is picked up without a cold start. If the refresh fails while a
+    previous value is cached, the stale value is served and the refresh is
+    retried on the next call.
+    """
+
+    def __init__(self, ttl_seconds=SECRET_TTL_SECONDS, secrets_client=None, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._secrets_client = secrets_client
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, secret_id):
+        secrets_client = self._secrets_client or client('secretsmanager')
+        response = secrets_client.get_secret_value(SecretId=secret_id)
+        return response['SecretString'], response.get('VersionId')
+
+    def get(self, secret_id):
+        """Return the secret string, fetching it if missing or expired."""
+        entry = self._entries.get(secret_id)
+        now = self._clock()
+        if entry and now < entry['expires_at']:
+            return entry['value']
+        with self._lock:
+            entry = self._entries.get(secret_id)
+            if entry and now < entry['expires_at']:
+                return entry['value']
+            try:
+                value, version_id = self._fetch(secret_id)
+            except Exception as e:
+                if entry:
+                    logger.warning(f"Secret refresh failed, serving cached value: {str(e)}")
+                    return entry['value']
+                raise
+            if entry and entry['version_id'] != version_id:
+                logger.info("Secret rotation detected, cached value refreshed")
+            self._entries[secret_id] = {
+                'value': value,
+                'version_id': version_id,
+                'expires_at': now + self.ttl_seconds,
+            }
+            return value
+
+    def invalidate(self, secret_id=None):
+        """Drop one cached secret, or all of them, forcing a refetch."""
+        with self._lock:
+            if secret_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(secret_id, None)
+
+
+secrets = SecretCache()
+
+
+def get_openai_api_key():
+    """Return the OpenAI API key referenced by the OPENAI_API_KEY secret ARN."""
+    secret_arn = os.environ.get('OPENAI_API_KEY')
+    if not secret_arn:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+    return secrets.get(secret_arn)
+
+
+def invalidate_openai_api_key():
+    """Forget the cached OpenAI key, e.g. after the API rejects it as rotated."""
+    secret_arn = os.environ.get('OPENAI_API_KEY')
+    if secret_arn:
+        secrets.invalidate(secret_arn)
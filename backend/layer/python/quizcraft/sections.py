@@ -0,0 +1,148 @@
+import re
+import math
+import random
+import hashlib
+import logging
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; without it tokens are estimated from characters
+    tiktoken = None
+
+logger = logging.getLogger()
+
+# Rough characters per token for English prose, used when tiktoken is absent
+CHARS_PER_TOKEN = 4
+# Each section is asked for this many times its share of the final questions,
+# so duplicates and weak questions can be dropped before sampling
+OVERSAMPLE = 2
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_encoding = None
+
+
+def count_tokens(text):
+    """Tokens in text for the chat models (cl100k_base), or an estimate without tiktoken."""
+    global _encoding
+    if tiktoken is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding('cl100k_base')
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def split(text, max_tokens):
+    """Split text into sections of at most max_tokens, breaking at paragraphs, then sentences, then words."""
+    sections = []
+    current, current_tokens = [], 0
+    for piece, tokens in _pieces(text, max_tokens):
+        if current and current_tokens + tokens > max_tokens:
+            sections.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        sections.append('\n\n'.join(current))
+    return sections
+
+
+def _pieces(text, max_tokens):
+    """Paragraphs of text with their token counts, pre-split where one exceeds max_tokens."""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = ' '.join(paragraph.split())
+        if not paragraph:
+            continue
+        tokens = count_tokens(paragraph)
+        if tokens <= max_tokens:
+            yield paragraph, tokens
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            tokens = count_tokens(sentence)
+            if tokens <= max_tokens:
+                yield sentence, tokens
+                continue
+            words = sentence.split(' ')
+            step = max(1, len(words) * max_tokens // tokens)
+            for i in range(0, len(words), step):
+                chunk = ' '.join(words[i:i + step])
+                yield chunk, count_tokens(chunk)
+
+
+def select(sections, limit):
+    """At most limit sections, spread evenly over the document and kept in order."""
+    if len(sections) <= limit:
+        return list(sections)
+    return [sections[i * len(sections) // limit] for i in range(limit)]
+
+
+def questions_per_section(section_count, question_count):
+    """How many questions to ask each section for, oversampled for dedupe and sampling."""
+    return max(1, math.ceil(question_count * OVERSAMPLE / section_count))
+
+
+def seed_for(text):
+    """A stable seed derived from the document, so the same PDF samples the same questions."""
+    return int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+
+
+def _question_key(question):
+    return ' '.join(re.sub(r'[^\w\s]', ' ', str(question.get('question', '')).casefold()).split())
+
+
+def merge(section_results, question_count, seed):
+    """Deduplicate per-section question lists and sample question_count of them.
+
+    Sampling takes one question from each section in turn (each section's
+    list shuffled with ``seed``) so the quiz covers the whole document, then
+    returns them in document order.
+    """
+    rng = random.Random(seed)
+    seen = set()
+    pools = []
+    for index, questions in enumerate(section_results):
+        pool = []
+        for position, question in enumerate(questions or []):
+            key = _question_key(question)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            pool.append((index, position, question))
+        rng.shuffle(pool)
+        pools.append(pool)
+
+    picked = []
+    while len(picked) < question_count and any(pools):
+        order = [p for p in pools if p]
+        rng.shuffle(order)
+        for pool in order:
+            if len(picked) == question_count:
+                break
+            picked.append(pool.pop())
+    picked.sort(key=lambda entry: entry[:2])
+    return [question for _, _, question in picked]
+
+
+def generate(sections, generate_section, question_count, seed, executor):
+    """Map generate_section(section, count) over sections on executor, then merge the results.
+
+    Returns (questions, failed), failed being how many sections raised or
+    came back with no questions. Those are logged and left out; if every
+    section fails the first error is raised, or questions is None when all
+    sections came back unusable.
+    """
+    count = questions_per_section(len(sections), question_count)
+    futures = [executor.submit(generate_section, section, count) for section in sections]
+    results, errors = [], []
+    for index, future in enumerate(futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.warning("Section %d of %d failed: %s", index + 1, len(sections), str(e))
+            errors.append(e)
+            results.append(None)
+    if not any(results):
+        if errors:
+            raise errors[0]
+        return None, len(results)
+    return merge(results, question_count, seed), sum(1 for result in results if not result)
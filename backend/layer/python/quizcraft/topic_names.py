@@ -0,0 +1,72 @@
+import re
+import logging
+
+logger = logging.getLogger()
+
+# One TopicNames item per user and normalised name, keyed (user_id, name_key):
+#   allocated   how many topics have asked for this name (ADD)
+# A name is taken once its item exists. Generated names take the next suffix
+# of their base name and then claim the suffixed name itself, so they never
+# land on a name a user typed in.
+SUFFIXED = re.compile(r'^(.*\S) \((\d+)\)$')
+# Claims tried before giving up on a suffix sequence someone keeps colliding with
+MAX_CLAIMS = 10
+
+
+def name_key(name):
+    """Case- and whitespace-insensitive form names are compared in."""
+    return ' '.join(name.split()).lower()
+
+
+def suffixed(name, n):
+    return name if n == 1 else f"{name} ({n})"
+
+
+def register(table, user_id, name):
+    """Record a name the user chose; returns how many topics have now asked for it."""
+    response = table.update_item(
+        Key={'user_id': user_id, 'name_key': name_key(name)},
+        UpdateExpression="ADD allocated :one",
+        ExpressionAttributeValues={':one': 1},
+        ReturnValues="UPDATED_NEW"
+    )
+    return int(response['Attributes']['allocated'])
+
+
+def reserve(table, user_id, name):
+    """Reserve a unique name for a generated topic: ``name``, else ``name (n)``.
+
+    Each attempt is one atomic counter update plus, for a suffixed name, one
+    conditional put, whatever the number of existing topics.
+    """
+    for _ in range(MAX_CLAIMS):
+        n = register(table, user_id, name)
+        if n == 1:
+            return name
+        candidate = suffixed(name, n)
+        try:
+            table.put_item(
+                Item={'user_id': user_id, 'name_key': name_key(candidate), 'allocated': 1},
+                ConditionExpression="attribute_not_exists(name_key)"
+            )
+            return candidate
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            logger.info("Topic name %s already taken, trying the next suffix", candidate)
+    raise RuntimeError(f"Could not reserve a unique topic name for {name!r}")
+
+
+def allocations(names):
+    """Counter values that make reserve() skip every existing name.
+
+    A key's counter is the number of topics with that name, or the highest
+    suffix used on it as a base name if that is larger.
+    """
+    counts, suffixes = {}, {}
+    for name in names:
+        key = name_key(name)
+        counts[key] = counts.get(key, 0) + 1
+        match = SUFFIXED.match(' '.join(name.split()))
+        if match:
+            base = name_key(match.group(1))
+            suffixes[base] = max(suffixes.get(base, 0), int(match.group(2)))
+    return {key: max(counts.get(key, 0), suffixes.get(key, 0)) for key in set(counts) | set(suffixes)}
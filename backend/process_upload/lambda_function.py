@@ -0,0 +1,117 @@
+import os
+import uuid
+import hashlib
+import logging
+from datetime import datetime
+from urllib.parse import unquote_plus
+from quizcraft import runtime, pdf_text, quiz_requests, request_log
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# An upload's topic_id is derived from its quiz_id, so a redelivered event
+# rewrites the same topic instead of adding a second one
+TOPIC_NAMESPACE = uuid.UUID('0f3c8a2e-6b1d-4c97-8e25-93a4d7b1f6c0')
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def lambda_handler(event, context):
+    """Turn PDFs uploaded with a presigned POST into topic and quiz records and queue their generation.
+
+    Invoked by S3 ObjectCreated notifications for uploads/. Errors are
+    raised so the asynchronous invocation is retried.
+    """
+    request_log.begin(logger, context)
+    request_log.log_event(logger, event)
+    for record in event.get('Records', []):
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+        process_upload(bucket, key)
+
+def process_upload(bucket, key):
+    parsed = quiz_requests.parse_upload_key(key)
+    if not parsed:
+        logger.warning(f"Ignoring object outside the upload layout: {key}")
+        return
+    user_id, quiz_id = parsed
+    quizzes_table = runtime.table(os.environ['QUIZZES_TABLE'])
+    topics_table = runtime.table(os.environ['TOPICS_TABLE'])
+    sqs_queue_url = os.environ['SQS_QUEUE_URL']
+    s3 = runtime.client('s3')
+
+    quiz = quizzes_table.get_item(Key={'quiz_id': quiz_id}).get('Item')
+    if quiz and quiz.get('created_at'):
+        # A redelivered notification. The quiz was recorded but queueing may
+        # have failed; the generator drops a message for a quiz already claimed
+        if quiz.get('status') == 'pending':
+            topic = topics_table.get_item(Key={'user_id': user_id, 'topic_id': quiz['topic_id']}).get('Item') or {}
+            queue(sqs_queue_url, quiz, topic)
+        logger.info(f"Upload for quiz_id {quiz_id} already recorded")
+        return
+
+    # Hash the stored object rather than trusting the browser's hash
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    hasher = hashlib.sha256()
+    for chunk in obj['Body'].iter_chunks(HASH_CHUNK_BYTES):
+        hasher.update(chunk)
+    pdf_hash = hasher.hexdigest()
+    topic_id = str(uuid.uuid5(TOPIC_NAMESPACE, quiz_id))
+
+    created_at = datetime.utcnow().isoformat() + 'Z'
+    existing = quiz_requests.find_topic(topics_table, user_id, f"pdf_{pdf_hash}")
+    if existing and existing['topic_id'] != topic_id:
+        logger.info(f"Upload for quiz_id {quiz_id} repeats topic {existing['topic_id']}, deleting it")
+        reject_duplicate(quizzes_table, quiz_id, user_id, existing, created_at)
+        s3.delete_object(Bucket=bucket, Key=key)
+        return
+
+    topic = {
+        'user_id': user_id,
+        'topic_id': topic_id,
+        'name': quiz_requests.placeholder_name(quiz_requests.upload_filename(obj.get('Metadata') or {})),
+        'name_pending': True,
+        'source': 'pdf',
+        'pdf_hash': pdf_hash,
+        's3_key': key,
+        'source_identifier': f"pdf_{pdf_hash}",
+        'created_at': created_at
+    }
+    topics_table.put_item(Item=topic)
+    quiz = {
+        'quiz_id': quiz_id,
+        'user_id': user_id,
+        'topic_id': topic_id,
+        'topic_name': topic['name'],
+        'status': 'pending',
+        's3_key': key,
+        'attempt_count': 0,
+        'created_at': created_at
+    }
+    try:
+        quizzes_table.put_item(Item=quiz, ConditionExpression='attribute_not_exists(created_at)')
+    except quizzes_table.meta.client.exceptions.ConditionalCheckFailedException:
+        logger.info(f"Upload for quiz_id {quiz_id} recorded by a concurrent delivery")
+        return
+    queue(sqs_queue_url, quiz, topic)
+
+def reject_duplicate(quizzes_table, quiz_id, user_id, existing, created_at):
+    """Record the quiz as failed, as generate_quiz refuses a repeated PDF, so the polling client sees why."""
+    try:
+        quizzes_table.put_item(Item={
+            'quiz_id': quiz_id,
+            'user_id': user_id,
+            'topic_id': existing['topic_id'],
+            'topic_name': existing.get('name'),
+            'status': 'failed',
+            'error_message': "This PDF has already been used",
+            'attempt_count': 0,
+            'created_at': created_at
+        }, ConditionExpression='attribute_not_exists(created_at)')
+    except quizzes_table.meta.client.exceptions.ConditionalCheckFailedException:
+        logger.info(f"Upload for quiz_id {quiz_id} recorded by a concurrent delivery")
+
+def queue(sqs_queue_url, quiz, topic):
+    text_key = pdf_text.sidecar_key(topic['pdf_hash']) if topic.get('pdf_hash') else None
+    quiz_requests.send_generation_message(
+        runtime.client('sqs'), sqs_queue_url, quiz['quiz_id'], quiz['user_id'], quiz['topic_id'], 'pdf',
+        quiz['s3_key'], quiz['topic_name'], text_key, name_topic=bool(topic.get('name_pending'))
+    )
@@ -1,68 +1,77 @@
-import json
-import boto3
 import os
 import logging
-from decimal import Decimal
+from quizcraft import runtime, responses, dynamo, listing, attempt_stats
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = runtime.resource('dynamodb')
 
-def convert_decimals(obj):
-    if isinstance(obj, list):
-        return [convert_decimals(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        return int(obj) 
-    else:
-        return obj
+ALLOWED_METHODS = 'GET,OPTIONS'
 
 def lambda_handler(event, context):
+    """GET /profile: one page each of the caller's quiz summaries and attempts, newest first, and their stats.
+
+    ?limit= sets the page size of both lists. ?cursor= continues the quiz
+    list from next_cursor and ?attempts_cursor= the attempts from
+    next_attempts_cursor; each is None on its last page.
+    """
     try:
         user_id = event['requestContext']['authorizer']['claims']['sub']
         quizzes_table = dynamodb.Table(os.environ['QUIZZES_TABLE'])
         attempts_table = dynamodb.Table(os.environ['ATTEMPTS_TABLE'])
+        stats_table = dynamodb.Table(os.environ['STATS_TABLE'])
+
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            limit = listing.page_size(query_params)
+            quiz_cursor = own_cursor(query_params.get('cursor'), user_id)
+            attempts_cursor = own_cursor(query_params.get('attempts_cursor'), user_id)
+        except ValueError as e:
+            return responses.error_response(400, str(e), ALLOWED_METHODS)
 
-        # Fetch quizzes
-        quiz_response = quizzes_table.query(
+        # Quiz summaries (quiz bodies are served by /quiz/{quiz_id})
+        projection, names = listing.summary_projection()
+        quizzes, next_cursor = dynamo.query_page(
+            quizzes_table,
+            limit,
+            quiz_cursor,
             IndexName='UserIdIndex',
             KeyConditionExpression='user_id = :uid',
-            ExpressionAttributeValues={':uid': user_id}
+            ExpressionAttributeValues={':uid': user_id},
+            ProjectionExpression=projection,
+            ExpressionAttributeNames=names,
+            ScanIndexForward=False
         )
-        quizzes = quiz_response.get('Items', [])
 
-        # Fetch attempts
-        attempt_response = attempts_table.scan(
-            FilterExpression='user_id = :uid',
-            ExpressionAttributeValues={':uid': user_id}
+        # Attempts through the per-user index
+        attempts, next_attempts_cursor = dynamo.query_page(
+            attempts_table,
+            limit,
+            attempts_cursor,
+            IndexName='UserCreatedAtIndex',
+            KeyConditionExpression='user_id = :uid',
+            ExpressionAttributeValues={':uid': user_id},
+            ScanIndexForward=False
         )
-        attempts = attempt_response.get('Items', [])
 
-        quizzes = convert_decimals(quizzes)
-        attempts = convert_decimals(attempts)
+        # Aggregates are maintained by attempt_aggregator; one item per user
+        stats = stats_table.get_item(Key={'stats_key': attempt_stats.user_key(user_id)}).get('Item')
 
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'quizzes': quizzes,
-                'attempts': attempts
-            }),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
+        return responses.json_response(200, {
+            'quizzes': quizzes,
+            'next_cursor': next_cursor,
+            'attempts': attempts,
+            'next_attempts_cursor': next_attempts_cursor,
+            'stats': attempt_stats.summary(stats)
+        }, ALLOWED_METHODS)
     except Exception as e:
         logger.error(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': str(e)}),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
\ No newline at end of file
+        return responses.error_response(500, str(e), ALLOWED_METHODS)
+
+def own_cursor(cursor, user_id):
+    """The cursor if it continues this user's listing; a cursor from another user's is refused."""
+    start_key = dynamo.decode_cursor(cursor)
+    if start_key and start_key.get('user_id') != user_id:
+        raise dynamo.InvalidCursor("Invalid pagination cursor")
+    return cursor
@@ -1,130 +1,267 @@
 import json
-import boto3
 import os
+import time
+import uuid
 import logging
-import openai
-import PyPDF2
 import io
-import re
+from concurrent.futures import ThreadPoolExecutor
+from quizcraft import runtime, pdf_text, quiz_cache, quiz_codec, answer_key, sections, question_stream, topic_names, llm, request_log
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-sqs = boto3.client('sqs')
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
-secrets_client = boto3.client('secretsmanager')
-sns = boto3.client('sns')
+s3 = runtime.client('s3')
+sns = runtime.client('sns')
+
+# Records in a batch are generated concurrently; the OpenAI calls are I/O bound
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get('GENERATION_CONCURRENCY', '10')))
+# Sections of one long PDF are generated on their own pool so they never wait behind records
+section_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('SECTION_CONCURRENCY', '8')))
+
+# Generated quizzes keyed by model, prompt template and normalized input
+cache = quiz_cache.default_cache()
+
+# Pooled OpenAI session (or the offline stub with LLM_BACKEND=stub)
+llm_client = llm.default_client()
+
+# A generating quiz whose claim is older than this is taken over by a
+# redelivered message. It must lie between the function timeout and the
+# queue's visibility timeout, or a redelivery arrives while the lease holds
+GENERATION_LEASE_SECONDS = int(os.environ.get('GENERATION_LEASE_SECONDS', '90'))
 
 def lambda_handler(event, context):
     try:
-        logger.info("Event received: %s", json.dumps(event))
+        request_log.begin(logger, context)
+        request_log.log_event(logger, event, "Event received: %s")
 
-        secret_arn = os.environ.get('OPENAI_API_KEY')
-        logger.info("Retrieving secret from ARN: %s", secret_arn)
-        secret_value = secrets_client.get_secret_value(SecretId=secret_arn)
-        openai.api_key = secret_value['SecretString']
-        logger.info("OpenAI API key retrieved successfully")
+        # LLM calls stop early enough to record the outcome before the function times out
+        deadline = llm.deadline_from_context(context)
 
         sns_topic_arn = os.environ.get('SNS_TOPIC_ARN')
         if not sns_topic_arn:
             logger.warning("SNS_TOPIC_ARN not set, notifications will be skipped")
 
-        for record in event['Records']:
+        records = event['Records']
+        futures = [(record, executor.submit(process_record, record, sns_topic_arn, deadline)) for record in records]
+
+        # Report only the failed messages so SQS retries those and deletes the rest
+        batch_item_failures = []
+        for record, future in futures:
             try:
-                message = json.loads(record['body'])
-                quiz_id = message['quiz_id']
-                user_id = message['user_id']
-                topic_name = message.get('topic_name')
-                s3_key = message.get('s3_key')
-                source = message.get('source')
-                logger.info("Processing quiz %s for user %s", quiz_id, user_id)
-
-                s3_bucket = os.environ.get('S3_BUCKET')
-                quizzes_table_name = os.environ.get('QUIZZES_TABLE')
-                sqs_queue_url = os.environ.get('SQS_QUEUE_URL')
-                if not all([s3_bucket, quizzes_table_name, sqs_queue_url]):
-                    raise ValueError("Missing environment variables")
-
-                if source == 'pdf':
-                    logger.info("Extracting PDF text from %s", s3_key)
-                    pdf_content = extract_pdf_text(s3_bucket, s3_key)
-                    quiz_content = generate_quiz_content(pdf_content=pdf_content)
-                else:
-                    logger.info("Generating quiz for topic: %s", topic_name)
-                    quiz_content = generate_quiz_content(topic=topic_name)
-
-                table = dynamodb.Table(quizzes_table_name)
-                logger.info("Updating DynamoDB for quiz %s", quiz_id)
-                table.update_item(
-                    Key={'quiz_id': quiz_id},
-                    UpdateExpression="SET #status = :s, quiz_content = :c",
-                    ExpressionAttributeNames={'#status': 'status'},
-                    ExpressionAttributeValues={
-                        ':s': 'completed',
-                        ':c': quiz_content
-                    }
-                )
-                logger.info("DynamoDB updated for quiz %s", quiz_id)
-
-                if sns_topic_arn:
-                    sns.publish(
-                        TopicArn=sns_topic_arn,
-                        Message=f"Quiz '{topic_name}' (ID: {quiz_id}) has been generated successfully.",
-                        Subject="QuizCraft: Quiz Generation Completed",
-                        MessageAttributes={
-                            'user_id': {
-                                'DataType': 'String',
-                                'StringValue': user_id
-                            }
-                        }
-                    )
-                    logger.info("SNS notification sent for quiz %s", quiz_id)
-
-                logger.info("Deleting message from SQS for quiz %s", quiz_id)
-                sqs.delete_message(
-                    QueueUrl=sqs_queue_url,
-                    ReceiptHandle=record['receiptHandle']
-                )
-                logger.info("Message deleted from SQS for quiz %s", quiz_id)
-            except Exception as e:
-                logger.error("Error processing quiz %s: %s", quiz_id, str(e))
-                table = dynamodb.Table(quizzes_table_name)
-                table.update_item(
-                    Key={'quiz_id': quiz_id},
-                    UpdateExpression="SET #status = :s, error_message = :e",
-                    ExpressionAttributeNames={'#status': 'status'},
-                    ExpressionAttributeValues={
-                        ':s': 'failed',
-                        ':e': str(e)
-                    }
-                )
-                if sns_topic_arn:
-                    sns.publish(
-                        TopicArn=sns_topic_arn,
-                        Message=f"Quiz generation failed for '{topic_name}' (ID: {quiz_id}): {str(e)}",
-                        Subject="QuizCraft: Quiz Generation Failed",
-                        MessageAttributes={
-                            'user_id': {
-                                'DataType': 'String',
-                                'StringValue': user_id
-                            }
-                        }
-                    )
-                raise
-
-        return {
-            'statusCode': 200,
-            'body': json.dumps({'message': 'Quiz generation processed'})
-        }
+                future.result()
+            except Exception:
+                batch_item_failures.append({'itemIdentifier': record['messageId']})
+        logger.info("Processed %d records, %d failed", len(records), len(batch_item_failures))
+        cache.emit_metrics()
+        llm_client.emit_metrics()
+
+        return {'batchItemFailures': batch_item_failures}
     except Exception as e:
         logger.error("Error processing event: %s", str(e))
         raise
 
-def generate_quiz_content(topic=None, pdf_content=None):
+def process_record(record, sns_topic_arn, deadline=None):
+    """Generate and store the quiz for one SQS message, raising on failure."""
+    quiz_id = None
+    user_id = None
+    topic_name = None
+    generation_id = None
+    quizzes_table_name = os.environ.get('QUIZZES_TABLE')
     try:
-        if pdf_content:
-            prompt = f"""
+        message = json.loads(record['body'])
+        quiz_id = message['quiz_id']
+        user_id = message['user_id']
+        topic_name = message.get('topic_name')
+        s3_key = message.get('s3_key')
+        text_key = message.get('text_key')
+        source = message.get('source')
+        logger.info("Processing quiz %s for user %s", quiz_id, user_id)
+
+        s3_bucket = os.environ.get('S3_BUCKET')
+        if not all([s3_bucket, quizzes_table_name]):
+            raise ValueError("Missing environment variables")
+
+        table = runtime.table(quizzes_table_name)
+        # SQS delivers at least once: only the delivery that claims the quiz calls the LLM
+        generation_id = claim_generation(table, quiz_id)
+        if not generation_id:
+            logger.info("Dropping duplicate message for quiz %s", quiz_id)
+            return
+        on_question = partial_writer(table, quiz_id, generation_id)
+        if source == 'pdf' and message.get('name_topic'):
+            # Uploads are queued under a placeholder name; one call names the topic and writes the quiz
+            pdf_content = load_pdf_text(s3_bucket, s3_key, text_key)
+            quiz_content, generated_name = generate_named_quiz(pdf_content, on_question=on_question, deadline=deadline)
+            topic_name = resolve_topic_name(user_id, message['topic_id'], generated_name or topic_name)
+        elif source == 'pdf':
+            pdf_content = load_pdf_text(s3_bucket, s3_key, text_key)
+            quiz_content = generate_quiz_content(pdf_content=pdf_content, on_question=on_question, deadline=deadline)
+        else:
+            logger.info("Generating quiz for topic: %s", topic_name)
+            quiz_content = generate_quiz_content(topic=topic_name, on_question=on_question, deadline=deadline)
+
+        logger.info("Updating DynamoDB for quiz %s", quiz_id)
+        try:
+            table.update_item(
+                Key={'quiz_id': quiz_id},
+                UpdateExpression="SET #status = :s, quiz_content = :c, answer_key = :k, topic_name = :n",
+                ConditionExpression="generation_id = :g",
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={
+                    ':s': 'completed',
+                    ':c': quiz_codec.encode(quiz_content),
+                    ':k': answer_key.build(quiz_content),
+                    ':n': topic_name,
+                    ':g': generation_id
+                }
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            logger.warning("Quiz %s was taken over by another delivery, discarding this result", quiz_id)
+            return
+        logger.info("DynamoDB updated for quiz %s", quiz_id)
+
+        if sns_topic_arn:
+            sns.publish(
+                TopicArn=sns_topic_arn,
+                Message=f"Quiz '{topic_name}' (ID: {quiz_id}) has been generated successfully.",
+                Subject="QuizCraft: Quiz Generation Completed",
+                MessageAttributes={
+                    'user_id': {
+                        'DataType': 'String',
+                        'StringValue': user_id
+                    }
+                }
+            )
+            logger.info("SNS notification sent for quiz %s", quiz_id)
+    except Exception as e:
+        logger.error("Error processing quiz %s: %s", quiz_id, str(e))
+        if not generation_id:
+            # Failed before this delivery owned the quiz; leave it to SQS to retry
+            raise
+        table = runtime.table(quizzes_table_name)
+        try:
+            table.update_item(
+                Key={'quiz_id': quiz_id},
+                UpdateExpression="SET #status = :s, error_message = :e",
+                ConditionExpression="generation_id = :g",
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={
+                    ':s': 'failed',
+                    ':e': str(e),
+                    ':g': generation_id
+                }
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            logger.warning("Quiz %s was taken over by another delivery, not marking it failed", quiz_id)
+            return
+        if sns_topic_arn and user_id:
+            sns.publish(
+                TopicArn=sns_topic_arn,
+                Message=f"Quiz generation failed for '{topic_name}' (ID: {quiz_id}): {str(e)}",
+                Subject="QuizCraft: Quiz Generation Failed",
+                MessageAttributes={
+                    'user_id': {
+                        'DataType': 'String',
+                        'StringValue': user_id
+                    }
+                }
+            )
+        raise
+
+def claim_generation(table, quiz_id):
+    """Move a quiz to 'generating' for this delivery; returns the claim's id, or None for a duplicate.
+
+    Pending and failed quizzes are claimed at once. A generating or partial
+    quiz is only taken over once its claim is older than
+    GENERATION_LEASE_SECONDS, which covers a worker that died mid-generation.
+    """
+    generation_id = str(uuid.uuid4())
+    now = int(time.time())
+    try:
+        table.update_item(
+            Key={'quiz_id': quiz_id},
+            UpdateExpression="SET #status = :generating, generation_id = :g, claimed_at = :now",
+            ConditionExpression=("#status IN (:pending, :failed) OR "
+                                 "#status IN (:generating, :partial) AND claimed_at < :stale"),
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={
+                ':generating': 'generating',
+                ':pending': 'pending',
+                ':failed': 'failed',
+                ':partial': 'partial',
+                ':g': generation_id,
+                ':now': now,
+                ':stale': now - GENERATION_LEASE_SECONDS
+            }
+        )
+        return generation_id
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return None
+
+def resolve_topic_name(user_id, topic_id, generated_name):
+    """Give a placeholder-named topic its generated name, made unique for the user.
+
+    Only the first delivery names the topic; a redelivered message gets the
+    name already stored.
+    """
+    topics_table = runtime.table(os.environ['TOPICS_TABLE'])
+    try:
+        name = topic_names.reserve(runtime.table(os.environ['TOPIC_NAMES_TABLE']), user_id, generated_name)
+    except Exception as e:
+        logger.error("Error reserving topic name %s: %s", generated_name, str(e))
+        name = generated_name
+    try:
+        topics_table.update_item(
+            Key={'user_id': user_id, 'topic_id': topic_id},
+            UpdateExpression="SET #name = :n REMOVE name_pending",
+            ConditionExpression="attribute_exists(name_pending)",
+            ExpressionAttributeNames={'#name': 'name'},
+            ExpressionAttributeValues={':n': name}
+        )
+        logger.info("Named topic %s: %s", topic_id, name)
+        return name
+    except topics_table.meta.client.exceptions.ConditionalCheckFailedException:
+        topic = topics_table.get_item(Key={'user_id': user_id, 'topic_id': topic_id}).get('Item') or {}
+        return topic.get('name', name)
+
+def partial_writer(table, quiz_id, generation_id):
+    """Callback that stores the questions streamed so far with status 'partial'.
+
+    Clients can open a partial quiz while the rest is generated; submit_quiz
+    refuses it until the final write adds the answer key. A failed write
+    only delays the questions, so it is logged rather than raised.
+    """
+    def write(questions):
+        try:
+            table.update_item(
+                Key={'quiz_id': quiz_id},
+                UpdateExpression="SET #status = :s, quiz_content = :c",
+                ConditionExpression="generation_id = :g AND #status <> :completed",
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={
+                    ':s': 'partial',
+                    ':completed': 'completed',
+                    ':c': quiz_codec.encode(questions),
+                    ':g': generation_id
+                }
+            )
+        except Exception as e:
+            logger.warning("Partial write for quiz %s skipped: %s", quiz_id, str(e))
+    return write
+
+MODEL = llm.MODEL
+# Stream completions and parse questions as each JSON object closes
+STREAM_COMPLETIONS = os.environ.get('STREAM_COMPLETIONS', 'true').lower() == 'true'
+
+QUESTION_COUNT = 5
+# PDF text is split into sections of this many tokens; documents that fit in
+# one section keep the single-prompt path
+SECTION_TOKENS = int(os.environ.get('SECTION_TOKENS', '2500'))
+MAX_SECTIONS = int(os.environ.get('MAX_SECTIONS', '16'))
+# Completion tokens budgeted per requested question
+TOKENS_PER_QUESTION = 120
+
+PDF_PROMPT = """
 Generate a quiz with 5 multiple-choice questions based on the following PDF content. 
 Each question should have 4 options and indicate the correct answer. 
 Return the quiz as a JSON array with the following structure:
@@ -138,10 +275,10 @@ Return the quiz as a JSON array with the following structure:
 ]
 
 PDF content:
-{pdf_content[:40000]}
+{pdf_content}
 """
-        else:
-            prompt = f"""
+
+TOPIC_PROMPT = """
 Generate a quiz with 5 multiple-choice questions about {topic}. 
 Each question should have 4 options and indicate the correct answer. 
 Return the quiz as a JSON array with the following structure:
@@ -155,59 +292,255 @@ Return the quiz as a JSON array with the following structure:
 ]
 """
 
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a quiz generator that returns valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7,
-        )
-        quiz_content = response.choices[0].message['content'].strip()
+NAMED_PDF_PROMPT = """
+Generate a quiz with 5 multiple-choice questions based on the following PDF content,
+and give the content a concise topic name of a few words.
+Each question should have 4 options and indicate the correct answer.
+Return a JSON object with the topic name first, in the following structure:
+{{
+    "topic_name": "Topic name",
+    "questions": [
+        {{
+            "question": "Question text",
+            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+            "correct_answer": "Correct option"
+        }},
+        ...
+    ]
+}}
 
-        json_match = re.search(r'\[.*\]', quiz_content, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            try:
-                parsed_content = json.loads(json_str)
-                if isinstance(parsed_content, list) and all(
-                    isinstance(q, dict) and "question" in q and "options" in q and "correct_answer" in q
-                    for q in parsed_content
-                ):
-                    return parsed_content
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON: {e}, raw content: {quiz_content}")
-        
-        logger.error(f"Invalid JSON from OpenAI, raw content: {quiz_content}")
-        return [
-            {
-                "question": "Error: Unable to generate quiz content",
-                "options": ["N/A"],
-                "correct_answer": "N/A"
-            }
-        ]
+PDF content:
+{pdf_content}
+"""
+
+# The first section of an upload also names the document
+NAMED_SECTION_PROMPT = """
+Generate {count} multiple-choice questions based on the following opening section of a longer document,
+and give the document a concise topic name of a few words.
+Each question should have 4 options and indicate the correct answer.
+Only ask about material in this section.
+Return a JSON object with the topic name first, in the following structure:
+{{
+    "topic_name": "Topic name",
+    "questions": [
+        {{
+            "question": "Question text",
+            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+            "correct_answer": "Correct option"
+        }},
+        ...
+    ]
+}}
+
+Section:
+{section}
+"""
+
+# Generated topic names are cut to this length
+MAX_TOPIC_NAME_CHARS = 80
+
+SECTION_PROMPT = """
+Generate {count} multiple-choice questions based on the following section of a longer document.
+Each question should have 4 options and indicate the correct answer.
+Only ask about material in this section.
+Return the questions as a JSON array with the following structure:
+[
+    {{
+        "question": "Question text",
+        "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+        "correct_answer": "Correct option"
+    }},
+    ...
+]
+
+Section:
+{section}
+"""
+
+def generate_quiz_content(topic=None, pdf_content=None, seed=None, on_question=None, deadline=None):
+    """Generate the quiz questions for a topic or PDF text.
+
+    ``on_question`` is called with the questions parsed so far each time a
+    streamed single-prompt quiz completes one. Sectioned PDF quizzes sample
+    across sections at the end, so they do not report partial questions.
+    """
+    try:
+        if pdf_content:
+            pdf_sections = sections.split(pdf_content, SECTION_TOKENS)
+            if len(pdf_sections) > 1:
+                return generate_sectioned_quiz(pdf_content, pdf_sections, seed, deadline)[0]
+            prompt = PDF_PROMPT.format(pdf_content=pdf_content)
+            key = quiz_cache.cache_key(MODEL, PDF_PROMPT, text=pdf_content)
+        else:
+            prompt = TOPIC_PROMPT.format(topic=topic)
+            key = quiz_cache.cache_key(MODEL, TOPIC_PROMPT, topic=topic)
+
+        parsed_content = cache.get_or_generate(key, lambda: cacheable(*request_quiz(
+            prompt, on_question=on_question, deadline=deadline)))
+        if parsed_content is not None:
+            return parsed_content
+        return error_quiz()
     except Exception as e:
         logger.error("Error generating quiz content: %s", str(e))
         raise
 
+def generate_named_quiz(pdf_content, seed=None, on_question=None, deadline=None):
+    """Questions and a topic name for PDF text from the same LLM call.
+
+    Returns (questions, topic_name); topic_name is None if the reply had none.
+    """
+    try:
+        pdf_sections = sections.split(pdf_content, SECTION_TOKENS)
+        if len(pdf_sections) > 1:
+            return generate_sectioned_quiz(pdf_content, pdf_sections, seed, deadline, name_topic=True)
+        prompt = NAMED_PDF_PROMPT.format(pdf_content=pdf_content)
+        key = quiz_cache.cache_key(MODEL, NAMED_PDF_PROMPT, text=pdf_content)
+        named = cache.get_or_generate(key, lambda: cacheable(*request_named_quiz(
+            prompt, on_question=on_question, deadline=deadline)))
+        if named is None:
+            return error_quiz(), None
+        return named['questions'], named.get('topic_name')
+    except Exception as e:
+        logger.error("Error generating named quiz: %s", str(e))
+        raise
+
+def error_quiz():
+    return [
+        {
+            "question": "Error: Unable to generate quiz content",
+            "options": ["N/A"],
+            "correct_answer": "N/A"
+        }
+    ]
+
+def generate_sectioned_quiz(pdf_content, pdf_sections, seed=None, deadline=None, name_topic=False):
+    """Generate questions for each section concurrently, then dedupe and sample QUESTION_COUNT.
+
+    The sample is seeded from the document text unless ``seed`` is given, so
+    the same PDF and model replies always give the same quiz. With
+    ``name_topic`` the first section's call also names the document.
+    Returns (questions, topic_name).
+    """
+    chosen = sections.select(pdf_sections, MAX_SECTIONS)
+    logger.info("Generating from %d of %d sections", len(chosen), len(pdf_sections))
+    if seed is None:
+        seed = sections.seed_for(pdf_content)
+    names = {}
+    cut_off = []
+
+    def generate_section(section, count):
+        max_tokens = TOKENS_PER_QUESTION * count + 100
+        if name_topic and section is chosen[0]:
+            named, truncated = request_named_quiz(NAMED_SECTION_PROMPT.format(count=count, section=section),
+                                                  max_tokens=max_tokens, deadline=deadline)
+            names['topic_name'] = named and named['topic_name']
+            questions = named and named['questions']
+        else:
+            questions, truncated = request_quiz(SECTION_PROMPT.format(count=count, section=section),
+                                                max_tokens=max_tokens, deadline=deadline)
+        if truncated:
+            cut_off.append(section)
+        return questions
+
+    def generate():
+        questions, failed = sections.generate(chosen, generate_section, QUESTION_COUNT, seed, section_executor)
+        if failed:
+            logger.warning("%d of %d sections failed, not caching the quiz", failed, len(chosen))
+        if questions and name_topic:
+            questions = {'topic_name': names.get('topic_name'), 'questions': questions}
+        return cacheable(questions, bool(cut_off) or bool(failed))
+
+    key = quiz_cache.cache_key(MODEL, NAMED_SECTION_PROMPT if name_topic else SECTION_PROMPT, text=pdf_content)
+    quiz = cache.get_or_generate(key, generate)
+    if not quiz:
+        return error_quiz(), None
+    if name_topic:
+        return quiz['questions'], quiz.get('topic_name')
+    return quiz, None
+
+def cacheable(quiz, incomplete):
+    """A generated quiz as the cache should take it.
+
+    One that is incomplete (cut off, or missing failed sections) or has
+    fewer than QUESTION_COUNT questions is served but not stored, so a
+    later request gets a fresh try instead of the degraded quiz.
+    """
+    if quiz is None:
+        return None
+    questions = quiz['questions'] if isinstance(quiz, dict) else quiz
+    if incomplete or len(questions) < QUESTION_COUNT:
+        return quiz_cache.Uncached(quiz)
+    return quiz
+
+def request_quiz(prompt, max_tokens=500, on_question=None, deadline=None):
+    """Ask the LLM for a quiz; returns (question list or None if the reply is unusable, truncated).
+
+    Questions completed before a truncated or malformed tail are kept, and
+    truncated says the reply was cut off by max_tokens or the deadline.
+    """
+    questions, _, truncated = complete_quiz(prompt, max_tokens, on_question, deadline)
+    return questions, truncated
+
+def request_named_quiz(prompt, max_tokens=600, on_question=None, deadline=None):
+    """Ask for a {"topic_name", "questions"} reply; returns (it as a dict or None without questions, truncated)."""
+    questions, content, truncated = complete_quiz(prompt, max_tokens, on_question, deadline, array_key='questions')
+    if not questions:
+        return None, truncated
+    name = ' '.join((question_stream.string_field(content, 'topic_name') or '').split())[:MAX_TOPIC_NAME_CHARS]
+    return {'topic_name': name or None, 'questions': questions}, truncated
+
+def complete_quiz(prompt, max_tokens, on_question, deadline, array_key=None):
+    """Run one completion through the question parser; returns (questions or None, reply text, truncated).
+
+    ``array_key`` names the field holding the questions when the reply is an object.
+    """
+    parser = question_stream.QuestionParser(array_key)
+
+    def on_delta(text):
+        if parser.feed(text) and on_question:
+            on_question(list(parser.questions))
+
+    completion = llm_client.complete(
+        [
+            {"role": "system", "content": "You are a quiz generator that returns valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=0.7,
+        deadline=deadline,
+        on_delta=on_delta if STREAM_COMPLETIONS else None,
+    )
+    if not STREAM_COMPLETIONS:
+        parser.feed(completion.content)
+
+    truncated = completion.finish_reason in ('length', 'deadline')
+    if truncated:
+        logger.warning("Completion cut off (%s), kept %d questions", completion.finish_reason, len(parser.questions))
+    if parser.questions:
+        return parser.questions, completion.content, truncated
+    logger.error("No valid questions in LLM response (%d malformed)", parser.dropped)
+    return None, completion.content, truncated
+
+def load_pdf_text(s3_bucket, s3_key, text_key=None):
+    """Read the text sidecar written at upload time, falling back to parsing the PDF."""
+    if text_key:
+        text = pdf_text.get_text_sidecar(s3, s3_bucket, text_key)
+        if text is not None:
+            logger.info("Loaded %d characters from text sidecar %s", len(text), text_key)
+            return text
+        logger.warning("Text sidecar %s missing, extracting from PDF", text_key)
+    logger.info("Extracting PDF text from %s", s3_key)
+    text = extract_pdf_text(s3_bucket, s3_key)
+    if text_key:
+        pdf_text.put_text_sidecar(s3, s3_bucket, text_key, text)
+    return text
+
 def extract_pdf_text(s3_bucket, s3_key):
     try:
         obj = s3.get_object(Bucket=s3_bucket, Key=s3_key)
-        pdf_data = obj['Body'].read()
-        pdf_file = io.BytesIO(pdf_data)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
-        logger.info("Extracted text length: %d characters", len(text))
-        if not text:
-            raise ValueError("No text extracted from PDF")
-        truncated_text = text[:40000]
-        logger.info("Truncated to %d characters", len(truncated_text))
-        return truncated_text
+        text = pdf_text.extract_text(io.BytesIO(obj['Body'].read()))
+        logger.info("Truncated to %d characters", len(text))
+        return text
     except Exception as e:
         logger.error("Error extracting PDF text: %s", str(e))
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,56 @@
+"""One-off backfill: give legacy Attempts items a created_at so they appear in UserCreatedAtIndex.
+
+Attempts written before submit_quiz recorded a timestamp are invisible to
+the sparse per-user index. This pages through the table once and stamps
+them with LEGACY_CREATED_AT, which sorts before every real timestamp.
+
+    ATTEMPTS_TABLE=Attempts python scripts/backfill_attempt_created_at.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+import logging
+import boto3
+
+logger = logging.getLogger()
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+LEGACY_CREATED_AT = '1970-01-01T00:00:00Z'
+
+
+def backfill(table, dry_run=False):
+    scan_kwargs = {
+        'FilterExpression': 'attribute_not_exists(created_at)',
+        'ProjectionExpression': 'attempt_id',
+    }
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            if not dry_run:
+                table.update_item(
+                    Key={'attempt_id': item['attempt_id']},
+                    UpdateExpression='SET created_at = :ts',
+                    ConditionExpression='attribute_not_exists(created_at)',
+                    ExpressionAttributeValues={':ts': LEGACY_CREATED_AT}
+                )
+            updated += 1
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return updated
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    table_name = os.environ.get('ATTEMPTS_TABLE')
+    if not table_name:
+        sys.exit("ATTEMPTS_TABLE environment variable not set")
+    count = backfill(boto3.resource('dynamodb').Table(table_name), dry_run=args.dry_run)
+    logger.info(f"{'Would update' if args.dry_run else 'Updated'} {count} attempts")
+
+
+if __name__ == '__main__':
+    main()
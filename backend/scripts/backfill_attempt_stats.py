@@ -0,0 +1,52 @@
+"""One-off backfill: roll attempts recorded before attempt_aggregator existed into AttemptStats.
+
+Pages through Attempts for items without stats_applied and applies them
+with the same code path as the stream consumer, so it is safe to run while
+the aggregator is live and to re-run after an interruption.
+
+    ATTEMPTS_TABLE=Attempts QUIZZES_TABLE=Quizzes STATS_TABLE=AttemptStats \
+        python scripts/backfill_attempt_stats.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+import logging
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'layer', 'python'))
+from quizcraft import attempt_stats  # noqa: E402
+
+logger = logging.getLogger()
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+
+def backfill(resource, attempts_table, quizzes_table, stats_table, dry_run=False):
+    table = resource.Table(attempts_table)
+    scan_kwargs = {'FilterExpression': 'attribute_not_exists(stats_applied)'}
+    found = 0
+    applied = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        items = response.get('Items', [])
+        found += len(items)
+        if items and not dry_run:
+            applied += attempt_stats.apply(resource, attempts_table, quizzes_table, stats_table, items)
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return found, applied
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    names = [os.environ.get(v) for v in ('ATTEMPTS_TABLE', 'QUIZZES_TABLE', 'STATS_TABLE')]
+    if not all(names):
+        sys.exit("ATTEMPTS_TABLE, QUIZZES_TABLE and STATS_TABLE must be set")
+    found, applied = backfill(boto3.resource('dynamodb'), *names, dry_run=args.dry_run)
+    logger.info(f"Found {found} unaggregated attempts, applied {applied}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""One-off backfill: register the topic's existing email subscriptions in Subscriptions.
+
+Pages through every subscription on the topic (following NextToken), reads
+each email subscription's filter policy to find its user_id, and registers
+the first one per user with a conditional put. Users with more than one
+subscription (created by the old hook) are listed; --unsubscribe-duplicates
+removes every subscription but the registered one. Safe to re-run: an
+existing registration is kept.
+
+    SNS_TOPIC_ARN=arn:aws:sns:... SUBSCRIPTIONS_TABLE=Subscriptions \
+        python scripts/backfill_subscriptions.py [--dry-run] [--unsubscribe-duplicates]
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+from datetime import datetime
+import boto3
+
+logger = logging.getLogger()
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+
+def email_subscriptions(sns, topic_arn):
+    """Yield (subscription, user_id) for every email subscription on the topic, page by page."""
+    kwargs = {'TopicArn': topic_arn}
+    while True:
+        page = sns.list_subscriptions_by_topic(**kwargs)
+        for sub in page.get('Subscriptions', []):
+            # Unconfirmed subscriptions have no ARN to read attributes from
+            if sub['Protocol'] != 'email' or not sub['SubscriptionArn'].startswith('arn:'):
+                continue
+            attributes = sns.get_subscription_attributes(SubscriptionArn=sub['SubscriptionArn'])
+            policy = json.loads(attributes.get('Attributes', {}).get('FilterPolicy') or '{}')
+            user_ids = policy.get('user_id') or []
+            if len(user_ids) == 1:
+                yield sub, user_ids[0]
+        if not page.get('NextToken'):
+            return
+        kwargs['NextToken'] = page['NextToken']
+
+
+def register(table, topic_arn, sub, user_id):
+    """Register sub for the user unless one is already registered; returns (registered ARN, added)."""
+    try:
+        table.put_item(
+            Item={
+                'user_id': user_id,
+                'email': sub['Endpoint'],
+                'topic_arn': topic_arn,
+                'status': 'subscribed',
+                'subscription_arn': sub['SubscriptionArn'],
+                'created_at': datetime.utcnow().isoformat() + 'Z'
+            },
+            ConditionExpression='attribute_not_exists(user_id)'
+        )
+        return sub['SubscriptionArn'], True
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        item = table.get_item(Key={'user_id': user_id}).get('Item') or {}
+        return item.get('subscription_arn'), False
+
+
+def backfill(sns, table, topic_arn, dry_run=False, unsubscribe_duplicates=False):
+    registered = 0
+    duplicates = 0
+    seen = {}
+    for sub, user_id in email_subscriptions(sns, topic_arn):
+        if user_id not in seen:
+            if dry_run:
+                seen[user_id] = sub['SubscriptionArn']
+            else:
+                seen[user_id], created = register(table, topic_arn, sub, user_id)
+                registered += created
+        if sub['SubscriptionArn'] == seen[user_id]:
+            continue
+        # Keep the registered subscription; any other one for the user is a duplicate
+        duplicates += 1
+        logger.info(f"Duplicate subscription {sub['SubscriptionArn']} for user {user_id}")
+        if unsubscribe_duplicates and not dry_run and seen[user_id]:
+            sns.unsubscribe(SubscriptionArn=sub['SubscriptionArn'])
+    return len(seen), registered, duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--unsubscribe-duplicates', action='store_true')
+    args = parser.parse_args()
+    topic_arn, table_name = os.environ.get('SNS_TOPIC_ARN'), os.environ.get('SUBSCRIPTIONS_TABLE')
+    if not topic_arn or not table_name:
+        sys.exit("SNS_TOPIC_ARN and SUBSCRIPTIONS_TABLE must be set")
+    users, registered, duplicates = backfill(
+        boto3.client('sns'), boto3.resource('dynamodb').Table(table_name), topic_arn,
+        dry_run=args.dry_run, unsubscribe_duplicates=args.unsubscribe_duplicates)
+    logger.info(f"Found {users} subscribed users, registered {registered}, {duplicates} duplicate subscriptions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""One-off backfill: reserve the names of topics created before TopicNames existed.
+
+Pages through Topics (user_id and name only) and raises each user's name
+counters to at least what topic_names.allocations computes, so generated
+names skip every existing one. Counters only ever go up, so it is safe to
+run while the handlers are live and to re-run after an interruption.
+
+    TOPICS_TABLE=Topics TOPIC_NAMES_TABLE=TopicNames python scripts/backfill_topic_names.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+import logging
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'layer', 'python'))
+from quizcraft import topic_names  # noqa: E402
+
+logger = logging.getLogger()
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+
+def names_by_user(table):
+    """Every named topic's name, grouped by user; topics still awaiting a name are skipped."""
+    scan_kwargs = {
+        'ProjectionExpression': 'user_id, #name',
+        'FilterExpression': 'attribute_not_exists(name_pending)',
+        'ExpressionAttributeNames': {'#name': 'name'},
+    }
+    users = {}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            if item.get('name'):
+                users.setdefault(item['user_id'], []).append(item['name'])
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return users
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+def backfill(resource, topics_table, names_table, dry_run=False):
+    users = names_by_user(resource.Table(topics_table))
+    table = resource.Table(names_table)
+    written = 0
+    for user_id, names in users.items():
+        for key, allocated in topic_names.allocations(names).items():
+            if dry_run:
+                continue
+            try:
+                table.update_item(
+                    Key={'user_id': user_id, 'name_key': key},
+                    UpdateExpression="SET allocated = :n",
+                    ConditionExpression="attribute_not_exists(allocated) OR allocated < :n",
+                    ExpressionAttributeValues={':n': allocated}
+                )
+                written += 1
+            except table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass
+    return len(users), sum(len(names) for names in users.values()), written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    names = [os.environ.get(v) for v in ('TOPICS_TABLE', 'TOPIC_NAMES_TABLE')]
+    if not all(names):
+        sys.exit("TOPICS_TABLE and TOPIC_NAMES_TABLE must be set")
+    users, topics, written = backfill(boto3.resource('dynamodb'), *names, dry_run=args.dry_run)
+    logger.info(f"Found {topics} named topics for {users} users, raised {written} name counters")
+
+
+if __name__ == '__main__':
+    main()
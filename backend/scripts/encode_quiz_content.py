@@ -0,0 +1,71 @@
+"""One-off migration: rewrite legacy quiz_content values in the compressed Binary format.
+
+Readers decode every legacy shape through quizcraft.quiz_codec, so this is
+only needed to reclaim item size for quizzes generated before the codec.
+Each rewrite is conditional on quiz_content being unchanged since the scan.
+
+    QUIZZES_TABLE=Quizzes python scripts/encode_quiz_content.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+import logging
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'layer', 'python'))
+from quizcraft import quiz_codec  # noqa: E402
+
+logger = logging.getLogger()
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+
+def migrate(table, dry_run=False):
+    scan_kwargs = {
+        'FilterExpression': 'attribute_exists(quiz_content)',
+        'ProjectionExpression': 'quiz_id, quiz_content',
+    }
+    updated = 0
+    skipped = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            stored = item['quiz_content']
+            if quiz_codec.is_current(stored):
+                continue
+            try:
+                encoded = quiz_codec.encode(quiz_codec.decode(stored))
+            except quiz_codec.QuizContentError as e:
+                logger.warning(f"Skipping quiz {item['quiz_id']}: {str(e)}")
+                skipped += 1
+                continue
+            if not dry_run:
+                try:
+                    table.update_item(
+                        Key={'quiz_id': item['quiz_id']},
+                        UpdateExpression='SET quiz_content = :new',
+                        ConditionExpression='quiz_content = :old',
+                        ExpressionAttributeValues={':new': encoded, ':old': stored}
+                    )
+                except table.meta.client.exceptions.ConditionalCheckFailedException:
+                    logger.info(f"Quiz {item['quiz_id']} changed during migration, leaving it")
+                    continue
+            updated += 1
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return updated, skipped
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    table_name = os.environ.get('QUIZZES_TABLE')
+    if not table_name:
+        sys.exit("QUIZZES_TABLE environment variable not set")
+    updated, skipped = migrate(boto3.resource('dynamodb').Table(table_name), dry_run=args.dry_run)
+    logger.info(f"{'Would rewrite' if args.dry_run else 'Rewrote'} {updated} quizzes, skipped {skipped} undecodable")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,19 @@
 import json
-import boto3
 import os
 import uuid
 import logging
+from datetime import datetime
+from quizcraft import runtime, responses, dynamo, quiz_codec, answer_key
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = runtime.resource('dynamodb')
+
+ALLOWED_METHODS = 'POST,OPTIONS'
+
+# Conflicting transactions to try before deferring the counter to attempt_aggregator
+COUNTER_TRANSACT_ATTEMPTS = int(os.environ.get('COUNTER_TRANSACT_ATTEMPTS', '3'))
 
 def lambda_handler(event, context):
     try:
@@ -19,70 +25,87 @@ def lambda_handler(event, context):
         quizzes_table = dynamodb.Table(os.environ['QUIZZES_TABLE'])
         attempts_table = dynamodb.Table(os.environ['ATTEMPTS_TABLE'])
 
-        logger.info(f"Fetching quiz with ID: {quiz_id}")
-        quiz_response = quizzes_table.get_item(Key={'quiz_id': quiz_id})
-        quiz = quiz_response.get('Item')
+        logger.info(f"Fetching answer key for quiz: {quiz_id}")
+        quiz = quizzes_table.get_item(
+            Key={'quiz_id': quiz_id},
+            ProjectionExpression='quiz_id, answer_key, #status',
+            ExpressionAttributeNames={'#status': 'status'},
+            ConsistentRead=True
+        ).get('Item')
         if not quiz:
             logger.error("Quiz not found")
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Quiz not found'}),
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'POST,OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-                }
-            }
-
-        quiz_content = quiz['quiz_content']
-        if isinstance(quiz_content, str):
-            quiz_content = json.loads(quiz_content)
+            return responses.error_response(404, 'Quiz not found', ALLOWED_METHODS)
+        if 'answer_key' not in quiz and quiz.get('status') in ('pending', 'generating', 'partial'):
+            # Questions are still streaming in; the answer key is written with the last of them
+            return responses.error_response(409, 'Quiz is still being generated', ALLOWED_METHODS)
 
-        if isinstance(quiz_content, dict) and 'quiz' in quiz_content:
-            quiz_content = quiz_content['quiz']
-
-        correct_answers = {str(i): q['correct_answer'] for i, q in enumerate(quiz_content)}
+        key = quiz.get('answer_key') or load_legacy_answer_key(quizzes_table, quiz_id)
         user_answers_str = {str(k): v for k, v in user_answers.items()}
-        score = sum(1 for q_idx, ans in user_answers_str.items() if ans == correct_answers.get(q_idx))
+        score, max_score, total_questions = answer_key.score(key, user_answers_str)
 
         attempt_id = str(uuid.uuid4())
-        attempts_table.put_item(Item={
+        attempt = {
             'attempt_id': attempt_id,
             'quiz_id': quiz_id,
             'user_id': user_id,
             'score': score,
-            'total_questions': len(quiz_content),
+            'max_score': max_score,
+            'total_questions': total_questions,
             'answers': user_answers_str,
-            'correct_answers': correct_answers
-        })
+            'created_at': datetime.utcnow().isoformat() + 'Z'
+        }
+        # Record the attempt and bump attempt_count atomically, in one round trip
+        try:
+            dynamo.transact_write(dynamodb.meta.client, [
+                {'Put': {
+                    'TableName': attempts_table.name,
+                    'Item': attempt,
+                    'ConditionExpression': 'attribute_not_exists(attempt_id)'
+                }},
+                {'Update': {
+                    'TableName': quizzes_table.name,
+                    'Key': {'quiz_id': quiz_id},
+                    'UpdateExpression': "SET attempt_count = if_not_exists(attempt_count, :zero) + :one",
+                    'ConditionExpression': 'attribute_exists(quiz_id)',
+                    'ExpressionAttributeValues': {
+                        ':zero': 0,
+                        ':one': 1
+                    }
+                }}
+            ], max_attempts=COUNTER_TRANSACT_ATTEMPTS)
+        except dynamodb.meta.client.exceptions.TransactionCanceledException as e:
+            codes = dynamo.cancellation_codes(e)
+            if codes[1] == 'ConditionalCheckFailed':
+                logger.warning(f"Quiz {quiz_id} was deleted before the attempt was recorded")
+                return responses.error_response(404, 'Quiz not found', ALLOWED_METHODS)
+            if 'TransactionConflict' not in codes:
+                raise
+            # The quiz's counter is contended; record the attempt alone and let
+            # attempt_aggregator add it to attempt_count from the stream
+            logger.info(f"Deferring attempt_count increment for hot quiz {quiz_id}")
+            attempts_table.put_item(
+                Item=dict(attempt, count_pending=1),
+                ConditionExpression='attribute_not_exists(attempt_id)'
+            )
 
-        # Increment attempt count in Quizzes table
+        return responses.json_response(200, {'score': score, 'total': max_score, 'attempt_id': attempt_id}, ALLOWED_METHODS)
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return responses.error_response(500, str(e), ALLOWED_METHODS)
+
+
+def load_legacy_answer_key(quizzes_table, quiz_id):
+    """Build the answer key for a quiz generated before keys were stored, and save it."""
+    quiz = quizzes_table.get_item(Key={'quiz_id': quiz_id}, ProjectionExpression='quiz_content').get('Item', {})
+    key = answer_key.build(quiz_codec.decode(quiz['quiz_content']))
+    try:
         quizzes_table.update_item(
             Key={'quiz_id': quiz_id},
-            UpdateExpression="SET attempt_count = if_not_exists(attempt_count, :zero) + :one",
-            ExpressionAttributeValues={
-                ':zero': 0,
-                ':one': 1
-            }
+            UpdateExpression="SET answer_key = :k",
+            ConditionExpression="attribute_not_exists(answer_key)",
+            ExpressionAttributeValues={':k': key}
         )
-
-        return {
-            'statusCode': 200,
-            'body': json.dumps({'score': score, 'total': len(quiz_content), 'attempt_id': attempt_id}),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': str(e)}),
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-            }
-        }
\ No newline at end of file
+    except quizzes_table.meta.client.exceptions.ConditionalCheckFailedException:
+        # Another submission stored one first; scoring against either is equivalent
+        pass
+    return key
\ No newline at end of file
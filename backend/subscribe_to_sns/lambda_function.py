@@ -1,45 +1,76 @@
 import json
-import boto3
 import os
+import time
 import logging
+from datetime import datetime
+from quizcraft import runtime
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-sns = boto3.client('sns')
+sns = runtime.client('sns')
+
+# A registration left in 'subscribing' this long by a failed invocation is retried
+CLAIM_TIMEOUT_SECONDS = 60
 
 def lambda_handler(event, context):
     try:
         user_email = event['request']['userAttributes']['email']
-        user_id = event['request']['userAttributes']['sub'] 
+        user_id = event['request']['userAttributes']['sub']
         sns_topic_arn = os.environ['SNS_TOPIC_ARN']
+        subscriptions_table = runtime.table(os.environ['SUBSCRIPTIONS_TABLE'])
 
-        # Check if a subscription already exists for the user's email with the same filter policy
-        subscriptions = sns.list_subscriptions_by_topic(TopicArn=sns_topic_arn)
-        logger.info(f"Existing subscriptions for topic {sns_topic_arn}: {subscriptions['Subscriptions']}")
-        for sub in subscriptions['Subscriptions']:
-            if sub['Protocol'] == 'email' and sub['Endpoint'] == user_email:
-                # Check filter policy
-                attributes = sns.get_subscription_attributes(SubscriptionArn=sub['SubscriptionArn'])
-                filter_policy = attributes.get('Attributes', {}).get('FilterPolicy')
-                if filter_policy:
-                    filter_policy_dict = json.loads(filter_policy)
-                    if filter_policy_dict.get('user_id') == [user_id]:
-                        logger.info(f"Subscription already exists for user {user_id} with ARN {sub['SubscriptionArn']}")
-                        return event
+        # One registry item per user: claiming it is the duplicate check, so a
+        # repeated confirmation (e.g. after a password reset) never lists the topic
+        if not claim_subscription(subscriptions_table, user_id, user_email, sns_topic_arn):
+            logger.info(f"Subscription already registered for user {user_id}")
+            return event
 
         # Subscribe the user's email to the SNS topic with a filter policy using Cognito sub
-        response = sns.subscribe(
-            TopicArn=sns_topic_arn,
-            Protocol='email',
-            Endpoint=user_email,
-            Attributes={
-                'FilterPolicy': json.dumps({'user_id': [user_id]})
-            }
-        )
+        try:
+            response = sns.subscribe(
+                TopicArn=sns_topic_arn,
+                Protocol='email',
+                Endpoint=user_email,
+                Attributes={
+                    'FilterPolicy': json.dumps({'user_id': [user_id]})
+                },
+                ReturnSubscriptionArn=True
+            )
+        except Exception:
+            # Let the next confirmation try again
+            subscriptions_table.delete_item(Key={'user_id': user_id})
+            raise
 
+        subscriptions_table.update_item(
+            Key={'user_id': user_id},
+            UpdateExpression="SET #status = :s, subscription_arn = :arn",
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':s': 'subscribed', ':arn': response['SubscriptionArn']}
+        )
         logger.info(f"Subscription ARN: {response['SubscriptionArn']} for user {user_id}")
         return event
     except Exception as e:
         logger.error(f"Error subscribing user to SNS: {str(e)}")
-        return event
\ No newline at end of file
+        return event
+
+def claim_subscription(subscriptions_table, user_id, email, topic_arn):
+    """Register the user's subscription with a conditional put; False if one is already registered."""
+    now = int(time.time())
+    try:
+        subscriptions_table.put_item(
+            Item={
+                'user_id': user_id,
+                'email': email,
+                'topic_arn': topic_arn,
+                'status': 'subscribing',
+                'claimed_at': now,
+                'created_at': datetime.utcnow().isoformat() + 'Z'
+            },
+            ConditionExpression="attribute_not_exists(user_id) OR #status = :subscribing AND claimed_at < :stale",
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':subscribing': 'subscribing', ':stale': now - CLAIM_TIMEOUT_SECONDS}
+        )
+        return True
+    except subscriptions_table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
@@ -86,6 +86,14 @@ const StyledTabPanel = styled(Box)(({ theme }) => ({
   padding: theme.spacing(3, 0),
 }))
 
+// Matches MAX_UPLOAD_BYTES on the backend
+const MAX_PDF_BYTES = 50 * 1024 * 1024
+
+const sha256Hex = async (file) => {
+  const digest = await crypto.subtle.digest("SHA-256", await file.arrayBuffer())
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("")
+}
+
 function QuizList() {
   const [quizzes, setQuizzes] = useState([])
   const [groupedQuizzes, setGroupedQuizzes] = useState({})
@@ -99,6 +107,7 @@ function QuizList() {
   const [isAutoRefreshing, setIsAutoRefreshing] = useState(false)
   const [pollingInterval, setPollingInterval] = useState(null)
   const fileInputRef = useRef(null)
+  const generationKeyRef = useRef(null)
   const API_BASE_URL = awsmobile.API_ENDPOINT
   const theme = useTheme()
 
@@ -126,17 +135,25 @@ function QuizList() {
         const idToken = session.tokens?.idToken?.toString()
         if (!idToken) throw new Error("Unable to retrieve user token.")
 
-        const quizResponse = await fetch(`${API_BASE_URL}/quiz`, {
-          method: "GET",
-          headers: { "Content-Type": "application/json", Authorization: `Bearer ${idToken}` },
-        })
-        if (!quizResponse.ok) {
-          const errorData = await quizResponse.json()
-          throw new Error(errorData.error || "Failed to fetch quizzes")
-        }
-        const quizData = await quizResponse.json()
+        // The list endpoint is paginated; follow next_cursor until the last page
+        const allQuizzes = []
+        let cursor = null
+        do {
+          const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ""
+          const quizResponse = await fetch(`${API_BASE_URL}/quiz${query}`, {
+            method: "GET",
+            headers: { "Content-Type": "application/json", Authorization: `Bearer ${idToken}` },
+          })
+          if (!quizResponse.ok) {
+            const errorData = await quizResponse.json()
+            throw new Error(errorData.error || "Failed to fetch quizzes")
+          }
+          const quizData = await quizResponse.json()
+          allQuizzes.push(...(quizData.quizzes || []))
+          cursor = quizData.next_cursor
+        } while (cursor)
 
-        const sortedQuizzes = (quizData.quizzes || []).sort((a, b) => {
+        const sortedQuizzes = allQuizzes.sort((a, b) => {
           const createdAtA = a.created_at ? new Date(a.created_at).getTime() : 0
           const createdAtB = b.created_at ? new Date(b.created_at).getTime() : 0
           if (createdAtA !== createdAtB) {
@@ -174,16 +191,24 @@ function QuizList() {
         const idToken = session.tokens?.idToken?.toString()
         if (!idToken) throw new Error("Unable to retrieve user token for attempts.")
 
-        const attemptResponse = await fetch(`${API_BASE_URL}/profile`, {
-          method: "GET",
-          headers: { "Content-Type": "application/json", Authorization: `Bearer ${idToken}` },
-        })
-        if (!attemptResponse.ok) {
-          const errorData = await attemptResponse.json()
-          throw new Error(errorData.error || "Failed to fetch attempts")
-        }
-        const attemptData = await attemptResponse.json()
-        setUserAttempts(attemptData.attempts || [])
+        // Profile pages attempts too; follow next_attempts_cursor until the last page
+        const allAttempts = []
+        let cursor = null
+        do {
+          const query = cursor ? `?attempts_cursor=${encodeURIComponent(cursor)}` : ""
+          const attemptResponse = await fetch(`${API_BASE_URL}/profile${query}`, {
+            method: "GET",
+            headers: { "Content-Type": "application/json", Authorization: `Bearer ${idToken}` },
+          })
+          if (!attemptResponse.ok) {
+            const errorData = await attemptResponse.json()
+            throw new Error(errorData.error || "Failed to fetch attempts")
+          }
+          const attemptData = await attemptResponse.json()
+          allAttempts.push(...(attemptData.attempts || []))
+          cursor = attemptData.next_attempts_cursor
+        } while (cursor)
+        setUserAttempts(allAttempts)
       } catch (error) {
         console.error("Error fetching attempts:", error)
         if (!showAutoRefreshIndicator) {
@@ -203,7 +228,13 @@ function QuizList() {
   }, [fetchQuizzesAndAttempts])
 
   useEffect(() => {
-    const hasProcessingQuizzes = quizzes.some((quiz) => quiz.status === "pending" || quiz.status === "processing")
+    const hasProcessingQuizzes = quizzes.some(
+      (quiz) =>
+        quiz.status === "pending" ||
+        quiz.status === "processing" ||
+        quiz.status === "generating" ||
+        quiz.status === "partial",
+    )
 
     if (hasProcessingQuizzes && !pollingInterval) {
       const interval = setInterval(() => {
@@ -232,8 +263,8 @@ function QuizList() {
 
   const handleFileChange = (selectedFile) => {
     if (selectedFile) {
-      if (selectedFile.size > 5 * 1024 * 1024) {
-        setNotification({ open: true, message: "File size exceeds 5MB limit.", severity: "warning" })
+      if (selectedFile.size > MAX_PDF_BYTES) {
+        setNotification({ open: true, message: "File size exceeds 50MB limit.", severity: "warning" })
         return
       }
       if (selectedFile.type !== "application/pdf") {
@@ -296,17 +327,18 @@ function QuizList() {
       const idToken = session.tokens?.idToken?.toString();
       if (!idToken) throw new Error("Unable to retrieve user token.");
 
+      // One key per submission: a double-click or retry of it is answered with the same quiz
+      if (!generationKeyRef.current) generationKeyRef.current = crypto.randomUUID();
       let body;
-      let headers = { Authorization: `Bearer ${idToken}` };
+      let headers = { Authorization: `Bearer ${idToken}`, "Idempotency-Key": generationKeyRef.current };
       if (regenerate && topicId) {
         body = { regenerate: true, topic_id: topicId };
         headers["Content-Type"] = "application/json";
       } else if (currentGenerationMode === "pdf" && file) {
-        const formData = new FormData();
-        formData.append("pdf", file);
-        body = formData;
-        // Do not set Content-Type manually; fetch will set it with the boundary
-        console.log("Sending PDF with FormData field 'pdf':", file.name); // Debugging
+        // The PDF goes straight to S3 with the form the API returns; the API
+        // only gets its name, size and hash (to refuse a repeat up front)
+        body = { upload: { filename: file.name, size: file.size, sha256: await sha256Hex(file) } };
+        headers["Content-Type"] = "application/json";
       } else if (currentGenerationMode === "topic" && topic.trim()) {
         body = { topic: topic.trim() };
         headers["Content-Type"] = "application/json";
@@ -317,8 +349,10 @@ function QuizList() {
       const response = await fetch(`${API_BASE_URL}/quiz`, {
         method: "POST",
         headers: headers,
-        body: body instanceof FormData ? body : JSON.stringify(body),
+        body: JSON.stringify(body),
       });
+      // The server has answered this submission; the next one gets a fresh key
+      generationKeyRef.current = null;
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -330,7 +364,15 @@ function QuizList() {
           throw new Error(errorData.error || "Failed to generate quiz");
         }
       } else {
-        await response.json();
+        const data = await response.json();
+        if (data.upload) {
+          const form = new FormData();
+          Object.entries(data.upload.fields).forEach(([name, value]) => form.append(name, value));
+          // S3 requires the file to be the last field
+          form.append("file", file);
+          const uploadResponse = await fetch(data.upload.url, { method: "POST", body: form });
+          if (!uploadResponse.ok) throw new Error("Failed to upload PDF");
+        }
         setNotification({
           open: true,
           message: "Quiz generation started! We'll automatically update the status.",
@@ -402,6 +444,7 @@ function QuizList() {
         )
       case "pending":
       case "processing":
+      case "generating":
         return (
           <Chip
             icon={<CircularProgress size={16} color="inherit" />}
@@ -414,6 +457,19 @@ function QuizList() {
             }}
           />
         )
+      case "partial":
+        return (
+          <Chip
+            icon={<CircularProgress size={16} color="inherit" />}
+            label="Generating"
+            sx={{
+              bgcolor: "info.main",
+              color: "info.contrastText",
+              fontWeight: 600,
+              borderRadius: 2,
+            }}
+          />
+        )
       case "failed":
         return (
           <Chip
@@ -512,7 +568,7 @@ function QuizList() {
                 {file ? file.name : "Drag & drop PDF here, or click"}
               </Typography>
               <Typography variant="body2" color="text.secondary">
-                Max file size: 5MB. Only .pdf files.
+                Max file size: 50MB. Only .pdf files.
               </Typography>
             </DropzoneContainer>
           </StyledTabPanel>
@@ -654,6 +710,8 @@ function QuizList() {
                       return <CheckCircleIcon sx={{ fontSize: 24, color: "success.main" }} />
                     case "pending":
                     case "processing":
+                    case "generating":
+                    case "partial":
                       return <PendingActionsIcon sx={{ fontSize: 24, color: "info.main" }} />
                     case "failed":
                       return <ErrorOutlineIcon sx={{ fontSize: 24, color: "error.main" }} />
@@ -664,7 +722,7 @@ function QuizList() {
 
                 const getBestScore = () => {
                   if (relevantAttempts.length === 0) return null
-                  return Math.max(...relevantAttempts.map((a) => Math.round((a.score / a.total_questions) * 100)))
+                  return Math.max(...relevantAttempts.map((a) => Math.round((a.score / (a.max_score || a.total_questions)) * 100)))
                 }
 
                 const bestScore = getBestScore()
@@ -796,7 +854,7 @@ function QuizList() {
                                 color="primary"
                                 size="medium"
                                 startIcon={<PlayArrowIcon />}
-                                disabled={quiz.status !== "completed"}
+                                disabled={quiz.status !== "completed" && quiz.status !== "partial"}
                                 sx={{
                                   borderRadius: 2,
                                   px: 3,
@@ -809,7 +867,7 @@ function QuizList() {
                                   },
                                 }}
                               >
-                                {quiz.status === "completed" ? "Take Quiz" : "Processing..."}
+                                {quiz.status === "completed" || quiz.status === "partial" ? "Take Quiz" : "Processing..."}
                               </Button>
                               <Button
                                 variant="outlined"
@@ -914,16 +972,16 @@ function QuizList() {
                                       primary={
                                         <Box sx={{ display: "flex", alignItems: "center", gap: 1 }}>
                                           <Typography variant="body2" sx={{ fontWeight: 600 }}>
-                                            Score: {attempt.score}/{attempt.total_questions}
+                                            Score: {attempt.score}/{attempt.max_score || attempt.total_questions}
                                           </Typography>
                                           <Chip
-                                            label={`${Math.round((attempt.score / attempt.total_questions) * 100)}%`}
+                                            label={`${Math.round((attempt.score / (attempt.max_score || attempt.total_questions)) * 100)}%`}
                                             size="small"
                                             sx={{
                                               bgcolor:
-                                                attempt.score / attempt.total_questions >= 0.7
+                                                attempt.score / (attempt.max_score || attempt.total_questions) >= 0.7
                                                   ? "success.main"
-                                                  : attempt.score / attempt.total_questions >= 0.4
+                                                  : attempt.score / (attempt.max_score || attempt.total_questions) >= 0.4
                                                     ? "warning.main"
                                                     : "error.main",
                                               color: "white",
@@ -992,7 +1050,7 @@ function QuizList() {
               selectedAttemptDetails && (
                 <>
                   <Typography variant="h5" gutterBottom sx={{ color: "primary.main", fontWeight: 600 }}>
-                    Score: {selectedAttemptDetails.score} / {selectedAttemptDetails.total_questions}
+                    Score: {selectedAttemptDetails.score} / {selectedAttemptDetails.max_score || selectedAttemptDetails.total_questions}
                   </Typography>
                   <Divider sx={{ my: 2 }} />
                   {selectedAttemptDetails.questions.map((q, idx) => {
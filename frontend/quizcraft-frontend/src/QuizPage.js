@@ -69,6 +69,8 @@ function QuizPage() {
   }, [id, answers, navigate, API_BASE_URL])
 
   useEffect(() => {
+    let refreshTimer = null
+    let cancelled = false
     const fetchQuiz = async () => {
       setError(null)
       try {
@@ -90,14 +92,21 @@ function QuizPage() {
           throw new Error(errorMessage)
         }
         const data = await response.json()
+        if (cancelled) return
         setQuiz(data)
         setIsQuizActive(true)
+        // Questions are still arriving; pick up the rest as they are written
+        if (data.status === "partial") refreshTimer = setTimeout(fetchQuiz, 2000)
       } catch (err) {
         console.error("Error fetching quiz:", err)
         setError(`Failed to fetch quiz: ${err.message}`)
       }
     }
     fetchQuiz()
+    return () => {
+      cancelled = true
+      clearTimeout(refreshTimer)
+    }
   }, [id, API_BASE_URL])
 
   useEffect(() => {
@@ -254,14 +263,18 @@ function QuizPage() {
           color="primary"
           size="large"
           onClick={handleSubmit}
-          disabled={isSubmitting || Object.keys(answers).length !== content.length}
+          disabled={isSubmitting || quiz.status === "partial" || Object.keys(answers).length !== content.length}
           sx={{ minWidth: { xs: "80%", sm: 280 }, py: 1.5, fontSize: "1.1rem" }}
           startIcon={isSubmitting ? <CircularProgress size={24} color="inherit" /> : null}
         >
           {isSubmitting ? "Submitting..." : "Submit Quiz"}
         </Button>
         <Typography variant="caption" display="block" sx={{ mt: 1.5, height: "20px", color: "text.secondary" }}>
-          {Object.keys(answers).length !== content.length ? "Please answer all questions to submit." : ""}
+          {quiz.status === "partial"
+            ? "More questions are on the way..."
+            : Object.keys(answers).length !== content.length
+              ? "Please answer all questions to submit."
+              : ""}
         </Typography>
       </Box>
     </Container>
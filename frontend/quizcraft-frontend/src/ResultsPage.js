@@ -72,7 +72,8 @@ function ResultsPage() {
     )
 
   const { questions, user_answers, correct_answers, score, total_questions, quiz_id } = result
-  const percentage = total_questions > 0 ? Math.round((score / total_questions) * 100) : 0
+  const maxScore = result.max_score || total_questions
+  const percentage = maxScore > 0 ? Math.round((score / maxScore) * 100) : 0
 
   const getScorePaperStyles = () => {
     if (percentage >= 70) return { backgroundColor: theme.palette.success.light, color: theme.palette.success.dark }
@@ -107,7 +108,7 @@ function ResultsPage() {
         <Typography variant="h4" sx={{ color: "text.primary", fontWeight: 500 }}>
           Your score:{" "}
           <Box component="span" sx={{ fontWeight: "bold" }}>
-            {score} / {total_questions}
+            {score} / {maxScore}
           </Box>{" "}
           ({percentage}%)
         </Typography>
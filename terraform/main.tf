@@ -20,8 +20,11 @@ module "frontend" {
 
 module "auth" {
   source                = "./modules/auth"
+  shared_layer_arn      = module.layer.layer_arn
   cloudfront_domain_name = module.frontend.cloudfront_domain_name
   sns_topic_arn         = module.notifications.sns_topic_arn
+  subscriptions_table_arn  = module.database.subscriptions_table_arn
+  subscriptions_table_name = module.database.subscriptions_table_name
 }
 
 module "api" {
@@ -38,6 +41,7 @@ module "api" {
 
 module "lambda" {
   source               = "./modules/lambda"
+  shared_layer_arn     = module.layer.layer_arn
   s3_bucket_arn        = module.storage.pdf_bucket_arn
   s3_bucket_name       = module.storage.pdf_bucket_name
   sqs_queue_arn        = module.queue.sqs_queue_arn
@@ -46,10 +50,13 @@ module "lambda" {
   quizzes_table_name   = module.database.quizzes_table_name
   topics_table_arn     = module.database.topics_table_arn
   topics_table_name    = module.database.topics_table_name
+  topic_names_table_arn  = module.database.topic_names_table_arn
+  topic_names_table_name = module.database.topic_names_table_name
 }
 
 module "quiz_generator" {
   source             = "./modules/quiz_generator"
+  shared_layer_arn   = module.layer.layer_arn
   sqs_queue_arn      = module.queue.sqs_queue_arn
   sqs_queue_url      = module.queue.sqs_queue_url
   quizzes_table_arn  = module.database.quizzes_table_arn
@@ -57,14 +64,38 @@ module "quiz_generator" {
   s3_bucket_arn      = module.storage.pdf_bucket_arn
   s3_bucket_name     = module.storage.pdf_bucket_name
   sns_topic_arn      = module.notifications.sns_topic_arn
+  quiz_cache_table_arn  = module.database.quiz_cache_table_arn
+  quiz_cache_table_name = module.database.quiz_cache_table_name
+  topics_table_arn      = module.database.topics_table_arn
+  topics_table_name     = module.database.topics_table_name
+  topic_names_table_arn  = module.database.topic_names_table_arn
+  topic_names_table_name = module.database.topic_names_table_name
+}
+
+module "process_upload" {
+  source             = "./modules/process_upload"
+  shared_layer_arn   = module.layer.layer_arn
+  s3_bucket_arn      = module.storage.pdf_bucket_arn
+  s3_bucket_name     = module.storage.pdf_bucket_name
+  sqs_queue_arn      = module.queue.sqs_queue_arn
+  sqs_queue_url      = module.queue.sqs_queue_url
+  quizzes_table_arn  = module.database.quizzes_table_arn
+  quizzes_table_name = module.database.quizzes_table_name
+  topics_table_arn   = module.database.topics_table_arn
+  topics_table_name  = module.database.topics_table_name
 }
 
 module "get_quizzes" {
   source             = "./modules/get_quizzes"
+  shared_layer_arn   = module.layer.layer_arn
   quizzes_table_arn  = module.database.quizzes_table_arn
   quizzes_table_name = module.database.quizzes_table_name
 }
 
+module "layer" {
+  source = "./modules/layer"
+}
+
 module "queue" {
   source = "./modules/queue"
 }
@@ -83,14 +114,28 @@ module "storage" {
 
 module "submit_quiz" {
   source              = "./modules/submit_quiz"
+  shared_layer_arn    = module.layer.layer_arn
   quizzes_table_arn   = module.database.quizzes_table_arn
   quizzes_table_name  = module.database.quizzes_table_name
   attempts_table_arn  = module.database.attempts_table_arn
   attempts_table_name = module.database.attempts_table_name
 }
 
+module "attempt_aggregator" {
+  source              = "./modules/attempt_aggregator"
+  shared_layer_arn    = module.layer.layer_arn
+  quizzes_table_arn   = module.database.quizzes_table_arn
+  quizzes_table_name  = module.database.quizzes_table_name
+  attempts_table_arn  = module.database.attempts_table_arn
+  attempts_table_name = module.database.attempts_table_name
+  attempts_stream_arn = module.database.attempts_stream_arn
+  attempt_stats_table_arn  = module.database.attempt_stats_table_arn
+  attempt_stats_table_name = module.database.attempt_stats_table_name
+}
+
 module "get_attempt" {
   source              = "./modules/get_attempt"
+  shared_layer_arn    = module.layer.layer_arn
   attempts_table_arn  = module.database.attempts_table_arn
   attempts_table_name = module.database.attempts_table_name
   quizzes_table_arn   = module.database.quizzes_table_arn
@@ -98,23 +143,40 @@ module "get_attempt" {
 }
 
 module "delete_quiz" {
-  source             = "./modules/delete_quiz"
-  quizzes_table_arn  = module.database.quizzes_table_arn
-  quizzes_table_name = module.database.quizzes_table_name
+  source                   = "./modules/delete_quiz"
+  shared_layer_arn         = module.layer.layer_arn
+  quizzes_table_arn        = module.database.quizzes_table_arn
+  quizzes_table_name       = module.database.quizzes_table_name
+  attempts_table_arn       = module.database.attempts_table_arn
+  attempts_table_name      = module.database.attempts_table_name
+  topics_table_arn         = module.database.topics_table_arn
+  topics_table_name        = module.database.topics_table_name
+  topic_names_table_arn    = module.database.topic_names_table_arn
+  topic_names_table_name   = module.database.topic_names_table_name
+  attempt_stats_table_arn  = module.database.attempt_stats_table_arn
+  attempt_stats_table_name = module.database.attempt_stats_table_name
+  s3_bucket_arn            = module.storage.pdf_bucket_arn
+  s3_bucket_name           = module.storage.pdf_bucket_name
+  cleanup_queue_arn        = module.queue.cleanup_queue_arn
+  cleanup_queue_url        = module.queue.cleanup_queue_url
 }
 
 module "profile" {
   source              = "./modules/profile"
+  shared_layer_arn    = module.layer.layer_arn
   quizzes_table_arn   = module.database.quizzes_table_arn
   quizzes_table_name  = module.database.quizzes_table_name
   attempts_table_arn  = module.database.attempts_table_arn
   attempts_table_name = module.database.attempts_table_name
+  attempt_stats_table_arn  = module.database.attempt_stats_table_arn
+  attempt_stats_table_name = module.database.attempt_stats_table_name
 }
 
 # Add this block before the null_resource blocks
 module "quicksight" {
   source            = "./modules/quicksight"
   attempts_table_arn = module.database.attempts_table_arn
+  attempt_stats_table_arn = module.database.attempt_stats_table_arn
 }
 
 resource "null_resource" "sync_frontend" {
@@ -147,6 +147,24 @@ resource "aws_api_gateway_integration_response" "get_quizzes_integration_respons
   depends_on  = [aws_api_gateway_integration.get_quizzes_integration]
 }
 
+# DELETE /quiz (Delete All of the User's Quizzes)
+resource "aws_api_gateway_method" "delete_all_quizzes" {
+  rest_api_id   = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id   = aws_api_gateway_resource.quiz.id
+  http_method   = "DELETE"
+  authorization = "COGNITO_USER_POOLS"
+  authorizer_id = aws_api_gateway_authorizer.cognito_authorizer.id
+}
+
+resource "aws_api_gateway_integration" "delete_all_quizzes_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id             = aws_api_gateway_resource.quiz.id
+  http_method             = aws_api_gateway_method.delete_all_quizzes.http_method
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = var.lambda_delete_quiz_invoke_arn
+}
+
 # OPTIONS /quiz (CORS)
 resource "aws_api_gateway_method" "options" {
   rest_api_id   = aws_api_gateway_rest_api.quizcraft_api.id
@@ -183,8 +201,8 @@ resource "aws_api_gateway_integration_response" "options_integration_response" {
   http_method = aws_api_gateway_method.options.http_method
   status_code = aws_api_gateway_method_response.options_200.status_code
   response_parameters = {
-    "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,Authorization'"
-    "method.response.header.Access-Control-Allow-Methods" = "'GET,POST,OPTIONS'"
+    "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,Authorization,Idempotency-Key'"
+    "method.response.header.Access-Control-Allow-Methods" = "'GET,POST,DELETE,OPTIONS'"
     "method.response.header.Access-Control-Allow-Origin"  = "'*'"
   }
   depends_on = [aws_api_gateway_integration.options_integration]
@@ -471,6 +489,90 @@ resource "aws_api_gateway_integration_response" "attempt_id_options_integration_
   depends_on = [aws_api_gateway_integration.attempt_id_options_integration]
 }
 
+# GET /attempt?ids=... (Fetch Attempts in Batch)
+resource "aws_api_gateway_method" "get_attempts" {
+  rest_api_id   = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id   = aws_api_gateway_resource.attempt.id
+  http_method   = "GET"
+  authorization = "COGNITO_USER_POOLS"
+  authorizer_id = aws_api_gateway_authorizer.cognito_authorizer.id
+  request_parameters = {
+    "method.request.querystring.ids" = true
+  }
+}
+
+resource "aws_api_gateway_method_response" "get_attempts_200" {
+  rest_api_id = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id = aws_api_gateway_resource.attempt.id
+  http_method = aws_api_gateway_method.get_attempts.http_method
+  status_code = "200"
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Origin"  = true
+    "method.response.header.Access-Control-Allow-Headers" = true
+    "method.response.header.Access-Control-Allow-Methods" = true
+  }
+}
+
+resource "aws_api_gateway_integration" "get_attempts_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id             = aws_api_gateway_resource.attempt.id
+  http_method             = aws_api_gateway_method.get_attempts.http_method
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = var.lambda_get_attempt_invoke_arn
+}
+
+resource "aws_api_gateway_integration_response" "get_attempts_integration_response" {
+  rest_api_id = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id = aws_api_gateway_resource.attempt.id
+  http_method = aws_api_gateway_method.get_attempts.http_method
+  status_code = aws_api_gateway_method_response.get_attempts_200.status_code
+  depends_on  = [aws_api_gateway_integration.get_attempts_integration]
+}
+
+# OPTIONS /attempt (CORS for GET)
+resource "aws_api_gateway_method" "attempt_options" {
+  rest_api_id   = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id   = aws_api_gateway_resource.attempt.id
+  http_method   = "OPTIONS"
+  authorization = "NONE"
+}
+
+resource "aws_api_gateway_integration" "attempt_options_integration" {
+  rest_api_id = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id = aws_api_gateway_resource.attempt.id
+  http_method = aws_api_gateway_method.attempt_options.http_method
+  type        = "MOCK"
+  request_templates = {
+    "application/json" = "{\"statusCode\": 200}"
+  }
+}
+
+resource "aws_api_gateway_method_response" "attempt_options_200" {
+  rest_api_id = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id = aws_api_gateway_resource.attempt.id
+  http_method = aws_api_gateway_method.attempt_options.http_method
+  status_code = "200"
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = true
+    "method.response.header.Access-Control-Allow-Methods" = true
+    "method.response.header.Access-Control-Allow-Origin"  = true
+  }
+}
+
+resource "aws_api_gateway_integration_response" "attempt_options_integration_response" {
+  rest_api_id = aws_api_gateway_rest_api.quizcraft_api.id
+  resource_id = aws_api_gateway_resource.attempt.id
+  http_method = aws_api_gateway_method.attempt_options.http_method
+  status_code = aws_api_gateway_method_response.attempt_options_200.status_code
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,Authorization'"
+    "method.response.header.Access-Control-Allow-Methods" = "'GET,OPTIONS'"
+    "method.response.header.Access-Control-Allow-Origin"  = "'*'"
+  }
+  depends_on = [aws_api_gateway_integration.attempt_options_integration]
+}
+
 # GET /profile (Fetch Profile Data)
 resource "aws_api_gateway_method" "get_profile" {
   rest_api_id   = aws_api_gateway_rest_api.quizcraft_api.id
@@ -579,8 +681,14 @@ resource "aws_api_gateway_deployment" "quizcraft_deployment" {
       aws_api_gateway_integration.quiz_id_options_integration,
       aws_api_gateway_method.attempt_id_options,
       aws_api_gateway_integration.attempt_id_options_integration,
+      aws_api_gateway_method.get_attempts,
+      aws_api_gateway_integration.get_attempts_integration,
+      aws_api_gateway_method.attempt_options,
+      aws_api_gateway_integration.attempt_options_integration,
       aws_api_gateway_method.delete_quiz,
       aws_api_gateway_integration.delete_quiz_integration,
+      aws_api_gateway_method.delete_all_quizzes,
+      aws_api_gateway_integration.delete_all_quizzes_integration,
       aws_api_gateway_method.get_profile,
       aws_api_gateway_integration.get_profile_integration,
       aws_api_gateway_method.profile_options,
@@ -607,8 +715,14 @@ resource "aws_api_gateway_deployment" "quizcraft_deployment" {
     aws_api_gateway_method.quiz_id_options,
     aws_api_gateway_integration.attempt_id_options_integration,
     aws_api_gateway_method.attempt_id_options,
+    aws_api_gateway_integration.get_attempts_integration,
+    aws_api_gateway_method.get_attempts,
+    aws_api_gateway_integration.attempt_options_integration,
+    aws_api_gateway_method.attempt_options,
     aws_api_gateway_integration.delete_quiz_integration,
     aws_api_gateway_method.delete_quiz,
+    aws_api_gateway_integration.delete_all_quizzes_integration,
+    aws_api_gateway_method.delete_all_quizzes,
     aws_api_gateway_integration.get_profile_integration,
     aws_api_gateway_method.get_profile,
     aws_api_gateway_integration.profile_options_integration,
@@ -668,6 +782,14 @@ resource "aws_lambda_permission" "api_gateway_invoke_get_attempt" {
   source_arn    = "${aws_api_gateway_rest_api.quizcraft_api.execution_arn}/*/GET/attempt/*"
 }
 
+resource "aws_lambda_permission" "api_gateway_invoke_get_attempts" {
+  statement_id  = "AllowAPIGatewayInvokeGetAttempts"
+  action        = "lambda:InvokeFunction"
+  function_name = "get_attempt"
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_api_gateway_rest_api.quizcraft_api.execution_arn}/*/GET/attempt"
+}
+
 resource "aws_lambda_permission" "api_gateway_invoke_delete_quiz" {
   statement_id  = "AllowAPIGatewayInvokeDeleteQuiz"
   action        = "lambda:InvokeFunction"
@@ -676,6 +798,14 @@ resource "aws_lambda_permission" "api_gateway_invoke_delete_quiz" {
   source_arn    = "${aws_api_gateway_rest_api.quizcraft_api.execution_arn}/*/DELETE/quiz/*"
 }
 
+resource "aws_lambda_permission" "api_gateway_invoke_delete_all_quizzes" {
+  statement_id  = "AllowAPIGatewayInvokeDeleteAllQuizzes"
+  action        = "lambda:InvokeFunction"
+  function_name = "delete_quiz"
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_api_gateway_rest_api.quizcraft_api.execution_arn}/*/DELETE/quiz"
+}
+
 resource "aws_lambda_permission" "api_gateway_invoke_profile" {
   statement_id  = "AllowAPIGatewayInvokeProfile"
   action        = "lambda:InvokeFunction"
@@ -0,0 +1,115 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
+variable "quizzes_table_arn" {
+  type = string
+}
+
+variable "quizzes_table_name" {
+  type = string
+}
+
+variable "attempts_table_arn" {
+  type = string
+}
+
+variable "attempts_table_name" {
+  type = string
+}
+
+variable "attempt_stats_table_arn" {
+  type = string
+}
+
+variable "attempt_stats_table_name" {
+  type = string
+}
+
+variable "attempts_stream_arn" {
+  type        = string
+  description = "Stream ARN of the DynamoDB Attempts table"
+}
+
+resource "aws_iam_role" "attempt_aggregator_exec" {
+  name = "attempt_aggregator_exec_role"
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Action = "sts:AssumeRole"
+      Effect = "Allow"
+      Principal = { Service = "lambda.amazonaws.com" }
+    }]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "attempt_aggregator_policy" {
+  role       = aws_iam_role.attempt_aggregator_exec.name
+  policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
+}
+
+resource "aws_iam_role_policy" "attempt_aggregator_dynamodb" {
+  name = "attempt_aggregator_dynamodb_policy"
+  role = aws_iam_role.attempt_aggregator_exec.id
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ]
+        Resource = var.attempts_stream_arn
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["dynamodb:UpdateItem"]
+        Resource = [var.quizzes_table_arn, var.attempts_table_arn, var.attempt_stats_table_arn]
+      }
+    ]
+  })
+}
+
+resource "aws_lambda_function" "attempt_aggregator" {
+  function_name = "attempt_aggregator"
+  role          = aws_iam_role.attempt_aggregator_exec.arn
+  handler       = "lambda_function.lambda_handler"
+  runtime       = "python3.9"
+  filename      = "../backend/attempt_aggregator.zip"
+  layers        = [var.shared_layer_arn]
+  timeout       = 60
+  environment {
+    variables = {
+      QUIZZES_TABLE  = var.quizzes_table_name
+      ATTEMPTS_TABLE = var.attempts_table_name
+      STATS_TABLE    = var.attempt_stats_table_name
+    }
+  }
+}
+
+# New attempts only; the stats_applied marker the function writes back arrives as MODIFY
+resource "aws_lambda_event_source_mapping" "attempts_stream" {
+  event_source_arn                   = var.attempts_stream_arn
+  function_name                      = aws_lambda_function.attempt_aggregator.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 500
+  maximum_batching_window_in_seconds = 2
+  maximum_retry_attempts             = 10
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  filter_criteria {
+    filter {
+      pattern = jsonencode({
+        eventName = ["INSERT"]
+      })
+    }
+  }
+}
+
+output "attempt_aggregator_arn" {
+  value = aws_lambda_function.attempt_aggregator.arn
+}
@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "cloudfront_domain_name" {
   type = string
 }
@@ -7,6 +12,16 @@ variable "sns_topic_arn" {
   description = "ARN of the SNS topic for notifications"
 }
 
+variable "subscriptions_table_arn" {
+  type        = string
+  description = "ARN of the DynamoDB Subscriptions table"
+}
+
+variable "subscriptions_table_name" {
+  type        = string
+  description = "Name of the DynamoDB Subscriptions table"
+}
+
 resource "aws_cognito_user_pool" "quizcraft" {
   name = "quizcraft-user-pool"
 
@@ -49,10 +64,12 @@ resource "aws_lambda_function" "subscribe_to_sns" {
   handler       = "lambda_function.lambda_handler"
   runtime       = "python3.9"
   filename      = "../backend/subscribe_to_sns03.zip"
+  layers        = [var.shared_layer_arn]
   timeout       = 15
   environment {
     variables = {
-      SNS_TOPIC_ARN = var.sns_topic_arn
+      SNS_TOPIC_ARN       = var.sns_topic_arn
+      SUBSCRIPTIONS_TABLE = var.subscriptions_table_name
     }
   }
 }
@@ -79,15 +96,22 @@ resource "aws_iam_role_policy" "subscribe_to_sns_sns" {
   role   = aws_iam_role.subscribe_to_sns_exec.id
   policy = jsonencode({
     Version = "2012-10-17"
-    Statement = [{
-      Effect   = "Allow"
-      Action   = [
-        "sns:Subscribe",
-        "sns:ListSubscriptionsByTopic",
-        "sns:GetSubscriptionAttributes"
-      ]
-      Resource = var.sns_topic_arn
-    }]
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["sns:Subscribe"]
+        Resource = var.sns_topic_arn
+      },
+      {
+        Effect   = "Allow"
+        Action   = [
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem"
+        ]
+        Resource = var.subscriptions_table_arn
+      }
+    ]
   })
 }
 
@@ -10,10 +10,18 @@ resource "aws_dynamodb_table" "quizzes" {
     name = "user_id"
     type = "S"
   }
+  attribute {
+    name = "created_at"
+    type = "S"
+  }
+  # List views read summaries only; keep quiz_content out of the index.
+  # non_key_attributes must match QUIZ_SUMMARY_ATTRIBUTES in quizcraft/listing.py.
   global_secondary_index {
     name               = "UserIdIndex"
     hash_key           = "user_id"
-    projection_type    = "ALL"
+    range_key          = "created_at"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["topic_id", "topic_name", "status", "attempt_count", "error_message"]
   }
 }
 
@@ -21,10 +29,36 @@ resource "aws_dynamodb_table" "attempts" {
   name           = "Attempts"
   billing_mode   = "PAY_PER_REQUEST"
   hash_key       = "attempt_id"
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
   attribute {
     name = "attempt_id"
     type = "S"
   }
+  attribute {
+    name = "user_id"
+    type = "S"
+  }
+  attribute {
+    name = "created_at"
+    type = "S"
+  }
+  attribute {
+    name = "quiz_id"
+    type = "S"
+  }
+  global_secondary_index {
+    name               = "UserCreatedAtIndex"
+    hash_key           = "user_id"
+    range_key          = "created_at"
+    projection_type    = "ALL"
+  }
+  # Finds a quiz's attempts when the quiz is deleted
+  global_secondary_index {
+    name               = "QuizIdIndex"
+    hash_key           = "quiz_id"
+    projection_type    = "KEYS_ONLY"
+  }
 }
 
 resource "aws_dynamodb_table" "topics" {
@@ -44,12 +78,74 @@ resource "aws_dynamodb_table" "topics" {
     name = "source_identifier"
     type = "S"
   }
+  attribute {
+    name = "pdf_hash"
+    type = "S"
+  }
   global_secondary_index {
     name               = "UniqueSourceIndex"
     hash_key           = "user_id"
     range_key          = "source_identifier"
     projection_type    = "ALL"
   }
+  # Finds every user's topic for a PDF, which share its text sidecar (quizcraft/cleanup.py)
+  global_secondary_index {
+    name               = "PdfHashIndex"
+    hash_key           = "pdf_hash"
+    projection_type    = "KEYS_ONLY"
+  }
+}
+
+# Per-user topic name reservations and suffix counters (quizcraft/topic_names.py)
+resource "aws_dynamodb_table" "topic_names" {
+  name           = "TopicNames"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "user_id"
+  range_key      = "name_key"
+  attribute {
+    name = "user_id"
+    type = "S"
+  }
+  attribute {
+    name = "name_key"
+    type = "S"
+  }
+}
+
+# One SNS email subscription per user, registered by subscribe_to_sns
+resource "aws_dynamodb_table" "subscriptions" {
+  name           = "Subscriptions"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "user_id"
+  attribute {
+    name = "user_id"
+    type = "S"
+  }
+}
+
+resource "aws_dynamodb_table" "quiz_cache" {
+  name           = "QuizCache"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "cache_key"
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
+
+# Per-user and per-quiz attempt rollups, maintained by attempt_aggregator
+resource "aws_dynamodb_table" "attempt_stats" {
+  name           = "AttemptStats"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "stats_key"
+  attribute {
+    name = "stats_key"
+    type = "S"
+  }
 }
 
 output "quizzes_table_arn" {
@@ -68,10 +164,46 @@ output "attempts_table_name" {
   value = aws_dynamodb_table.attempts.name
 }
 
+output "attempts_stream_arn" {
+  value = aws_dynamodb_table.attempts.stream_arn
+}
+
 output "topics_table_arn" {
   value = aws_dynamodb_table.topics.arn
 }
 
 output "topics_table_name" {
   value = aws_dynamodb_table.topics.name
-}
\ No newline at end of file
+}
+
+output "topic_names_table_arn" {
+  value = aws_dynamodb_table.topic_names.arn
+}
+
+output "topic_names_table_name" {
+  value = aws_dynamodb_table.topic_names.name
+}
+
+output "subscriptions_table_arn" {
+  value = aws_dynamodb_table.subscriptions.arn
+}
+
+output "subscriptions_table_name" {
+  value = aws_dynamodb_table.subscriptions.name
+}
+
+output "quiz_cache_table_arn" {
+  value = aws_dynamodb_table.quiz_cache.arn
+}
+
+output "quiz_cache_table_name" {
+  value = aws_dynamodb_table.quiz_cache.name
+}
+
+output "attempt_stats_table_arn" {
+  value = aws_dynamodb_table.attempt_stats.arn
+}
+
+output "attempt_stats_table_name" {
+  value = aws_dynamodb_table.attempt_stats.name
+}
@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "quizzes_table_arn" {
   type = string
 }
@@ -6,6 +11,71 @@ variable "quizzes_table_name" {
   type = string
 }
 
+variable "attempts_table_arn" {
+  type = string
+}
+
+variable "attempts_table_name" {
+  type = string
+}
+
+variable "topics_table_arn" {
+  type = string
+}
+
+variable "topics_table_name" {
+  type = string
+}
+
+variable "topic_names_table_arn" {
+  type = string
+}
+
+variable "topic_names_table_name" {
+  type = string
+}
+
+variable "attempt_stats_table_arn" {
+  type = string
+}
+
+variable "attempt_stats_table_name" {
+  type = string
+}
+
+variable "s3_bucket_arn" {
+  type        = string
+  description = "ARN of the S3 bucket for PDFs"
+}
+
+variable "s3_bucket_name" {
+  type        = string
+  description = "Name of the S3 bucket for PDFs"
+}
+
+variable "cleanup_queue_arn" {
+  type        = string
+  description = "ARN of the SQS queue for quiz cleanups"
+}
+
+variable "cleanup_queue_url" {
+  type        = string
+  description = "URL of the SQS queue for quiz cleanups"
+}
+
+locals {
+  # delete_quiz and cleanup_worker run the same cascades (quizcraft/cleanup.py)
+  cleanup_environment = {
+    QUIZZES_TABLE     = var.quizzes_table_name
+    ATTEMPTS_TABLE    = var.attempts_table_name
+    TOPICS_TABLE      = var.topics_table_name
+    TOPIC_NAMES_TABLE = var.topic_names_table_name
+    STATS_TABLE       = var.attempt_stats_table_name
+    S3_BUCKET         = var.s3_bucket_name
+    CLEANUP_QUEUE_URL = var.cleanup_queue_url
+  }
+}
+
 resource "aws_iam_role" "delete_quiz_exec" {
   name = "delete_quiz_exec_role"
   assume_role_policy = jsonencode({
@@ -31,8 +101,32 @@ resource "aws_iam_role_policy" "delete_quiz_dynamodb" {
     Statement = [
       {
         Effect = "Allow"
-        Action = ["dynamodb:GetItem", "dynamodb:DeleteItem"]
-        Resource = var.quizzes_table_arn
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:DeleteItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:Query"
+        ]
+        Resource = [
+          var.quizzes_table_arn,
+          "${var.quizzes_table_arn}/index/*",
+          var.attempts_table_arn,
+          "${var.attempts_table_arn}/index/*",
+          var.topics_table_arn,
+          "${var.topics_table_arn}/index/*",
+          var.topic_names_table_arn,
+          var.attempt_stats_table_arn
+        ]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["s3:DeleteObject"]
+        Resource = "${var.s3_bucket_arn}/*"
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["sqs:SendMessage"]
+        Resource = var.cleanup_queue_arn
       }
     ]
   })
@@ -44,14 +138,98 @@ resource "aws_lambda_function" "delete_quiz" {
   handler = "lambda_function.lambda_handler"
   runtime = "python3.9"
   filename = "../backend/delete_quiz.zip"
+  layers = [var.shared_layer_arn]
   timeout = 15
   environment {
-    variables = {
-      QUIZZES_TABLE = var.quizzes_table_name
-    }
+    variables = local.cleanup_environment
   }
 }
 
+resource "aws_iam_role" "cleanup_worker_exec" {
+  name = "cleanup_worker_exec_role"
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Action = "sts:AssumeRole"
+      Effect = "Allow"
+      Principal = { Service = "lambda.amazonaws.com" }
+    }]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "cleanup_worker_policy" {
+  role = aws_iam_role.cleanup_worker_exec.name
+  policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
+}
+
+resource "aws_iam_role_policy" "cleanup_worker_access" {
+  name = "cleanup_worker_access_policy"
+  role = aws_iam_role.cleanup_worker_exec.id
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      # UpdateItem and BatchGetItem are for attempt_stats.remove, which takes a
+      # deleted user's attempts back out of other users' quizzes
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:Query"
+        ]
+        Resource = [
+          var.quizzes_table_arn,
+          "${var.quizzes_table_arn}/index/*",
+          var.attempts_table_arn,
+          "${var.attempts_table_arn}/index/*",
+          var.topics_table_arn,
+          "${var.topics_table_arn}/index/*",
+          var.topic_names_table_arn,
+          var.attempt_stats_table_arn
+        ]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["s3:DeleteObject"]
+        Resource = "${var.s3_bucket_arn}/*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes",
+          "sqs:SendMessage"
+        ]
+        Resource = var.cleanup_queue_arn
+      }
+    ]
+  })
+}
+
+resource "aws_lambda_function" "cleanup_worker" {
+  function_name = "cleanup_worker"
+  role = aws_iam_role.cleanup_worker_exec.arn
+  handler = "lambda_function.lambda_handler"
+  runtime = "python3.9"
+  filename = "../backend/cleanup_worker.zip"
+  layers = [var.shared_layer_arn]
+  timeout = 60
+  environment {
+    variables = local.cleanup_environment
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "cleanup_queue" {
+  event_source_arn        = var.cleanup_queue_arn
+  function_name           = aws_lambda_function.cleanup_worker.arn
+  batch_size              = 1
+  function_response_types = ["ReportBatchItemFailures"]
+}
+
 output "delete_quiz_invoke_arn" {
   value = aws_lambda_function.delete_quiz.invoke_arn
-}
\ No newline at end of file
+}
@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "attempts_table_arn" {
   type = string
 }
@@ -39,7 +44,7 @@ resource "aws_iam_role_policy" "get_attempt_dynamodb" {
     Statement = [
       {
         Effect = "Allow"
-        Action = ["dynamodb:GetItem"]
+        Action = ["dynamodb:GetItem", "dynamodb:BatchGetItem"]
         Resource = [var.attempts_table_arn, var.quizzes_table_arn]
       }
     ]
@@ -52,6 +57,7 @@ resource "aws_lambda_function" "get_attempt" {
   handler = "lambda_function.lambda_handler"
   runtime = "python3.9"
   filename = "../backend/get_attempt01.zip"
+  layers = [var.shared_layer_arn]
   timeout = 15
   environment {
     variables = {
@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "quizzes_table_arn" {
   type        = string
   description = "ARN of the DynamoDB Quizzes table"
@@ -52,6 +57,7 @@ resource "aws_lambda_function" "get_quizzes" {
   handler       = "lambda_function.lambda_handler"
   runtime       = "python3.9"
   filename      = "../backend/get_quizzes02.zip"  
+  layers        = [var.shared_layer_arn]
   timeout       = 15
   environment {
     variables = {
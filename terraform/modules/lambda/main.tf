@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "s3_bucket_arn" {
   type        = string
   description = "ARN of the S3 bucket for PDFs"
@@ -38,6 +43,16 @@ variable "topics_table_name" {
   description = "Name of the DynamoDB Topics table"
 }
 
+variable "topic_names_table_arn" {
+  type        = string
+  description = "ARN of the DynamoDB TopicNames table"
+}
+
+variable "topic_names_table_name" {
+  type        = string
+  description = "Name of the DynamoDB TopicNames table"
+}
+
 resource "aws_iam_role" "lambda_exec" {
   name = "lambda_exec_role"
   assume_role_policy = jsonencode({
@@ -95,8 +110,18 @@ resource "aws_iam_role_policy" "lambda_s3_sqs_dynamodb" {
       },
       {
         Effect = "Allow"
-        Action = ["secretsmanager:GetSecretValue"]
-        Resource = "arn:aws:secretsmanager:us-east-1:*:secret:quizcraft/openai_api_key-*"
+        Action = [
+          "dynamodb:UpdateItem"
+        ]
+        Resource = var.topic_names_table_arn
+      },
+      {
+        # release_request drops the idempotency claim of a rejected request
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DeleteItem"
+        ]
+        Resource = var.quizzes_table_arn
       }
     ]
   })
@@ -108,6 +133,7 @@ resource "aws_lambda_function" "generate_quiz" {
   handler       = "lambda_function.lambda_handler"
   runtime       = "python3.9"
   filename      = "../backend/generate_quiz21.zip"
+  layers        = [var.shared_layer_arn]
   timeout       = 30
   environment {
     variables = {
@@ -115,7 +141,8 @@ resource "aws_lambda_function" "generate_quiz" {
       SQS_QUEUE_URL  = var.sqs_queue_url
       QUIZZES_TABLE  = var.quizzes_table_name
       TOPICS_TABLE   = var.topics_table_name
-      OPENAI_API_KEY = "arn:aws:secretsmanager:us-east-1:601148044385:secret:quizcraft/openai_api_key-uISGhk"
+      TOPIC_NAMES_TABLE = var.topic_names_table_name
+      MAX_UPLOAD_BYTES  = "52428800"
     }
   }
 }
@@ -0,0 +1,10 @@
+resource "aws_lambda_layer_version" "quizcraft_shared" {
+  layer_name          = "quizcraft_shared"
+  filename            = "../backend/quizcraft_layer.zip"
+  compatible_runtimes = ["python3.9"]
+  description         = "Shared runtime helpers (clients, secret cache) for QuizCraft Lambdas"
+}
+
+output "layer_arn" {
+  value = aws_lambda_layer_version.quizcraft_shared.arn
+}
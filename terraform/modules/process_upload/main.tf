@@ -0,0 +1,133 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
+variable "s3_bucket_arn" {
+  type        = string
+  description = "ARN of the S3 bucket for PDFs"
+}
+
+variable "s3_bucket_name" {
+  type        = string
+  description = "Name of the S3 bucket for PDFs"
+}
+
+variable "sqs_queue_arn" {
+  type        = string
+  description = "ARN of the SQS queue for quiz generation"
+}
+
+variable "sqs_queue_url" {
+  type        = string
+  description = "URL of the SQS queue for quiz generation"
+}
+
+variable "quizzes_table_arn" {
+  type = string
+}
+
+variable "quizzes_table_name" {
+  type = string
+}
+
+variable "topics_table_arn" {
+  type = string
+}
+
+variable "topics_table_name" {
+  type = string
+}
+
+resource "aws_iam_role" "process_upload_exec" {
+  name = "process_upload_exec_role"
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Action = "sts:AssumeRole"
+      Effect = "Allow"
+      Principal = { Service = "lambda.amazonaws.com" }
+    }]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "process_upload_policy" {
+  role       = aws_iam_role.process_upload_exec.name
+  policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
+}
+
+resource "aws_iam_role_policy" "process_upload_access" {
+  name = "process_upload_access_policy"
+  role = aws_iam_role.process_upload_exec.id
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["s3:GetObject", "s3:DeleteObject"]
+        Resource = "${var.s3_bucket_arn}/uploads/*"
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["sqs:SendMessage"]
+        Resource = var.sqs_queue_arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem",
+          "dynamodb:Query"
+        ]
+        Resource = [
+          var.quizzes_table_arn,
+          var.topics_table_arn,
+          "${var.topics_table_arn}/index/*"
+        ]
+      }
+    ]
+  })
+}
+
+resource "aws_lambda_function" "process_upload" {
+  function_name = "process_upload"
+  role          = aws_iam_role.process_upload_exec.arn
+  handler       = "lambda_function.lambda_handler"
+  runtime       = "python3.9"
+  filename      = "../backend/process_upload.zip"
+  layers        = [var.shared_layer_arn]
+  timeout       = 60
+  environment {
+    variables = {
+      SQS_QUEUE_URL = var.sqs_queue_url
+      QUIZZES_TABLE = var.quizzes_table_name
+      TOPICS_TABLE  = var.topics_table_name
+    }
+  }
+}
+
+resource "aws_lambda_permission" "allow_s3" {
+  statement_id  = "AllowS3Invoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.process_upload.function_name
+  principal     = "s3.amazonaws.com"
+  source_arn    = var.s3_bucket_arn
+}
+
+# PDFs posted with the forms generate_quiz presigns land under uploads/
+resource "aws_s3_bucket_notification" "uploads" {
+  bucket = var.s3_bucket_name
+
+  lambda_function {
+    lambda_function_arn = aws_lambda_function.process_upload.arn
+    events              = ["s3:ObjectCreated:*"]
+    filter_prefix       = "uploads/"
+    filter_suffix       = ".pdf"
+  }
+
+  depends_on = [aws_lambda_permission.allow_s3]
+}
+
+output "process_upload_arn" {
+  value = aws_lambda_function.process_upload.arn
+}
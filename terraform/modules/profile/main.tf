@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "quizzes_table_arn" {
   type = string
 }
@@ -14,6 +19,14 @@ variable "attempts_table_name" {
   type = string
 }
 
+variable "attempt_stats_table_arn" {
+  type = string
+}
+
+variable "attempt_stats_table_name" {
+  type = string
+}
+
 resource "aws_iam_role" "profile_exec" {
   name = "profile_exec_role"
   assume_role_policy = jsonencode({
@@ -39,12 +52,18 @@ resource "aws_iam_role_policy" "profile_dynamodb" {
     Statement = [
       {
         Effect = "Allow"
-        Action = ["dynamodb:Query", "dynamodb:Scan"]
+        Action = ["dynamodb:Query"]
         Resource = [
           var.quizzes_table_arn,
           "${var.quizzes_table_arn}/index/*",
-          var.attempts_table_arn
+          var.attempts_table_arn,
+          "${var.attempts_table_arn}/index/*"
         ]
+      },
+      {
+        Effect = "Allow"
+        Action = ["dynamodb:GetItem"]
+        Resource = var.attempt_stats_table_arn
       }
     ]
   })
@@ -56,11 +75,13 @@ resource "aws_lambda_function" "profile" {
   handler = "lambda_function.lambda_handler"
   runtime = "python3.9"
   filename = "../backend/profile01.zip"
+  layers = [var.shared_layer_arn]
   timeout = 15
   environment {
     variables = {
       QUIZZES_TABLE = var.quizzes_table_name
       ATTEMPTS_TABLE = var.attempts_table_name
+      STATS_TABLE = var.attempt_stats_table_name
     }
   }
 }
@@ -3,10 +3,24 @@ resource "aws_sqs_queue" "quiz_generation_queue" {
   visibility_timeout_seconds = 120  # Set to 120 seconds
 }
 
+# Quiz deletions too large to finish inside the API request
+resource "aws_sqs_queue" "cleanup_queue" {
+  name = "quiz-cleanup-queue"
+  visibility_timeout_seconds = 360  # Six times the cleanup_worker timeout
+}
+
 output "sqs_queue_arn" {
   value = aws_sqs_queue.quiz_generation_queue.arn
 }
 
 output "sqs_queue_url" {
   value = aws_sqs_queue.quiz_generation_queue.url
+}
+
+output "cleanup_queue_arn" {
+  value = aws_sqs_queue.cleanup_queue.arn
+}
+
+output "cleanup_queue_url" {
+  value = aws_sqs_queue.cleanup_queue.url
 }
\ No newline at end of file
@@ -3,6 +3,11 @@ variable "attempts_table_arn" {
   description = "ARN of the DynamoDB Attempts table"
 }
 
+variable "attempt_stats_table_arn" {
+  type        = string
+  description = "ARN of the DynamoDB AttemptStats table (pre-aggregated rollups)"
+}
+
 # IAM Role for QuickSight to access DynamoDB
 resource "aws_iam_role" "quicksight_dynamodb_access" {
   name = "QuickSightDynamoDBAccessRole"
@@ -35,7 +40,7 @@ resource "aws_iam_role_policy" "quicksight_dynamodb_policy" {
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
-        Resource = var.attempts_table_arn
+        Resource = [var.attempts_table_arn, var.attempt_stats_table_arn]
       }
     ]
   })
@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "sqs_queue_arn" {
   type        = string
   description = "ARN of the SQS queue for quiz generation"
@@ -18,6 +23,36 @@ variable "quizzes_table_name" {
   description = "Name of the DynamoDB Quizzes table"
 }
 
+variable "quiz_cache_table_arn" {
+  type        = string
+  description = "ARN of the DynamoDB QuizCache table"
+}
+
+variable "quiz_cache_table_name" {
+  type        = string
+  description = "Name of the DynamoDB QuizCache table"
+}
+
+variable "topics_table_arn" {
+  type        = string
+  description = "ARN of the DynamoDB Topics table"
+}
+
+variable "topics_table_name" {
+  type        = string
+  description = "Name of the DynamoDB Topics table"
+}
+
+variable "topic_names_table_arn" {
+  type        = string
+  description = "ARN of the DynamoDB TopicNames table"
+}
+
+variable "topic_names_table_name" {
+  type        = string
+  description = "Name of the DynamoDB TopicNames table"
+}
+
 variable "s3_bucket_arn" {
   type        = string
   description = "ARN of the S3 bucket for PDFs"
@@ -78,7 +113,32 @@ resource "aws_iam_role_policy" "quiz_generator_sqs_dynamodb_s3" {
       {
         Effect = "Allow"
         Action = [
-          "s3:GetObject"
+          "dynamodb:UpdateItem",
+          "dynamodb:GetItem"
+        ]
+        Resource = var.topics_table_arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:UpdateItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = var.topic_names_table_arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = var.quiz_cache_table_arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:PutObject"
         ]
         Resource = "${var.s3_bucket_arn}/*"
       },
@@ -121,14 +181,23 @@ resource "aws_lambda_function" "quiz_generator" {
   handler       = "lambda_function.lambda_handler"
   runtime       = "python3.9"
   filename      = "../backend/quiz_generator12.zip"
+  layers        = [var.shared_layer_arn]
   timeout       = 60
   environment {
     variables = {
       S3_BUCKET      = var.s3_bucket_name
       SQS_QUEUE_URL  = var.sqs_queue_url
       QUIZZES_TABLE  = var.quizzes_table_name
+      TOPICS_TABLE   = var.topics_table_name
+      TOPIC_NAMES_TABLE  = var.topic_names_table_name
       OPENAI_API_KEY = aws_secretsmanager_secret.openai_api_key.arn
       SNS_TOPIC_ARN  = var.sns_topic_arn
+      QUIZ_CACHE_BACKEND = "dynamodb"
+      QUIZ_CACHE_TABLE   = var.quiz_cache_table_name
+      SECTION_TOKENS     = "2500"
+      MAX_SECTIONS       = "16"
+      # Between the 60s timeout and the queue's 120s visibility timeout
+      GENERATION_LEASE_SECONDS = "90"
     }
   }
 }
@@ -136,7 +205,9 @@ resource "aws_lambda_function" "quiz_generator" {
 resource "aws_lambda_event_source_mapping" "sqs_trigger" {
   event_source_arn = var.sqs_queue_arn
   function_name    = aws_lambda_function.quiz_generator.arn
-  batch_size       = 1
+  batch_size       = 10
+
+  function_response_types = ["ReportBatchItemFailures"]
 }
 
 resource "aws_cloudwatch_metric_alarm" "quiz_generator_errors" {
@@ -2,6 +2,18 @@ resource "aws_s3_bucket" "pdfs" {
   bucket = "quizcraft-pdfs-${random_string.suffix.result}"
 }
 
+# Browsers POST PDFs straight to the bucket with forms presigned by generate_quiz
+resource "aws_s3_bucket_cors_configuration" "pdfs" {
+  bucket = aws_s3_bucket.pdfs.id
+
+  cors_rule {
+    allowed_methods = ["POST"]
+    allowed_origins = ["*"]
+    allowed_headers = ["*"]
+    max_age_seconds = 3000
+  }
+}
+
 resource "random_string" "suffix" {
   length  = 8
   special = false
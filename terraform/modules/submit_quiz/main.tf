@@ -1,3 +1,8 @@
+variable "shared_layer_arn" {
+  type        = string
+  description = "ARN of the shared QuizCraft Lambda layer"
+}
+
 variable "quizzes_table_arn" {
   type = string
 }
@@ -57,6 +62,7 @@ resource "aws_lambda_function" "submit_quiz" {
   handler = "lambda_function.lambda_handler"
   runtime = "python3.9"
   filename = "../backend/submit_quiz01.zip"
+  layers = [var.shared_layer_arn]
   timeout = 15
   environment {
     variables = {